@@ -1,8 +1,41 @@
 
 import logging
+import threading
 from typing import Dict, Any, List, Optional
-from ai_providers import get_ai_response
+from ai_providers import UNAVAILABLE_MESSAGE, get_ai_response
 from config import AppConfig
+from conversation_memory import ConversationMemory
+from incremental_analysis import (
+    SECTIONS,
+    AnalysisRecord,
+    AnalysisStore,
+    changed_positions,
+    get_analysis_store,
+    parse_section_update,
+    section_hashes,
+)
+from job_matching import prescore_job_fit
+from match_index import JobIndex, ProfileIndex
+from prepared_profile import (
+    format_education,
+    format_experience,
+    format_recent_experience,
+    prepare_profile,
+    PreparedProfile,
+)
+from section_parser import parse_sections
+from semantic_cache import cached_answer
+from schemas import (
+    JSON_RESPONSE_FORMAT,
+    CareerGuidanceOutput,
+    ContentOptimizationOutput,
+    JobFitOutput,
+    ProfileAnalysisOutput,
+    SectionUpdateOutput,
+    extract_json_object,
+    json_instructions,
+    validate_fields,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -11,9 +44,13 @@ logger = logging.getLogger(__name__)
 class LinkedInOptimizerAgent:
     """Comprehensive LinkedIn Profile Optimizer Agent"""
     
-    def __init__(self):
-        """Initialize the LinkedIn optimizer agent"""
+    def __init__(self, priority: Optional[str] = None):
+        """Initialize the LinkedIn optimizer agent (priority: rate-limit queue class, e.g. "batch")"""
+        self.priority = priority
         self.system_prompt = AppConfig.AGENT_CONFIG["system_prompt"]
+        self.json_mode = AppConfig.AGENT_CONFIG.get("json_mode", False)
+        self.json_max_tokens = AppConfig.AGENT_CONFIG.get("json_max_tokens")
+        self.json_max_retries = AppConfig.AGENT_CONFIG.get("json_max_retries", 1)
         logger.info("LinkedIn Optimizer Agent initialized")
     
     def analyze_profile(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -28,10 +65,16 @@ class LinkedInOptimizerAgent:
         """
         try:
             logger.info("Analyzing LinkedIn profile...")
+            prepared = prepare_profile(profile_data)
             
-            prompt = f"""
-            Please analyze this LinkedIn profile comprehensively and provide detailed feedback in the EXACT format specified:
-
+            # Re-analysis of a known profile: only sections that changed go to the LLM
+            store = get_analysis_store()
+            if store is not None:
+                analysis = self._reanalyze_changed_sections(profile_data, prepared, store)
+                if analysis is not None:
+                    return analysis
+            
+            profile_context = f"""
             PROFILE DATA:
             Name: {profile_data.get('name', 'N/A')}
             Headline: {profile_data.get('headline', 'N/A')}
@@ -39,17 +82,34 @@ class LinkedInOptimizerAgent:
             Industry: {profile_data.get('industry', 'N/A')}
             Summary: {profile_data.get('summary', 'N/A')}
             
-            Experience ({len(profile_data.get('experience', []))} positions):
-            {self._format_experience(profile_data.get('experience', []))}
+            Experience ({len(prepared.experience)} positions):
+            {prepared.experience_text}
             
-            Education ({len(profile_data.get('education', []))} entries):
-            {self._format_education(profile_data.get('education', []))}
+            Education ({len(prepared.education)} entries):
+            {prepared.education_text}
             
-            Skills ({len(profile_data.get('skills', []))} listed):
-            {', '.join(profile_data.get('skills', [])[:15])}{'...' if len(profile_data.get('skills', [])) > 15 else ''}
+            Skills ({len(prepared.skills)} listed):
+            {prepared.skills_text(15, ellipsis=True)}
             
             Connections: {profile_data.get('connections', 0)}
+            """
             
+            if self.json_mode:
+                data = self._generate_structured(
+                    f"Please analyze this LinkedIn profile comprehensively.\n{profile_context}",
+                    ProfileAnalysisOutput,
+                    task="profile",
+                )
+                if data is not None:
+                    logger.info("Profile analysis completed (JSON mode)")
+                    data["detailed_feedback"] = data.pop("_raw")
+                    data["profile_completeness"] = self._calculate_completeness(profile_data)
+                    self._remember_analysis(store, profile_data, data)
+                    return data
+            
+            prompt = f"""
+            Please analyze this LinkedIn profile comprehensively and provide detailed feedback in the EXACT format specified:
+            {profile_context}
             REQUIRED FORMAT - Please follow this EXACT structure and provide DETAILED analysis:
 
             OVERALL SCORE: [0-100 number]
@@ -98,7 +158,10 @@ class LinkedInOptimizerAgent:
             Include detailed explanations for each point, specific examples where possible, and quantifiable improvements.
             """
             
-            response = get_ai_response(prompt, self.system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="profile", priority=self.priority)
+            if response == UNAVAILABLE_MESSAGE:
+                logger.warning("No AI provider available, using enhanced fallback")
+                return {**self._get_enhanced_fallback_analysis(profile_data), "ai_unavailable": True}
             logger.info(f"AI Response received (length: {len(response)})")
             logger.debug(f"Full AI Response: {response[:500]}...")
             
@@ -111,45 +174,182 @@ class LinkedInOptimizerAgent:
                 return self._get_enhanced_fallback_analysis(profile_data, response)
             
             logger.info("Profile analysis completed successfully")
+            self._remember_analysis(store, profile_data, analysis)
             return analysis
             
         except Exception as e:
             logger.error(f"Error analyzing profile: {e}")
             return self._get_enhanced_fallback_analysis(profile_data)
     
-    def analyze_job_fit(self, profile_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+    def _reanalyze_changed_sections(
+        self, profile_data: Dict[str, Any], prepared: PreparedProfile, store: AnalysisStore
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Re-score only the sections that changed since the stored analysis of
+        this profile and merge them with the rest. Returns None when a full
+        analysis is needed (no stored analysis, or too much changed).
+        """
+        record = store.get(profile_data)
+        if record is None:
+            return None
+        hashes = section_hashes(profile_data)
+        changed = record.changed_sections(hashes)
+        if not changed:
+            logger.info("Profile unchanged since its last analysis, reusing it")
+            store.note("unchanged", changed)
+            analysis = record.result(changed)
+            analysis["profile_completeness"] = self._calculate_completeness(profile_data)
+            return analysis
+        if len(changed) > store.max_changed_sections:
+            logger.info(f"{len(changed)} sections changed, running a full analysis")
+            return None
+        
+        logger.info(f"Re-analyzing changed sections: {', '.join(changed)}")
+        blocks = {
+            "headline": lambda: profile_data.get('headline') or 'N/A',
+            "summary": lambda: profile_data.get('summary') or 'N/A',
+            "experience": lambda: prepared.experience_text,
+            "education": lambda: prepared.education_text,
+            "skills": lambda: prepared.skills_text(15, ellipsis=True) or 'No skills listed',
+        }
+        old_scores = record.analysis.get('section_scores', {})
+        changed_text = []
+        for section in changed:
+            note = f"previously scored {old_scores.get(section, 'N/A')}"
+            if section == "experience":
+                positions = changed_positions(record.hashes, hashes)
+                if positions:
+                    note += f"; updated positions: {', '.join(map(str, positions))}"
+            changed_text.append(f"{section.title()} ({note}):\n{blocks[section]()}")
+        unchanged_scores = ", ".join(
+            f"{section.title()} {old_scores.get(section, 'N/A')}" for section in SECTIONS if section not in changed
+        )
+        context = f"""
+            Parts of this LinkedIn profile changed since it was last analyzed. Re-assess ONLY the changed sections.
+            
+            PROFILE CONTEXT:
+            Name: {profile_data.get('name', 'N/A')}
+            Headline: {profile_data.get('headline', 'N/A')}
+            Industry: {profile_data.get('industry', 'N/A')}
+            Scores of the unchanged sections (keep your scale consistent with them): {unchanged_scores}
+            
+            CHANGED SECTIONS:
+            {chr(10).join(changed_text)}
+            """
+        
+        update = None
+        if self.json_mode:
+            data = self._generate_structured(context, SectionUpdateOutput, task="profile")
+            if data is not None:
+                response = data.pop("_raw")
+                data["section_scores"] = {s: v for s, v in data["section_scores"].items() if s in changed}
+                update = data
+        if update is None:
+            score_lines = "\n".join(f"            - {section.title()}: [0-100 number]" for section in changed)
+            prompt = f"""{context}
+            REQUIRED FORMAT - Please follow this EXACT structure and only cover the changed sections:
+
+            SECTION SCORES:
+{score_lines}
+
+            STRENGTHS:
+            - [2-3 strengths of the changed sections with specific examples]
+
+            WEAKNESSES:
+            - [2-3 weaknesses of the changed sections and why they matter]
+
+            RECOMMENDATIONS:
+            - [2-4 actionable recommendations for the changed sections with expected impact]
+
+            KEYWORDS:
+            - [Keywords the changed sections should add, with relevance]
+            """
+            response = get_ai_response(prompt, self.system_prompt, task="profile", priority=self.priority)
+            if response == UNAVAILABLE_MESSAGE:
+                logger.warning("No AI provider available, using enhanced fallback")
+                return {**self._get_enhanced_fallback_analysis(profile_data), "ai_unavailable": True}
+            update = parse_section_update(response, changed)
+        
+        if not update["section_scores"]:
+            logger.warning("Re-analysis returned no section scores, running a full analysis")
+            return None
+        record = record.merge(hashes, update, changed, response)
+        store.put(profile_data, record)
+        store.note("incremental", changed)
+        analysis = record.result(changed)
+        analysis["profile_completeness"] = self._calculate_completeness(profile_data)
+        logger.info(f"Profile re-analysis completed ({len(changed)} of {len(SECTIONS)} sections)")
+        return analysis
+    
+    def _remember_analysis(
+        self, store: Optional[AnalysisStore], profile_data: Dict[str, Any], analysis: Dict[str, Any]
+    ) -> None:
+        """Keep a full analysis so the next run on this profile can be incremental"""
+        if store is None:
+            return
+        store.put(profile_data, AnalysisRecord(section_hashes(profile_data), analysis))
+        store.note("full", list(SECTIONS))
+    
+    def analyze_job_fit(self, profile_data: Dict[str, Any], job_description: str, use_llm: bool = True) -> Dict[str, Any]:
         """
         Analyze how well the profile fits a specific job
         
         Args:
             profile_data: LinkedIn profile data
             job_description: Target job description
+            use_llm: Ask the LLM for narrative advice on top of the local pre-score
             
         Returns:
             Job fit analysis with score and recommendations
         """
+        prescore = None
         try:
             logger.info("Analyzing job fit...")
             
-            prompt = f"""
-            Analyze how well this LinkedIn profile matches the given job description:
-
+            # Skill match and missing skills are computed locally; the LLM
+            # only adds the narrative parts
+            prescore = prescore_job_fit(profile_data, job_description)
+            if not use_llm:
+                return self._get_prescore_job_fit(prescore)
+            
+            prepared = prepare_profile(profile_data)
+            job_context = f"""
             LINKEDIN PROFILE:
             Name: {profile_data.get('name', 'N/A')}
             Headline: {profile_data.get('headline', 'N/A')}
             Summary: {profile_data.get('summary', 'N/A')}
             
             Experience:
-            {self._format_experience(profile_data.get('experience', []))}
+            {prepared.experience_text}
             
-            Skills: {', '.join(profile_data.get('skills', []))}
+            Skills: {prepared.skills_text()}
             
             Education:
-            {self._format_education(profile_data.get('education', []))}
+            {prepared.education_text}
 
             JOB DESCRIPTION:
             {job_description}
 
+            SKILL ANALYSIS (computed, use as given):
+            Skill match: {prescore['skill_match']}%
+            Matched skills: {', '.join(m['skill'] for m in prescore['matched_skills']) or 'None'}
+            Missing skills: {', '.join(prescore['missing_skills']) or 'None'}
+            """
+            
+            if self.json_mode:
+                data = self._generate_structured(
+                    f"Analyze how well this LinkedIn profile matches the given job description.\n{job_context}",
+                    JobFitOutput,
+                    task="job_fit",
+                )
+                if data is not None:
+                    logger.info("Job fit analysis completed (JSON mode)")
+                    data["detailed_analysis"] = data.pop("_raw")
+                    return self._apply_prescore(data, prescore)
+            
+            prompt = f"""
+            Analyze how well this LinkedIn profile matches the given job description:
+            {job_context}
             REQUIRED FORMAT - Please follow this EXACT structure:
 
             OVERALL FIT SCORE: [0-100 number]
@@ -194,18 +394,60 @@ class LinkedInOptimizerAgent:
             Include detailed explanations, quantifiable improvements, and practical implementation steps.
             """
             
-            response = get_ai_response(prompt, self.system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="job_fit", priority=self.priority)
             
             # Parse and structure the response
             job_fit = self._parse_job_fit_response(response, profile_data, job_description)
             
             logger.info("Job fit analysis completed")
-            return job_fit
+            return self._apply_prescore(job_fit, prescore)
             
         except Exception as e:
             logger.error(f"Error analyzing job fit: {e}")
+            if prescore is not None:
+                return self._get_prescore_job_fit(prescore)
             return self._get_fallback_job_fit()
     
+    def rank_jobs(self, profile_data: Dict[str, Any], jobs: Any, top_k: int = 5, use_llm: bool = True) -> List[Dict[str, Any]]:
+        """
+        Rank many jobs for a profile and analyze only the best ones
+        
+        Args:
+            profile_data: LinkedIn profile data
+            jobs: JobIndex, or a mapping/sequence of job descriptions (or job dicts)
+            top_k: Number of jobs to return
+            use_llm: Run the LLM job fit analysis on the top_k jobs
+            
+        Returns:
+            Ranked jobs with local scores and, per job, the job fit analysis
+        """
+        index = jobs if isinstance(jobs, JobIndex) else JobIndex.build(jobs)
+        ranked = index.rank(profile_data, top_k)
+        for result in ranked:
+            description = index.jobs[result["job_id"]]["description"]
+            result["analysis"] = self.analyze_job_fit(profile_data, description, use_llm=use_llm)
+        return ranked
+    
+    def rank_candidates(self, job_description: str, profiles: Any, top_k: int = 10, use_llm: bool = True) -> List[Dict[str, Any]]:
+        """
+        Rank a pool of profiles for one job and analyze only the shortlist
+        
+        Args:
+            job_description: Target job description
+            profiles: ProfileIndex, or a mapping/sequence of standardized profiles
+            top_k: Number of candidates to return
+            use_llm: Run the LLM job fit analysis on the shortlisted candidates
+            
+        Returns:
+            Ranked candidates with explanations and, per candidate, the job fit analysis
+        """
+        index = profiles if isinstance(profiles, ProfileIndex) else ProfileIndex.build(profiles)
+        ranked = index.rank(job_description, top_k)
+        for result in ranked:
+            profile = index.profile(result["profile_id"])
+            result["analysis"] = self.analyze_job_fit(profile, job_description, use_llm=use_llm)
+        return ranked
+    
     def optimize_content(self, profile_data: Dict[str, Any], section: str, target_role: str = "") -> Dict[str, Any]:
         """
         Optimize specific profile sections for better impact
@@ -221,21 +463,36 @@ class LinkedInOptimizerAgent:
         try:
             logger.info(f"Optimizing {section} content...")
             
+            prepared = prepare_profile(profile_data)
             current_content = self._get_section_content(profile_data, section)
             
-            prompt = f"""
-            Optimize this LinkedIn profile {section} for maximum impact:
-
+            content_context = f"""
             CURRENT {section.upper()}:
             {current_content}
 
             PROFILE CONTEXT:
             Name: {profile_data.get('name', 'N/A')}
             Industry: {profile_data.get('industry', 'N/A')}
-            Experience Level: {self._assess_experience_level(profile_data)}
-            Key Skills: {', '.join(profile_data.get('skills', [])[:10])}
+            Experience Level: {prepared.experience_level}
+            Key Skills: {prepared.skills_text(10)}
             {"Target Role: " + target_role if target_role else ""}
-
+            """
+            
+            if self.json_mode:
+                data = self._generate_structured(
+                    f"Optimize this LinkedIn profile {section} for maximum impact. "
+                    f"Make it compelling, professional, and ATS-optimized.\n{content_context}",
+                    ContentOptimizationOutput,
+                    task="content",
+                )
+                if data is not None:
+                    logger.info("Content optimization completed (JSON mode)")
+                    data["detailed_explanation"] = data.pop("_raw")
+                    return {"section": section, "original_content": current_content, **data}
+            
+            prompt = f"""
+            Optimize this LinkedIn profile {section} for maximum impact:
+            {content_context}
             REQUIRED FORMAT - Please follow this EXACT structure:
 
             OPTIMIZED {section.upper()}:
@@ -260,7 +517,7 @@ class LinkedInOptimizerAgent:
             Make it compelling, professional, and ATS-optimized.
             """
             
-            response = get_ai_response(prompt, self.system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="content", priority=self.priority)
             
             # Parse and structure the response
             optimization = self._parse_optimization_response(response, section, current_content)
@@ -285,24 +542,38 @@ class LinkedInOptimizerAgent:
         """
         try:
             logger.info("Generating career guidance...")
+            prepared = prepare_profile(profile_data)
             
-            prompt = f"""
-            Provide comprehensive career guidance for this professional:
-
+            guidance_context = f"""
             CURRENT PROFILE:
             Name: {profile_data.get('name', 'N/A')}
             Headline: {profile_data.get('headline', 'N/A')}
             Industry: {profile_data.get('industry', 'N/A')}
-            Experience Level: {self._assess_experience_level(profile_data)}
+            Experience Level: {prepared.experience_level}
             
             Recent Experience:
-            {self._format_recent_experience(profile_data.get('experience', []))}
+            {prepared.recent_experience_text}
             
-            Skills: {', '.join(profile_data.get('skills', []))}
-            Education: {self._format_education(profile_data.get('education', []))}
+            Skills: {prepared.skills_text()}
+            Education: {prepared.education_text}
             
             {"Career Goals: " + career_goals if career_goals else ""}
-
+            """
+            
+            if self.json_mode:
+                data = self._generate_structured(
+                    f"Provide comprehensive career guidance for this professional.\n{guidance_context}",
+                    CareerGuidanceOutput,
+                    task="guidance",
+                )
+                if data is not None:
+                    logger.info("Career guidance generated (JSON mode)")
+                    data["detailed_guidance"] = data.pop("_raw")
+                    return {"career_stage": prepared.experience_level, **data}
+            
+            prompt = f"""
+            Provide comprehensive career guidance for this professional:
+            {guidance_context}
             REQUIRED FORMAT - Please follow this EXACT structure:
 
             GROWTH OPPORTUNITIES:
@@ -355,7 +626,7 @@ class LinkedInOptimizerAgent:
             Include detailed explanations, specific timelines, quantifiable goals, and measurable outcomes.
             """
             
-            response = get_ai_response(prompt, self.system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="guidance", priority=self.priority)
             
             # Parse and structure the response
             guidance = self._parse_career_guidance_response(response, profile_data)
@@ -367,7 +638,13 @@ class LinkedInOptimizerAgent:
             logger.error(f"Error generating career guidance: {e}")
             return self._get_fallback_career_guidance()
     
-    def chat_response(self, message: str, profile_data: Optional[Dict[str, Any]] = None, context: Optional[List[Dict]] = None) -> str:
+    def chat_response(
+        self,
+        message: str,
+        profile_data: Optional[Dict[str, Any]] = None,
+        context: Optional[List[Dict]] = None,
+        memory: Optional[ConversationMemory] = None,
+    ) -> str:
         """
         Handle conversational interactions about LinkedIn optimization
         
@@ -375,6 +652,8 @@ class LinkedInOptimizerAgent:
             message: User message
             profile_data: LinkedIn profile data (optional)
             context: Previous conversation context (optional)
+            memory: Conversation memory kept across calls (optional, preferred over context);
+                the message and response are recorded in it
             
         Returns:
             AI response to user message
@@ -390,17 +669,15 @@ class LinkedInOptimizerAgent:
                 Name: {profile_data.get('name', 'N/A')}
                 Headline: {profile_data.get('headline', 'N/A')}
                 Industry: {profile_data.get('industry', 'N/A')}
-                Experience Level: {self._assess_experience_level(profile_data)}
+                Experience Level: {prepare_profile(profile_data).experience_level}
                 """
             
-            # Add conversation history
+            # Add conversation history (token-budgeted, older turns summarized)
             conversation_history = ""
-            if context:
-                conversation_history = "\nCONVERSATION HISTORY:\n"
-                for msg in context[-3:]:  # Last 3 messages for context
-                    role = msg.get('role', 'user')
-                    content = msg.get('content', '')
-                    conversation_history += f"{role.title()}: {content}\n"
+            if memory is not None:
+                conversation_history = memory.render()
+            elif context:
+                conversation_history = ConversationMemory.from_messages(context).render()
             
             prompt = f"""
             {context_info}
@@ -412,73 +689,74 @@ class LinkedInOptimizerAgent:
             Be conversational but informative, and offer specific actionable advice when possible.
             """
             
-            response = get_ai_response(prompt, self.system_prompt)
+            def generate() -> str:
+                return get_ai_response(prompt, self.system_prompt, task="chat", priority=self.priority).strip()
+            
+            if conversation_history:
+                # Follow-ups depend on the conversation; only standalone questions are shared
+                response = generate()
+            else:
+                response = cached_answer(message, profile_data, generate)
+            if memory is not None:
+                memory.add("user", message)
+                memory.add("assistant", response)
             
             logger.info("Chat response generated")
-            return response.strip()
+            return response
             
         except Exception as e:
             logger.error(f"Error generating chat response: {e}")
             return "I apologize, but I'm having trouble processing your request right now. Please try rephrasing your question or try again later."
     
+    # Structured (JSON mode) helpers
+    def _generate_structured(self, context: str, schema, task: str) -> Optional[Dict[str, Any]]:
+        """
+        Ask for JSON matching schema, re-asking only for missing or invalid fields.
+        
+        Returns the validated fields plus the raw responses under "_raw", or None
+        if the output still fails validation (callers then use the text format).
+        """
+        kwargs = {"task": task, "response_format": JSON_RESPONSE_FORMAT, "priority": self.priority}
+        if self.json_max_tokens:
+            kwargs["max_tokens"] = self.json_max_tokens
+        
+        response = get_ai_response(f"{context}\n\n{json_instructions(schema)}", self.system_prompt, **kwargs)
+        data, missing = validate_fields(schema, extract_json_object(response))
+        raw = [response]
+        
+        for attempt in range(self.json_max_retries):
+            if not missing:
+                break
+            logger.warning(f"JSON output missing/invalid fields {missing}, re-asking (attempt {attempt + 1})")
+            response = get_ai_response(
+                f"{context}\n\n{json_instructions(schema, missing)}", self.system_prompt, **kwargs
+            )
+            retry_data = extract_json_object(response) or {}
+            data, missing = validate_fields(schema, {**data, **{k: v for k, v in retry_data.items() if k in missing}})
+            raw.append(response)
+        
+        if missing:
+            logger.warning(f"JSON output still invalid for {missing}, falling back to text format")
+            return None
+        data["_raw"] = "\n\n".join(raw)
+        return data
+    
     # Helper methods
     def _format_experience(self, experience: List[Dict]) -> str:
         """Format experience data for prompts"""
-        if not experience:
-            return "No experience listed"
-        
-        formatted = []
-        for exp in experience[:3]:  # Top 3 most recent
-            title = exp.get('title', 'N/A')
-            company = exp.get('company', 'N/A')
-            duration = exp.get('duration', 'N/A')
-            description = exp.get('description', 'No description')[:200] + "..." if len(exp.get('description', '')) > 200 else exp.get('description', 'No description')
-            formatted.append(f"• {title} at {company} ({duration})\n  {description}")
-        
-        return "\n".join(formatted)
+        return format_experience(experience)
     
     def _format_education(self, education: List[Dict]) -> str:
         """Format education data for prompts"""
-        if not education:
-            return "No education listed"
-        
-        formatted = []
-        for edu in education:
-            school = edu.get('school', 'N/A')
-            degree = edu.get('degree', 'N/A')
-            duration = edu.get('duration', 'N/A')
-            formatted.append(f"• {degree} from {school} ({duration})")
-        
-        return "\n".join(formatted)
+        return format_education(education)
     
     def _format_recent_experience(self, experience: List[Dict]) -> str:
         """Format most recent experience"""
-        if not experience:
-            return "No experience listed"
-        
-        recent = experience[0] if experience else {}
-        title = recent.get('title', 'N/A')
-        company = recent.get('company', 'N/A')
-        duration = recent.get('duration', 'N/A')
-        description = recent.get('description', 'No description')[:300] + "..." if len(recent.get('description', '')) > 300 else recent.get('description', 'No description')
-        
-        return f"{title} at {company} ({duration})\n{description}"
+        return format_recent_experience(experience)
     
     def _assess_experience_level(self, profile_data: Dict[str, Any]) -> str:
         """Assess experience level based on profile"""
-        experience = profile_data.get('experience', [])
-        if not experience:
-            return "Entry Level"
-        
-        total_years = len(experience) * 1.5  # Rough estimate
-        if total_years < 2:
-            return "Entry Level"
-        elif total_years < 5:
-            return "Mid Level"
-        elif total_years < 10:
-            return "Senior Level"
-        else:
-            return "Executive Level"
+        return prepare_profile(profile_data).experience_level
     
     def _get_section_content(self, profile_data: Dict[str, Any], section: str) -> str:
         """Get content for specific profile section"""
@@ -487,7 +765,7 @@ class LinkedInOptimizerAgent:
         elif section == "summary":
             return profile_data.get('summary', 'No summary')
         elif section == "experience":
-            return self._format_experience(profile_data.get('experience', []))
+            return prepare_profile(profile_data).experience_text
         else:
             return "Section not found"
     
@@ -524,6 +802,42 @@ class LinkedInOptimizerAgent:
             "detailed_analysis": response
         }
     
+    def _apply_prescore(self, job_fit: Dict[str, Any], prescore: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the LLM's skill figures with the deterministic local ones"""
+        job_fit["skill_match"] = prescore["skill_match"]
+        if prescore["job_skills"]:
+            job_fit["missing_skills"] = prescore["missing_skills"] or ["No missing skills detected"]
+        job_fit["matched_skills"] = prescore["matched_skills"]
+        job_fit["prescore"] = prescore
+        return job_fit
+    
+    def _get_prescore_job_fit(self, prescore: Dict[str, Any]) -> Dict[str, Any]:
+        """Job fit built from the local pre-score alone (no LLM call)"""
+        matched = prescore["matched_skills"]
+        missing = prescore["missing_skills"]
+        return {
+            "fit_score": prescore["fit_score"],
+            "skill_match": prescore["skill_match"],
+            "experience_match": None,
+            "education_match": None,
+            "missing_skills": missing or ["No missing skills detected"],
+            "matched_skills": matched,
+            "advantages": [
+                f"{m['skill']} ({', '.join(m['evidence'])})" for m in matched[:5]
+            ] or ["No overlapping skills detected"],
+            "recommendations": [
+                f"Add {skill} to your skills and show where you have used it" for skill in missing[:5]
+            ] or ["Quantify the impact of your matching skills in each role"],
+            "application_tips": [
+                f"Lead with your {m['skill']} experience" for m in matched[:3]
+            ] or ["Tailor your profile to the job requirements"],
+            "detailed_analysis": (
+                f"Local skill analysis: {prescore['skill_match']}% skill match and "
+                f"{prescore['keyword_match']}% keyword overlap across {prescore['job_skills']} skills in the job description."
+            ),
+            "prescore": prescore,
+        }
+    
     def _parse_optimization_response(self, response: str, section: str, original: str) -> Dict[str, Any]:
         """Parse content optimization response"""
         return {
@@ -568,164 +882,14 @@ class LinkedInOptimizerAgent:
         return 75
     
     def _extract_list_items(self, text: str, keyword: str) -> List[str]:
-        """Extract list items from text with comprehensive pattern matching"""
-        import re
-        
-        logger.info(f"Extracting items for keyword: {keyword}")
-        
-        keyword_variations = [
-            keyword.lower(),
-            keyword.lower().replace('_', ' '),
-            keyword.lower().replace('_', ''),
-            keyword.upper(),
-            keyword.capitalize(),
-            keyword.title()
-        ]
-        
-        # Add specific variations for common keywords
-        if keyword.lower() == 'application':
-            keyword_variations.extend(['application tips', 'tips', 'application strategy'])
-        elif keyword.lower() == 'improvements':
-            keyword_variations.extend(['key improvements', 'improvements made', 'changes'])
-        elif keyword.lower() == 'networking':
-            keyword_variations.extend(['networking strategy', 'network building', 'professional network'])
-        elif keyword.lower() == 'opportunities':
-            keyword_variations.extend(['growth opportunities', 'career opportunities', 'next career moves'])
-        elif keyword.lower() == 'resources':
-            keyword_variations.extend(['learning resources', 'courses', 'certifications', 'training'])
-        elif keyword.lower() == 'action':
-            keyword_variations.extend(['action plan', 'roadmap', 'next steps', 'recommendations'])
-        
-        section_patterns = []
-        for var in keyword_variations:
-            section_patterns.extend([
-                # Pattern 1: Section header followed by ** and then content
-                rf"{re.escape(var)}[:\s]*\n?\*\*\n?(.*?)(?=\n\n|\n[A-Z][A-Z\s]*:|\n\d+\.|$)",
-                # Pattern 2: Section header with content directly after
-                rf"{re.escape(var)}[:\s]*\n?((?:(?!\n\n|\n[A-Z][A-Z\s]*:).)*)",
-                # Pattern 3: Section header in bold
-                rf"\*\*{re.escape(var)}\*\*[:\s]*\n?(.*?)(?=\n\n|\n\*\*[A-Z]|\n\d+\.|$)",
-                # Pattern 4: Section header with markdown
-                rf"#{1,3}\s*{re.escape(var)}[:\s]*\n?(.*?)(?=\n\n|\n#{1,3}|\n\d+\.|$)",
-                # Pattern 5: Section header at start of line
-                rf"^{re.escape(var)}[:\s]*\n?((?:(?!\n\n|\n[A-Z][A-Z\s]*:).)*)",
-                # Pattern 6: Numbered section
-                rf"^\d+\.\s*{re.escape(var)}[:\s]*\n?(.*?)(?=\n\n|\n\d+\.|\n[A-Z]|$)"
-            ])
-        
-        section_text = ""
-        matched_pattern = ""
-        
-        for pattern in section_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL | re.MULTILINE)
-            if match:
-                section_text = match.group(1).strip()
-                matched_pattern = pattern
-                logger.info(f"Found section for {keyword} using pattern: {matched_pattern[:50]}...")
-                logger.info(f"Section content: {section_text[:150]}...")
-                logger.info(f"Full section content: {repr(section_text)}")
-                break
-        
-        if not section_text:
-            logger.warning(f"No section found for keyword: {keyword}, trying broader search...")
-            
+        """Extract list items for a section header via the one-pass section parser"""
+        items = parse_sections(text).get(keyword)
+        if items:
+            logger.info(f"Extracted {len(items)} items for {keyword}")
+            return items[:10]  # Limit to top 10 items
 
-            lines = text.split('\n')
-            for i, line in enumerate(lines):
-                if any(var in line.lower() for var in keyword_variations):
-                    # Found keyword, collect following lines
-                    section_lines = []
-                    start_collecting = False
-                    
-                    # Check if the next line is just ** (common AI formatting)
-                    if i + 1 < len(lines) and lines[i + 1].strip() == '**':
-                        start_collecting = True
-                        start_idx = i + 2  # Skip the ** line
-                    else:
-                        start_collecting = True
-                        start_idx = i + 1
-                    
-                    if start_collecting:
-                        for j in range(start_idx, min(start_idx + 20, len(lines))):  # Look ahead 20 lines max
-                            if j >= len(lines):
-                                break
-                            next_line = lines[j].strip()
-                            if not next_line:
-                                continue
-                            # Stop if we hit another major section
-                            if (re.match(r'^[A-Z][A-Z\s]*:$', next_line) or 
-                                re.match(r'^\*\*[A-Z]', next_line) or
-                                next_line.isupper()):
-                                break
-                            section_lines.append(next_line)
-                    
-                    if section_lines:
-                        section_text = '\n'.join(section_lines)
-                        logger.info(f"Found content using broader search: {section_text[:100]}...")
-                        break
-        
-        # Extract items from the section text
-        items = []
-        if section_text:
-            # Enhanced item extraction patterns
-            item_patterns = [
-                r'^\s*[•\-\*]\s*(.+)',  # Bullet points
-                r'^\s*\d+\.\s*(.+)',    # Numbered lists
-                r'^\s*-\s*(.+)',        # Dash lists
-                r'^\s*\*\s*(.+)',       # Asterisk lists
-                r'^\s*→\s*(.+)',        # Arrow lists
-                r'^\s*▪\s*(.+)',        # Square bullet
-                r'^\s*◦\s*(.+)',        # Circle bullet
-            ]
-            
-            lines = section_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line or len(line) < 3:
-                    continue
-                
-                # Try each pattern
-                item_found = False
-                for pattern in item_patterns:
-                    match = re.match(pattern, line)
-                    if match:
-                        item_content = match.group(1).strip()
-                        if len(item_content) > 5:  # Only substantial content
-                            items.append(item_content)
-                            item_found = True
-                            break
-                
-                # If no pattern matched but it's a substantial line, include it
-                if not item_found and len(line) > 10:
-                    # Skip if it looks like a section header
-                    if not (re.match(r'^[A-Z][A-Z\s]*:$', line) or 
-                           line.startswith('**') and line.endswith('**')):
-                        items.append(line)
-        
-        # Clean up and format items
-        cleaned_items = []
-        for item in items:
-            # Remove markdown formatting
-            cleaned_item = re.sub(r'\*\*(.*?)\*\*', r'\1', item)  # **bold** → bold
-            cleaned_item = re.sub(r'\*(.*?)\*', r'\1', cleaned_item)  # *italic* → italic
-            
-            # Remove extra symbols and clean up
-            cleaned_item = cleaned_item.strip(' -•*:→▪◦')
-            
-            # Remove trailing colons
-            if cleaned_item.endswith(':'):
-                cleaned_item = cleaned_item[:-1].strip()
-            
-            # Only add substantial content
-            if len(cleaned_item) > 8 and not cleaned_item.lower().startswith('detailed'):
-                cleaned_items.append(cleaned_item)
-        
-        if cleaned_items:
-            logger.info(f"Extracted {len(cleaned_items)} items for {keyword}")
-            return cleaned_items[:10]  # Limit to top 10 items
-        else:
-            logger.warning(f"No items extracted for {keyword}, using enhanced fallback")
-            return self._get_fallback_items(keyword, text)
+        logger.warning(f"No items extracted for {keyword}, using enhanced fallback")
+        return self._get_fallback_items(keyword, text)
     
     def _get_fallback_items(self, keyword: str, full_text: str) -> List[str]:
         """Generate contextual fallback items based on keyword and available text"""
@@ -1026,26 +1190,58 @@ class LinkedInOptimizerAgent:
             "profile_completeness": self._calculate_completeness(profile_data)
         }
 
-# Global agent instance
-linkedin_agent = LinkedInOptimizerAgent()
+# Global agent instance, created on first use
+_linkedin_agent: Optional[LinkedInOptimizerAgent] = None
+_linkedin_agent_lock = threading.Lock()
+
+
+def get_linkedin_agent() -> LinkedInOptimizerAgent:
+    """Process-wide LinkedInOptimizerAgent used by the convenience functions"""
+    global _linkedin_agent
+    if _linkedin_agent is None:
+        with _linkedin_agent_lock:
+            if _linkedin_agent is None:
+                _linkedin_agent = LinkedInOptimizerAgent()
+    return _linkedin_agent
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `linkedin_agent` importable without building it at import time
+    if name == "linkedin_agent":
+        return get_linkedin_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Convenience functions
 def analyze_profile(profile_data: Dict[str, Any]) -> Dict[str, Any]:
     """Analyze LinkedIn profile"""
-    return linkedin_agent.analyze_profile(profile_data)
+    return get_linkedin_agent().analyze_profile(profile_data)
 
-def analyze_job_fit(profile_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+def analyze_job_fit(profile_data: Dict[str, Any], job_description: str, use_llm: bool = True) -> Dict[str, Any]:
     """Analyze job fit"""
-    return linkedin_agent.analyze_job_fit(profile_data, job_description)
+    return get_linkedin_agent().analyze_job_fit(profile_data, job_description, use_llm)
+
+def rank_jobs(profile_data: Dict[str, Any], jobs: Any, top_k: int = 5, use_llm: bool = True) -> List[Dict[str, Any]]:
+    """Rank jobs for a profile"""
+    return get_linkedin_agent().rank_jobs(profile_data, jobs, top_k, use_llm)
+
+def rank_candidates(job_description: str, profiles: Any, top_k: int = 10, use_llm: bool = True) -> List[Dict[str, Any]]:
+    """Rank candidate profiles for a job"""
+    return get_linkedin_agent().rank_candidates(job_description, profiles, top_k, use_llm)
 
 def optimize_content(profile_data: Dict[str, Any], section: str, target_role: str = "") -> Dict[str, Any]:
     """Optimize profile content"""
-    return linkedin_agent.optimize_content(profile_data, section, target_role)
+    return get_linkedin_agent().optimize_content(profile_data, section, target_role)
 
 def provide_career_guidance(profile_data: Dict[str, Any], career_goals: str = "") -> Dict[str, Any]:
     """Provide career guidance"""
-    return linkedin_agent.provide_career_guidance(profile_data, career_goals)
+    return get_linkedin_agent().provide_career_guidance(profile_data, career_goals)
 
-def chat_with_agent(message: str, profile_data: Optional[Dict[str, Any]] = None, context: Optional[List[Dict]] = None) -> str:
+def chat_with_agent(
+    message: str,
+    profile_data: Optional[Dict[str, Any]] = None,
+    context: Optional[List[Dict]] = None,
+    memory: Optional[ConversationMemory] = None,
+) -> str:
     """Chat with the LinkedIn optimizer agent"""
-    return linkedin_agent.chat_response(message, profile_data, context)
+    return get_linkedin_agent().chat_response(message, profile_data, context, memory)
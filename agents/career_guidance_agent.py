@@ -1,8 +1,18 @@
 import os
 import json
-from ai_providers import get_ai_response
+from ai_providers import get_ai_response, stream_ai_response
 
 class CareerGuidanceAgent:
+    system_prompt = """You are an expert Career Guidance Advisor. Provide personalized career guidance including:
+1. Growth opportunities and career paths
+2. Learning resources and certifications
+3. Networking strategies and events
+4. Market trends and industry insights
+5. Skill development recommendations
+6. Actionable next steps
+
+Format your response with clear sections for each area of guidance."""
+
     def __init__(self):
         pass
     
@@ -12,18 +22,13 @@ class CareerGuidanceAgent:
         else:
             prompt = user_input
             
-        system_prompt = """You are an expert Career Guidance Advisor. Provide personalized career guidance including:
-1. Growth opportunities and career paths
-2. Learning resources and certifications
-3. Networking strategies and events
-4. Market trends and industry insights
-5. Skill development recommendations
-6. Actionable next steps
-
-Format your response with clear sections for each area of guidance."""
-        
         try:
-            response = get_ai_response(prompt, system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="guidance")
             return response
         except Exception as e:
-            return f"I apologize, but I'm currently unable to provide career guidance due to technical issues. Please try again later. Error: {str(e)}" 
\ No newline at end of file
+            return f"I apologize, but I'm currently unable to provide career guidance due to technical issues. Please try again later. Error: {str(e)}" 
+
+    def stream(self, user_input, on_metrics=None):
+        """Yield the response in chunks as the provider produces them"""
+        prompt = user_input.get("input", "") if isinstance(user_input, dict) else user_input
+        return stream_ai_response(prompt, self.system_prompt, task="guidance", on_metrics=on_metrics)
@@ -1,8 +1,18 @@
 import os
 import json
-from ai_providers import get_ai_response
+from ai_providers import get_ai_response, stream_ai_response
 
 class ChatAgent:
+    system_prompt = """You are a helpful AI assistant specializing in LinkedIn optimization, career advice, and job search strategies. 
+Provide clear, actionable advice and answer questions about:
+- LinkedIn profile optimization
+- Career development
+- Job search strategies
+- Professional networking
+- Industry insights
+
+Be conversational, helpful, and provide specific, practical guidance."""
+
     def __init__(self):
         pass
     
@@ -12,18 +22,13 @@ class ChatAgent:
         else:
             prompt = user_input
             
-        system_prompt = """You are a helpful AI assistant specializing in LinkedIn optimization, career advice, and job search strategies. 
-Provide clear, actionable advice and answer questions about:
-- LinkedIn profile optimization
-- Career development
-- Job search strategies
-- Professional networking
-- Industry insights
-
-Be conversational, helpful, and provide specific, practical guidance."""
-        
         try:
-            response = get_ai_response(prompt, system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="chat")
             return response
         except Exception as e:
-            return f"I apologize, but I'm currently unable to respond due to technical issues. Please try again later. Error: {str(e)}" 
\ No newline at end of file
+            return f"I apologize, but I'm currently unable to respond due to technical issues. Please try again later. Error: {str(e)}" 
+
+    def stream(self, user_input, on_metrics=None):
+        """Yield the response in chunks as the provider produces them"""
+        prompt = user_input.get("input", "") if isinstance(user_input, dict) else user_input
+        return stream_ai_response(prompt, self.system_prompt, task="chat", on_metrics=on_metrics)
@@ -1,8 +1,17 @@
 import os
 import json
-from ai_providers import get_ai_response
+from ai_providers import get_ai_response, stream_ai_response
 
 class ContentOptimizationAgent:
+    system_prompt = """You are an expert Content Optimizer for LinkedIn profiles. Rewrite the given content to:
+1. Improve clarity and impact
+2. Add relevant keywords
+3. Make it more professional and engaging
+4. Optimize for ATS (Applicant Tracking Systems)
+5. Provide alternative versions
+
+Format your response with the original content, optimized version, key improvements, and alternative suggestions."""
+
     def __init__(self):
         pass
     
@@ -12,17 +21,13 @@ class ContentOptimizationAgent:
         else:
             prompt = user_input
             
-        system_prompt = """You are an expert Content Optimizer for LinkedIn profiles. Rewrite the given content to:
-1. Improve clarity and impact
-2. Add relevant keywords
-3. Make it more professional and engaging
-4. Optimize for ATS (Applicant Tracking Systems)
-5. Provide alternative versions
-
-Format your response with the original content, optimized version, key improvements, and alternative suggestions."""
-        
         try:
-            response = get_ai_response(prompt, system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="content")
             return response
         except Exception as e:
-            return f"I apologize, but I'm currently unable to optimize content due to technical issues. Please try again later. Error: {str(e)}" 
\ No newline at end of file
+            return f"I apologize, but I'm currently unable to optimize content due to technical issues. Please try again later. Error: {str(e)}" 
+
+    def stream(self, user_input, on_metrics=None):
+        """Yield the response in chunks as the provider produces them"""
+        prompt = user_input.get("input", "") if isinstance(user_input, dict) else user_input
+        return stream_ai_response(prompt, self.system_prompt, task="content", on_metrics=on_metrics)
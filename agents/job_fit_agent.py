@@ -1,18 +1,9 @@
 import os
 import json
-from ai_providers import get_ai_response
+from ai_providers import get_ai_response, stream_ai_response
 
 class JobFitAgent:
-    def __init__(self):
-        pass
-    
-    def run(self, user_input):
-        if isinstance(user_input, dict):
-            prompt = user_input.get("input", "")
-        else:
-            prompt = user_input
-            
-        system_prompt = """You are an expert Job Fit Analyzer. Analyze the job description and provide:
+    system_prompt = """You are an expert Job Fit Analyzer. Analyze the job description and provide:
 1. Overall fit score (0-100)
 2. Skill match percentage
 3. Experience match percentage
@@ -23,9 +14,23 @@ class JobFitAgent:
 8. Improvement recommendations
 
 Format your response as a comprehensive job fit analysis."""
-        
+
+    def __init__(self):
+        pass
+    
+    def run(self, user_input):
+        if isinstance(user_input, dict):
+            prompt = user_input.get("input", "")
+        else:
+            prompt = user_input
+            
         try:
-            response = get_ai_response(prompt, system_prompt)
+            response = get_ai_response(prompt, self.system_prompt, task="job_fit")
             return response
         except Exception as e:
-            return f"I apologize, but I'm currently unable to analyze job fit due to technical issues. Please try again later. Error: {str(e)}" 
\ No newline at end of file
+            return f"I apologize, but I'm currently unable to analyze job fit due to technical issues. Please try again later. Error: {str(e)}" 
+
+    def stream(self, user_input, on_metrics=None):
+        """Yield the response in chunks as the provider produces them"""
+        prompt = user_input.get("input", "") if isinstance(user_input, dict) else user_input
+        return stream_ai_response(prompt, self.system_prompt, task="job_fit", on_metrics=on_metrics)
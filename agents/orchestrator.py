@@ -1,26 +1,191 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import AppConfig
 from agents.profile_agent import ProfileAnalysisAgent
 from agents.job_fit_agent import JobFitAgent
 from agents.content_optimization_agent import ContentOptimizationAgent
 from agents.career_guidance_agent import CareerGuidanceAgent
 from agents.chat_agent import ChatAgent
+from prepared_profile import prepare_profile
+from semantic_cache import cached_answer
+
+logger = logging.getLogger(__name__)
+
+# Agents are singletons (for session/persistent memory) created on first use
+_agent_classes = {
+    "profile": ProfileAnalysisAgent,
+    "job_fit": JobFitAgent,
+    "content": ContentOptimizationAgent,
+    "guidance": CareerGuidanceAgent,
+    "chat": ChatAgent,
+}
+_agents = {}
+_agents_lock = threading.Lock()
+
+def get_agent(task_type):
+    """The agent for a task type, or None for an unknown one"""
+    agent = _agents.get(task_type)
+    if agent is None and task_type in _agent_classes:
+        with _agents_lock:
+            agent = _agents.get(task_type)
+            if agent is None:
+                agent = _agents[task_type] = _agent_classes[task_type]()
+    return agent
+
+# Module attributes the agents used to be exposed as
+_agent_names = {
+    "profile_agent": "profile",
+    "job_fit_agent": "job_fit",
+    "content_agent": "content",
+    "career_agent": "guidance",
+    "chat_agent": "chat",
+}
 
-# Instantiate agents (singletons for session/persistent memory)
-profile_agent = ProfileAnalysisAgent()
-job_fit_agent = JobFitAgent()
-content_agent = ContentOptimizationAgent()
-career_agent = CareerGuidanceAgent()
-chat_agent = ChatAgent()
+def __getattr__(name):
+    if name in _agent_names:
+        return get_agent(_agent_names[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def route_request(user_input, task_type):
+    agent = get_agent(task_type)
+    if agent is None:
+        return "Unknown task type."
+    return agent.run({"input": user_input})
+
+def route_chat(question, profile=None, memory=None, standalone=False):
+    """
+    Answer a chat question with the conversation so far.
+
+    Standalone questions (the first of a conversation, or quick questions with
+    standalone=True) reuse a cached answer to a near-duplicate question from a
+    similar profile. The question and answer are recorded in memory.
+    """
+    context = ""
+    if profile:
+        context = f"User's profile context: {profile.get('name', '')} - {profile.get('headline', '')}"
+    history = memory.render() if memory is not None and not standalone else ""
+    full_prompt = f"{context}\n\n{history}\nUser question: {question}"
+    def generate():
+        return get_agent("chat").run({"input": full_prompt})
+
+    answer = cached_answer(question, profile, generate) if not history else generate()
+    if memory is not None:
+        memory.add("user", question)
+        memory.add("assistant", answer)
+    return answer
+
+def stream_request(user_input, task_type, on_metrics=None):
+    """Like route_request, but yields the response text in chunks as it arrives"""
+    agent = get_agent(task_type)
+    if agent is None:
+        return iter(["Unknown task type."])
+    return agent.stream({"input": user_input}, on_metrics=on_metrics)
+
+def finalize_stream(response_text, task_type):
+    """Turn fully streamed text into the same result route_request would return"""
     if task_type == "profile":
-        return profile_agent.run({"input": user_input})
-    elif task_type == "job_fit":
-        return job_fit_agent.run({"input": user_input})
-    elif task_type == "content":
-        return content_agent.run({"input": user_input})
-    elif task_type == "guidance":
-        return career_agent.run({"input": user_input})
-    elif task_type == "chat":
-        return chat_agent.run({"input": user_input})
+        return get_agent("profile").parse_response(response_text)
+    return response_text
+
+# ------------- Full report fan-out -------------
+
+_report_executor = None
+_report_executor_lock = threading.Lock()
+
+def _get_report_executor():
+    """Shared bounded pool so concurrent reports cannot exceed max_workers threads"""
+    global _report_executor
+    if _report_executor is None:
+        with _report_executor_lock:
+            if _report_executor is None:
+                _report_executor = ThreadPoolExecutor(
+                    max_workers=AppConfig.FULL_REPORT_CONFIG["max_workers"],
+                    thread_name_prefix="full-report",
+                )
+    return _report_executor
+
+def _build_report_inputs(profile, job_description="", goals=""):
+    """Build the per-agent prompts for a full report from a profile dict"""
+    prepared = prepare_profile(profile)
+    inputs = {
+        "profile": prepared.analysis_block,
+        "content": f"""
+        Content Type: Headline
+        Current Content: {profile.get('headline', '')}
+        Target Role: {goals if goals else 'General improvement'}
+        Profile Context: {prepared.context_line}
+        """,
+        "guidance": f"""
+        {prepared.guidance_block}
+        Career Goals: {goals if goals else 'Not specified'}
+        """,
+        "chat": f"User's profile context: {prepared.context_line}\n\n"
+                f"User question: {AppConfig.FULL_REPORT_CONFIG['chat_question']}",
+    }
+    if job_description:
+        inputs["job_fit"] = f"""
+        {prepared.job_fit_block}
+        Job Description: {job_description}
+        """
+    return inputs
+
+def route_full_report(profile, job_description="", goals="", timeout=None, on_result=None):
+    """
+    Run every independent agent concurrently and combine their results.
+
+    Args:
+        profile: Standardized profile dict
+        job_description: Target job description (job fit is skipped when empty)
+        goals: Career goals used for guidance and content optimization
+        timeout: Per-agent timeout in seconds, or a {task_type: seconds} dict
+        on_result: Optional callback(task_type, result) fired as each agent finishes
+
+    Returns:
+        Dict with "results", "errors", "timings" (seconds per agent) and "elapsed"
+    """
+    inputs = _build_report_inputs(profile, job_description, goals)
+    default_timeout = AppConfig.FULL_REPORT_CONFIG["agent_timeout"]
+    if isinstance(timeout, dict):
+        timeouts = {task: timeout.get(task, default_timeout) for task in inputs}
     else:
-        return "Unknown task type." 
\ No newline at end of file
+        timeouts = {task: timeout or default_timeout for task in inputs}
+
+    executor = _get_report_executor()
+    started = time.perf_counter()
+    futures = {}
+    for task_type, user_input in inputs.items():
+        future = executor.submit(route_request, user_input, task_type)
+        futures[future] = task_type
+
+    report = {"results": {}, "errors": {}, "timings": {}, "elapsed": 0.0}
+    pending = set(futures)
+    while pending:
+        now = time.perf_counter() - started
+        next_deadline = min(timeouts[futures[f]] for f in pending) - now
+        done, pending = wait(pending, timeout=max(next_deadline, 0), return_when=FIRST_COMPLETED)
+        elapsed = time.perf_counter() - started
+        for future in done:
+            task_type = futures[future]
+            report["timings"][task_type] = round(elapsed, 3)
+            try:
+                report["results"][task_type] = future.result()
+            except Exception as e:
+                logger.error(f"{task_type} agent failed in full report: {e}")
+                report["errors"][task_type] = str(e)
+                continue
+            if on_result is not None:
+                on_result(task_type, report["results"][task_type])
+        for future in list(pending):
+            task_type = futures[future]
+            if elapsed >= timeouts[task_type]:
+                future.cancel()
+                pending.discard(future)
+                report["errors"][task_type] = f"Timed out after {timeouts[task_type]:.0f}s"
+                logger.warning(f"{task_type} agent timed out in full report")
+
+    report["elapsed"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Full report finished in {report['elapsed']}s ({len(report['results'])} agents succeeded)")
+    return report
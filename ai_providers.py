@@ -2,48 +2,141 @@
 AI Provider Interface for LinkedIn Profile Optimizer
 Unified interface for free AI services with NVIDIA as primary provider
 """
+import asyncio
+import importlib.util
+import json
 import logging
-from typing import Dict, Any, Optional, List
-from openai import OpenAI
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator, Callable, Tuple
 from config import AppConfig, AIProviderConfig
+from response_cache import ResponseCache, make_cache_key
+from provider_router import ProviderRouter, error_status_code
+from rate_limiter import RateLimiterRegistry, RateLimitExceeded, priority_for
+from singleflight import SingleFlight
+from telemetry import failure_reason, record_llm_call, record_llm_retry
+from token_utils import CHARS_PER_TOKEN, estimate_prompt_tokens, estimate_tokens
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _supported_response_format(config: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the requested response_format if the provider accepts it, else None"""
+    response_format = kwargs.get("response_format")
+    if response_format and config and config.get("supports_response_format"):
+        return response_format
+    return None
+
+
+def _cache_extras(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Generation options beyond temperature/max_tokens that change the output"""
+    return {"response_format": kwargs["response_format"]} if kwargs.get("response_format") else {}
+
+
+def _request_cache_key(prompt: str, system_prompt: Optional[str], kwargs: Dict[str, Any]) -> str:
+    """
+    Provider-independent cache key: prompts plus the generation parameters
+    the caller passed. Router reordering must not turn a repeat into a miss,
+    so the provider (and its default parameters) is left out.
+    """
+    return make_cache_key(
+        system_prompt=system_prompt,
+        prompt=prompt,
+        temperature=kwargs.get("temperature"),
+        max_tokens=kwargs.get("max_tokens"),
+        **_cache_extras(kwargs),
+    )
+
+
+def _default_router(preferred: str) -> Optional[ProviderRouter]:
+    """Router over the configured providers, or None when routing is disabled"""
+    if not AIProviderConfig.ROUTING_CONFIG.get("enabled", True):
+        return None
+    return ProviderRouter.from_config(preferred=preferred)
+
+
+# Token usage reported by the last OpenAI-compatible call on this thread
+_usage = threading.local()
+
+
+def _response_usage(response: Any) -> Optional[Tuple[int, int]]:
+    """(prompt_tokens, completion_tokens) from a chat completion, if the provider reported them"""
+    usage = getattr(response, "usage", None)
+    if usage is None or getattr(usage, "prompt_tokens", None) is None:
+        return None
+    return usage.prompt_tokens, usage.completion_tokens or 0
+
+
+def _trace_call(provider: str, task: Optional[str], start: float, queue_wait: float = 0.0, retries: int = 0,
+                response: Optional[str] = None, error: Any = None, prompt_tokens: int = 0,
+                usage: Optional[Tuple[int, int]] = None, cache_hit: bool = False,
+                ttfb: Optional[float] = None, stream: bool = False) -> None:
+    """Record one provider attempt (or cache hit) in telemetry; token counts are estimated unless reported"""
+    if usage is not None:
+        prompt_tokens, completion_tokens = usage
+    else:
+        completion_tokens = estimate_tokens(response)
+    reason = None
+    if error is not None:
+        reason = failure_reason(error, None if isinstance(error, str) else error_status_code(error))
+    record_llm_call(
+        provider=provider,
+        model=(AppConfig.get_provider_config(provider) or {}).get("model", "unknown"),
+        task=task,
+        status="ok" if error is None else "error",
+        prompt_tokens=0 if cache_hit else prompt_tokens,
+        completion_tokens=0 if cache_hit else completion_tokens,
+        queue_wait_s=queue_wait,
+        ttfb_s=ttfb,
+        latency_s=time.perf_counter() - start,
+        retries=retries,
+        cache_hit=cache_hit,
+        error=reason,
+        stream=stream,
+    )
+
+
+UNAVAILABLE_MESSAGE = (
+    "I apologize, but I'm currently unable to process your request due to technical issues. "
+    "Please try again later."
+)
+
 class AIProvider:
     """Unified interface for free AI providers"""
     
-    def __init__(self, provider: Optional[str] = None):
-        """Initialize AI provider with fallback to best available free option"""
+    def __init__(self, provider: Optional[str] = None, cache: Optional[ResponseCache] = None,
+                 router: Optional[ProviderRouter] = None, rate_limiter: Optional[RateLimiterRegistry] = None):
+        """Initialize AI provider with fallback to best available free option.
+
+        ``provider`` is the preferred provider; with routing enabled each
+        request goes to the fastest healthy provider and returns to the
+        preferred one once it recovers.
+        """
         self.provider = provider or AppConfig.get_best_available_provider()
         self.config = AppConfig.get_provider_config(self.provider)
         self.client = None
+        self.cache = cache if cache is not None else ResponseCache.from_config()
+        self.router = router if router is not None else _default_router(self.provider)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiterRegistry.from_config()
+        self.singleflight = SingleFlight.from_config("llm")
+        self.last_stream_metrics: Optional[Dict[str, Any]] = None
+        self._clients: Dict[str, Any] = {}
+        self._client_lock = threading.Lock()
+        self._http_session = None
+        self._session_lock = threading.Lock()
         self._initialize_client()
     
     def _initialize_client(self):
         """Initialize the appropriate AI client"""
         try:
-            if self.provider == "nvidia":
-                if self.config is None:
-                    logger.error("NVIDIA config is None - cannot initialize client")
-                    return
-                    
-                self.client = OpenAI(
-                    base_url=self.config["base_url"],
-                    api_key=self.config["api_key"]
-                )
-                logger.info("NVIDIA AI client initialized successfully")
-            elif self.provider == "groq":
+            if self.provider in ["nvidia", "groq"]:
                 if self.config is None:
-                    logger.error("Groq config is None - cannot initialize client")
+                    logger.error(f"{self.provider.title()} config is None - cannot initialize client")
                     return
                     
-                self.client = OpenAI(
-                    base_url=self.config["base_url"],
-                    api_key=self.config["api_key"]
-                )
-                logger.info("Groq AI client initialized successfully")
+                self.client = self._get_client(self.provider)
             elif self.provider == "huggingface":
                 # For HuggingFace, we'll use requests directly
                 logger.info("HuggingFace AI client initialized successfully")
@@ -55,31 +148,172 @@ class AIProvider:
                 self.provider = "nvidia"
                 self.config = AppConfig.get_provider_config("nvidia")
                 self._initialize_client()
+
+    def _get_client(self, provider: str):
+        """Return the OpenAI-compatible client for NVIDIA/Groq, creating it once"""
+        client = self._clients.get(provider)
+        if client is None:
+            # Imported on first use: the openai package dominates this module's import time
+            from openai import OpenAI
+
+            with self._client_lock:
+                client = self._clients.get(provider)
+                if client is None:
+                    config = self._config_for(provider)
+                    if config is None:
+                        raise ValueError(f"No configuration for provider: {provider}")
+                    client = OpenAI(base_url=config["base_url"], api_key=config["api_key"])
+                    self._clients[provider] = client
+                    logger.info(f"{provider.title()} AI client initialized successfully")
+        return client
+
+    def _config_for(self, provider: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Config of a provider (the preferred provider's when not given)"""
+        if provider is None or provider == self.provider:
+            return self.config
+        return AppConfig.get_provider_config(provider)
+
+    def _candidates(self) -> List[str]:
+        """Providers to try for one request, best first"""
+        if self.router is not None:
+            return self.router.candidates()
+        # Routing disabled: preferred provider, then NVIDIA as the fallback
+        return [self.provider] + (["nvidia"] if self.provider != "nvidia" else [])
+
+    def _record(self, provider: str, start: float, error: Optional[Exception] = None,
+                response: Optional[str] = None) -> None:
+        """Feed a request outcome into the router and the provider's rate limiter"""
+        if self.rate_limiter is not None:
+            limiter = self.rate_limiter.get(provider)
+            if error is None:
+                limiter.record_usage(estimate_tokens(response))
+            elif error_status_code(error) == 429:
+                limiter.throttle()
+        if self.router is None:
+            return
+        latency = time.perf_counter() - start
+        if error is None:
+            self.router.record_success(provider, latency)
+        else:
+            self.router.record_failure(provider, latency, error)
+
+    def _prefer_unthrottled(self, candidates: List[str], tokens: int) -> List[str]:
+        """If the lead provider is at its client-side limit, lead with one that has capacity"""
+        if self.rate_limiter is None or len(candidates) < 2:
+            return candidates
+        if self.rate_limiter.get(candidates[0]).has_capacity(tokens):
+            return candidates
+        for provider in candidates[1:]:
+            if self.rate_limiter.get(provider).has_capacity(tokens):
+                return [provider] + [p for p in candidates if p != provider]
+        return candidates
+
+    def _wait_for_capacity(self, provider: str, tokens: int, priority: str) -> bool:
+        """Block in the provider's priority queue; False if the request was not admitted"""
+        if self.rate_limiter is None:
+            return True
+        try:
+            waited = self.rate_limiter.get(provider).acquire(tokens, priority)
+        except RateLimitExceeded as e:
+            logger.warning(f"{provider} request not admitted ({priority}): {e}")
+            return False
+        if waited > 0.05:
+            logger.info(f"Waited {waited:.2f}s for {provider} rate limit ({priority})")
+        return True
     
     def generate_response(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-        """Generate AI response using the configured provider"""
-        try:
-            if self.provider in ["nvidia", "groq"]:
-                return self._generate_openai_compatible(prompt, system_prompt or "", **kwargs)
-            elif self.provider == "huggingface":
-                return self._generate_huggingface(prompt, system_prompt or "", **kwargs)
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
-                
-        except Exception as e:
-            logger.error(f"Error generating response with {self.provider}: {e}")
-            # Try fallback to NVIDIA if not already using it
-            if self.provider != "nvidia":
-                logger.info("Falling back to NVIDIA...")
-                self.provider = "nvidia"
-                self.config = AppConfig.get_provider_config("nvidia")
-                self._initialize_client()
-                return self._generate_openai_compatible(prompt, system_prompt or "", **kwargs)
-            else:
-                return f"I apologize, but I'm currently unable to process your request due to technical issues. Please try again later."
+        """Generate AI response using the best available provider.
+
+        Pass ``task`` to pick a per-task cache TTL and ``use_cache=False`` to
+        bypass the response cache for a single call. ``priority``
+        ("interactive", "default" or "batch") orders requests waiting on the
+        client-side rate limit; chat tasks default to interactive. A cacheable
+        request identical to one already in flight waits for that request's
+        answer instead of being sent again.
+        """
+        task = kwargs.pop("task", None)
+        use_cache = kwargs.pop("use_cache", True)
+        priority = priority_for(task, kwargs.pop("priority", None))
+        request_start = time.perf_counter()
+        candidates = self._candidates()
+        use_cache = self.cache is not None and use_cache
+        if use_cache:
+            lead = candidates[0] if candidates else None
+            cache_key = self._cache_key(prompt, system_prompt, **kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Response cache hit ({task or 'untyped'} request)")
+                _trace_call(lead or self.provider, task, request_start, cache_hit=True)
+                return cached
+            if self.singleflight is not None:
+                response, shared = self.singleflight.do(
+                    cache_key, self._generate_uncached, prompt, system_prompt, task, priority, candidates, use_cache, **kwargs
+                )
+                if shared:
+                    logger.info(f"Shared the answer of an identical in-flight {task or 'untyped'} request")
+                return response
+        return self._generate_uncached(prompt, system_prompt, task, priority, candidates, use_cache, **kwargs)
+
+    def _generate_uncached(self, prompt: str, system_prompt: Optional[str], task: Optional[str], priority: str,
+                           candidates: List[str], use_cache: bool, **kwargs) -> str:
+        """Try the candidate providers in order and cache the first answer"""
+        prompt_tokens = estimate_prompt_tokens(prompt, system_prompt)
+        retries = 0
+        failed = None  # provider of the last failed attempt, charged a retry once another is tried
+        for provider in self._prefer_unthrottled(candidates, prompt_tokens):
+            if failed is not None:
+                record_llm_retry(failed)
+                failed = None
+            wait_start = time.perf_counter()
+            if not self._wait_for_capacity(provider, prompt_tokens, priority):
+                _trace_call(provider, task, wait_start, time.perf_counter() - wait_start, retries, error="rate_limited")
+                retries += 1
+                failed = provider
+                continue
+            queue_wait = time.perf_counter() - wait_start
+            if self.router is not None and not self.router.acquire(provider):
+                continue
+            start = time.perf_counter()
+            _usage.value = None
+            try:
+                response = self._dispatch(prompt, system_prompt or "", provider=provider, **kwargs)
+            except Exception as e:
+                logger.error(f"Error generating response with {provider}: {e}")
+                self._record(provider, start, error=e)
+                _trace_call(provider, task, start, queue_wait, retries, error=e, prompt_tokens=prompt_tokens)
+                retries += 1
+                failed = provider
+                continue
+            self._record(provider, start, response=response)
+            _trace_call(provider, task, start, queue_wait, retries, response=response,
+                        prompt_tokens=prompt_tokens, usage=_usage.value)
+            if provider != candidates[0]:
+                logger.info(f"Request served by fallback provider {provider}")
+            if use_cache and response:
+                self.cache.set(self._cache_key(prompt, system_prompt, **kwargs), response, task=task)
+            return response
+
+        logger.error(f"No AI provider answered the {task or 'untyped'} request after {retries} failed attempts")
+        return UNAVAILABLE_MESSAGE
+
+    def _dispatch(self, prompt: str, system_prompt: str = "", provider: Optional[str] = None, **kwargs) -> str:
+        """Send the request to one provider without caching"""
+        provider = provider or self.provider
+        if provider in ["nvidia", "groq"]:
+            return self._generate_openai_compatible(prompt, system_prompt, provider=provider, **kwargs)
+        elif provider == "huggingface":
+            return self._generate_huggingface(prompt, system_prompt, **kwargs)
+        else:
+            raise ValueError(f"Unsupported provider: {provider}")
+
+    def _cache_key(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        """Build the cache key from the prompts and the generation parameters passed in"""
+        return _request_cache_key(prompt, system_prompt, kwargs)
     
-    def _generate_openai_compatible(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
-        """Generate response using OpenAI-compatible API (NVIDIA, Groq)"""
+    def _build_openai_params(self, prompt: str, system_prompt: str = "", stream: bool = False,
+                             provider: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Build chat.completions parameters for OpenAI-compatible APIs"""
+        config = self._config_for(provider)
         messages = []
         # For NVIDIA, do not use 'system' role, only 'user' for the first message
         # If you want to include a system prompt, prepend it to the user content
@@ -89,50 +323,100 @@ class AIProvider:
             user_content = prompt
         messages.append({"role": "user", "content": user_content})
         # Merge kwargs with default config
-        generation_params = {
-            "model": self.config["model"] if self.config else None,
+        params = {
+            "model": config["model"] if config else None,
             "messages": messages,
-            "max_tokens": kwargs.get("max_tokens", self.config["max_tokens"] if self.config else None),
-            "temperature": kwargs.get("temperature", self.config["temperature"] if self.config else None),
-            "stream": False
+            "max_tokens": kwargs.get("max_tokens", config["max_tokens"] if config else None),
+            "temperature": kwargs.get("temperature", config["temperature"] if config else None),
+            "stream": stream
         }
+        response_format = _supported_response_format(config, kwargs)
+        if response_format:
+            params["response_format"] = response_format
+        return params
+
+    def _generate_openai_compatible(self, prompt: str, system_prompt: str = "", provider: Optional[str] = None, **kwargs) -> str:
+        """Generate response using OpenAI-compatible API (NVIDIA, Groq)"""
+        provider = provider or self.provider
+        generation_params = self._build_openai_params(prompt, system_prompt, stream=False, provider=provider, **kwargs)
         try:
-            if self.client is None:
-                raise Exception("Client not initialized")
-            response = self.client.chat.completions.create(**generation_params)
+            response = self._get_client(provider).chat.completions.create(**generation_params)
+            _usage.value = _response_usage(response)
             return response.choices[0].message.content.strip()
         except Exception as e:
-            logger.error(f"{self.provider.title()} API error: {e}")
+            logger.error(f"{provider.title()} API error: {e}")
             raise
-    
-    def _generate_huggingface(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
-        """Generate response using HuggingFace Inference API"""
-        import requests
-        
+
+    def _stream_openai_compatible(self, prompt: str, system_prompt: str = "", provider: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream response deltas over OpenAI-compatible SSE (NVIDIA, Groq)"""
+        provider = provider or self.provider
+        generation_params = self._build_openai_params(prompt, system_prompt, stream=True, provider=provider, **kwargs)
+        client = self._get_client(provider)
+        try:
+            for chunk in client.chat.completions.create(**generation_params):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except Exception as e:
+            logger.error(f"{provider.title()} streaming API error: {e}")
+            raise
+
+    def _get_http_session(self):
+        """Return a shared keep-alive requests session for HuggingFace calls"""
+        if self._http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            with self._session_lock:
+                if self._http_session is None:
+                    pool = AIProviderConfig.HTTP_POOL_CONFIG
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=4,
+                        pool_maxsize=pool["max_keepalive_connections"],
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._http_session = session
+        return self._http_session
+
+    def _build_huggingface_request(self, prompt: str, system_prompt: str = "", stream: bool = False, **kwargs) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build URL, headers and payload for the HuggingFace Inference API"""
         # Combine system prompt and user prompt
         full_prompt = prompt
         if system_prompt:
             full_prompt = f"{system_prompt}\n\nUser: {prompt}\nAssistant:"
-        if not self.config or 'api_key' not in self.config:
+        config = self._config_for("huggingface")
+        if not config or 'api_key' not in config:
             raise ValueError("Missing API key configuration for HuggingFace")
             
         headers = {
-            "Authorization": f"Bearer {self.config['api_key']}",
+            "Authorization": f"Bearer {config['api_key']}",
             "Content-Type": "application/json"
         }
         
         payload = {
             "inputs": full_prompt,
             "parameters": {
-                "max_new_tokens": kwargs.get("max_tokens", self.config["max_tokens"]),
-                "temperature": kwargs.get("temperature", self.config["temperature"]),
+                "max_new_tokens": kwargs.get("max_tokens", config["max_tokens"]),
+                "temperature": kwargs.get("temperature", config["temperature"]),
                 "return_full_text": False
             }
         }
+        if stream:
+            payload["stream"] = True
+
+        return f"{config['base_url']}/{config['model']}", headers, payload
+
+    def _generate_huggingface(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        """Generate response using HuggingFace Inference API"""
+        url, headers, payload = self._build_huggingface_request(prompt, system_prompt, **kwargs)
         
         try:
-            response = requests.post(
-                f"{self.config['base_url']}/{self.config['model']}",
+            response = self._get_http_session().post(
+                url,
                 headers=headers,
                 json=payload,
                 timeout=30
@@ -150,6 +434,159 @@ class AIProvider:
         except Exception as e:
             logger.error(f"HuggingFace API error: {e}")
             raise
+
+    def _stream_huggingface(self, prompt: str, system_prompt: str = "", **kwargs) -> Iterator[str]:
+        """Stream tokens from the HuggingFace Inference API using chunked reads.
+
+        Text-generation endpoints answer ``stream: true`` with SSE ``data:``
+        lines; models that don't support streaming return one JSON body,
+        which is yielded as a single chunk.
+        """
+        url, headers, payload = self._build_huggingface_request(prompt, system_prompt, stream=True, **kwargs)
+
+        try:
+            with self._get_http_session().post(url, headers=headers, json=payload, timeout=30, stream=True) as response:
+                if response.status_code != 200:
+                    raise Exception(f"HTTP {response.status_code}: {response.text}")
+
+                if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                    result = response.json()
+                    if isinstance(result, list) and len(result) > 0:
+                        yield result[0].get("generated_text", "").strip()
+                    else:
+                        yield str(result).strip()
+                    return
+
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    token = event.get("token") or {}
+                    if token.get("special"):
+                        continue
+                    text = token.get("text")
+                    if text:
+                        yield text
+        except Exception as e:
+            logger.error(f"HuggingFace streaming API error: {e}")
+            raise
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None,
+                        on_metrics: Optional[Callable[[Dict[str, Any]], None]] = None, **kwargs) -> Iterator[str]:
+        """Yield the response incrementally as text chunks.
+
+        Accepts the same ``task``/``use_cache`` options as generate_response.
+        When the stream finishes, time-to-first-token and total latency are
+        logged, stored on ``last_stream_metrics`` and passed to ``on_metrics``.
+        A cache hit is yielded as a single chunk.
+        """
+        task = kwargs.pop("task", None)
+        use_cache = kwargs.pop("use_cache", True)
+        priority = priority_for(task, kwargs.pop("priority", None))
+        prompt_tokens = estimate_prompt_tokens(prompt, system_prompt)
+        candidates = self._prefer_unthrottled(self._candidates(), prompt_tokens)
+        provider = candidates[0] if candidates else self.provider
+        metrics: Dict[str, Any] = {
+            "provider": provider,
+            "model": (self._config_for(provider) or {}).get("model", "unknown"),
+            "task": task,
+            "cache_hit": False,
+            "ttft_s": None,
+            "total_s": None,
+            "chunks": 0,
+            "chars": 0,
+            "queue_wait_s": 0.0,
+        }
+        start = time.perf_counter()
+        chunks: List[str] = []
+
+        def emit(chunk: str) -> str:
+            if metrics["ttft_s"] is None:
+                metrics["ttft_s"] = time.perf_counter() - start
+            metrics["chunks"] += 1
+            metrics["chars"] += len(chunk)
+            chunks.append(chunk)
+            return chunk
+
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._cache_key(prompt, system_prompt, **kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                metrics["cache_hit"] = True
+                yield emit(cached)
+                self._finish_stream(metrics, start, on_metrics)
+                return
+
+        wait_start = time.perf_counter()
+        acquired = (
+            bool(candidates)
+            and self._wait_for_capacity(provider, prompt_tokens, priority)
+            and (self.router is None or self.router.acquire(provider))
+        )
+        metrics["queue_wait_s"] = time.perf_counter() - wait_start
+        metrics["prompt_tokens"] = prompt_tokens
+        try:
+            if not acquired:
+                raise RuntimeError("No provider available for streaming")
+            if provider in ["nvidia", "groq"]:
+                stream = self._stream_openai_compatible(prompt, system_prompt or "", provider=provider, **kwargs)
+            elif provider == "huggingface":
+                stream = self._stream_huggingface(prompt, system_prompt or "", **kwargs)
+            else:
+                raise ValueError(f"Unsupported provider: {provider}")
+            for chunk in stream:
+                yield emit(chunk)
+            self._record(provider, start, response="".join(chunks))
+        except GeneratorExit:
+            # Consumer stopped reading; the provider itself was answering fine
+            self._record(provider, start, response="".join(chunks))
+            raise
+        except Exception as e:
+            if acquired:
+                self._record(provider, start, error=e)
+            if chunks:
+                # Part of the answer is already on screen; stop rather than repeat it
+                logger.error(f"Stream from {provider} interrupted: {e}")
+                metrics["error"] = str(e)
+                metrics["error_reason"] = failure_reason(e, error_status_code(e))
+            else:
+                logger.error(f"Streaming with {provider} failed, using blocking request: {e}")
+                # The blocking request records its own telemetry
+                _trace_call(provider, task, start, metrics["queue_wait_s"], error=e,
+                            prompt_tokens=prompt_tokens, stream=True)
+                metrics["fallback"] = True
+                yield emit(self.generate_response(prompt, system_prompt, task=task, use_cache=use_cache,
+                                                  priority=priority, **kwargs))
+                self._finish_stream(metrics, start, on_metrics)
+                return
+
+        if cache_key is not None and chunks and "error" not in metrics:
+            self.cache.set(cache_key, "".join(chunks).strip(), task=task)
+        self._finish_stream(metrics, start, on_metrics)
+
+    def _finish_stream(self, metrics: Dict[str, Any], start: float,
+                       on_metrics: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        """Record end-of-stream latency metrics"""
+        metrics["total_s"] = time.perf_counter() - start
+        ttft = metrics["ttft_s"] if metrics["ttft_s"] is not None else metrics["total_s"]
+        logger.info(
+            f"Streamed {metrics['chars']} chars from {metrics['provider']} "
+            f"(ttft={ttft:.3f}s, total={metrics['total_s']:.3f}s, cache_hit={metrics['cache_hit']})"
+        )
+        self.last_stream_metrics = metrics
+        if not metrics.get("fallback"):
+            completion_tokens = -(-metrics["chars"] // CHARS_PER_TOKEN)
+            _trace_call(
+                metrics["provider"], metrics["task"], start, metrics["queue_wait_s"],
+                error=metrics.get("error_reason"), usage=(metrics.get("prompt_tokens", 0), completion_tokens),
+                cache_hit=metrics["cache_hit"], ttfb=metrics["ttft_s"], stream=True,
+            )
+        if on_metrics is not None:
+            on_metrics(metrics)
     
     def get_provider_info(self) -> Dict[str, Any]:
         """Get information about the current provider"""
@@ -161,20 +598,309 @@ class AIProvider:
                 "max_tokens": 0
             }
         
-        return {
+        info = {
             "provider": self.provider,
             "model": self.config.get("model", "unknown"),
             "status": "active" if self.client else "inactive",
             "max_tokens": self.config.get("max_tokens", 0)
         }
+        if self.router is not None:
+            info["routing"] = self.router.get_status()
+        return info
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get response cache hit/miss counters"""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get per-provider queue depth and rate-limit wait times"""
+        if self.rate_limiter is None:
+            return {"enabled": False}
+        return {"enabled": True, "providers": self.rate_limiter.get_stats()}
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get counts of requests sent vs. served from an identical in-flight request"""
+        if self.singleflight is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.singleflight.get_stats()}
+
+# Global AI provider instance, created on first use so importing this module
+# (every agent does) does not build clients, caches and rate limiters
+_ai_provider: Optional[AIProvider] = None
+_ai_provider_lock = threading.Lock()
+
+
+def get_ai_provider() -> AIProvider:
+    """Process-wide AIProvider shared by the agents and the app"""
+    global _ai_provider
+    if _ai_provider is None:
+        with _ai_provider_lock:
+            if _ai_provider is None:
+                _ai_provider = AIProvider()
+    return _ai_provider
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from ai_providers import ai_provider` working without an eager instance
+    if name == "ai_provider":
+        return get_ai_provider()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class AsyncAIProvider:
+    """Asyncio interface to the free AI providers over pooled HTTP connections.
+
+    Each provider gets one long-lived ``httpx.AsyncClient`` (keep-alive, HTTP/2
+    when available, limits from ``AIProviderConfig.HTTP_POOL_CONFIG``), so many
+    in-flight requests share a few connections instead of a thread each.
+    Use ``async with AsyncAIProvider() as provider:`` or call ``aclose()``.
+    """
+
+    def __init__(self, provider: Optional[str] = None, cache: Optional[ResponseCache] = None,
+                 pool_config: Optional[Dict[str, Any]] = None, router: Optional[ProviderRouter] = None,
+                 rate_limiter: Optional[RateLimiterRegistry] = None):
+        """Initialize the async provider; clients are created on first use.
+
+        By default the response cache, provider router and rate limiters are
+        shared with the process-wide provider (``get_ai_provider()``), so sync
+        and async traffic feed the same health data and count against the
+        same provider limits.
+        """
+        self.provider = provider or AppConfig.get_best_available_provider()
+        self.config = AppConfig.get_provider_config(self.provider)
+        shared = get_ai_provider()
+        self.cache = cache if cache is not None else shared.cache
+        if router is None and self.provider == shared.provider:
+            router = shared.router
+        self.router = router if router is not None else _default_router(self.provider)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else shared.rate_limiter
+        self.pool_config = {**AIProviderConfig.HTTP_POOL_CONFIG, **(pool_config or {})}
+        self._http_clients: Dict[str, Any] = {}
+        self._openai_clients: Dict[str, Any] = {}
+
+    async def __aenter__(self) -> "AsyncAIProvider":
+        return self
 
-# Global AI provider instance
-ai_provider = AIProvider()
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _http2_enabled(self) -> bool:
+        """HTTP/2 needs the optional h2 package"""
+        if not self.pool_config.get("http2"):
+            return False
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            self.pool_config["http2"] = False
+            return False
+        return True
+
+    def _get_http_client(self, provider: str, headers: Optional[Dict[str, str]] = None):
+        """Return the pooled httpx client for a provider, creating it once"""
+        client = self._http_clients.get(provider)
+        if client is None:
+            import httpx
+
+            pool = self.pool_config
+            client = httpx.AsyncClient(
+                headers=headers,
+                http2=self._http2_enabled(),
+                limits=httpx.Limits(
+                    max_connections=pool["max_connections"],
+                    max_keepalive_connections=pool["max_keepalive_connections"],
+                    keepalive_expiry=pool["keepalive_expiry"],
+                ),
+                timeout=httpx.Timeout(pool["timeout"], connect=pool["connect_timeout"]),
+            )
+            self._http_clients[provider] = client
+        return client
+
+    def _get_openai_client(self, provider: str):
+        """Return the AsyncOpenAI client for NVIDIA/Groq on top of the pooled httpx client"""
+        client = self._openai_clients.get(provider)
+        if client is None:
+            from openai import AsyncOpenAI
+
+            config = AppConfig.get_provider_config(provider)
+            if config is None:
+                raise ValueError(f"No configuration for provider: {provider}")
+            client = AsyncOpenAI(
+                base_url=config["base_url"],
+                api_key=config["api_key"],
+                http_client=self._get_http_client(provider),
+            )
+            self._openai_clients[provider] = client
+            logger.info(f"{provider.title()} async AI client initialized successfully")
+        return client
+
+    async def generate_response(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        """Generate AI response; same options and cache semantics as AIProvider"""
+        task = kwargs.pop("task", None)
+        use_cache = kwargs.pop("use_cache", True) and self.cache is not None
+        priority = priority_for(task, kwargs.pop("priority", None))
+        if self.router is not None:
+            candidates = self.router.candidates()
+        else:
+            candidates = [self.provider] + (["nvidia"] if self.provider != "nvidia" else [])
+        request_start = time.perf_counter()
+        if use_cache:
+            lead = candidates[0] if candidates else self.provider
+            cached = self.cache.get(self._cache_key(prompt, system_prompt, **kwargs))
+            if cached is not None:
+                _trace_call(lead, task, request_start, cache_hit=True)
+                return cached
+
+        prompt_tokens = estimate_prompt_tokens(prompt, system_prompt)
+        retries = 0
+        failed = None  # provider of the last failed attempt, charged a retry once another is tried
+        for provider in candidates:
+            if failed is not None:
+                record_llm_retry(failed)
+                failed = None
+            wait_start = time.perf_counter()
+            if not await self._wait_for_capacity(provider, prompt_tokens, priority):
+                _trace_call(provider, task, wait_start, time.perf_counter() - wait_start, retries, error="rate_limited")
+                retries += 1
+                failed = provider
+                continue
+            queue_wait = time.perf_counter() - wait_start
+            if self.router is not None and not self.router.acquire(provider):
+                continue
+            limiter = self.rate_limiter.get(provider) if self.rate_limiter is not None else None
+            start = time.perf_counter()
+            try:
+                response = await self._dispatch(provider, prompt, system_prompt or "", **kwargs)
+            except Exception as e:
+                logger.error(f"Error generating async response with {provider}: {e}")
+                if limiter is not None and error_status_code(e) == 429:
+                    limiter.throttle()
+                if self.router is not None:
+                    self.router.record_failure(provider, time.perf_counter() - start, e)
+                _trace_call(provider, task, start, queue_wait, retries, error=e, prompt_tokens=prompt_tokens)
+                retries += 1
+                failed = provider
+                continue
+            if limiter is not None:
+                limiter.record_usage(estimate_tokens(response))
+            if self.router is not None:
+                self.router.record_success(provider, time.perf_counter() - start)
+            _trace_call(provider, task, start, queue_wait, retries, response=response, prompt_tokens=prompt_tokens)
+            if use_cache and response:
+                self.cache.set(self._cache_key(prompt, system_prompt, **kwargs), response, task=task)
+            return response
+
+        return UNAVAILABLE_MESSAGE
+
+    async def _wait_for_capacity(self, provider: str, tokens: int, priority: str) -> bool:
+        """Wait without blocking the event loop until the provider's limiter admits the request"""
+        if self.rate_limiter is None:
+            return True
+        limiter = self.rate_limiter.get(provider)
+        max_wait = limiter.max_wait.get(priority)
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+        while not limiter.try_acquire(tokens):
+            delay = min(max(limiter.wait_time(tokens), 0.05), 1.0)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                logger.warning(f"{provider} async request not admitted ({priority}): waited {max_wait:g}s")
+                return False
+            await asyncio.sleep(delay)
+        return True
+
+    async def _dispatch(self, provider: str, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        """Send the request to a provider without caching"""
+        if provider in ["nvidia", "groq"]:
+            return await self._generate_openai_compatible(provider, prompt, system_prompt, **kwargs)
+        elif provider == "huggingface":
+            return await self._generate_huggingface(prompt, system_prompt, **kwargs)
+        else:
+            raise ValueError(f"Unsupported provider: {provider}")
+
+    def _cache_key(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        return _request_cache_key(prompt, system_prompt, kwargs)
+
+    async def _generate_openai_compatible(self, provider: str, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        """Generate response using the async OpenAI-compatible API (NVIDIA, Groq)"""
+        config = AppConfig.get_provider_config(provider) or {}
+        user_content = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+        params = {
+            "model": config.get("model"),
+            "messages": [{"role": "user", "content": user_content}],
+            "max_tokens": kwargs.get("max_tokens", config.get("max_tokens")),
+            "temperature": kwargs.get("temperature", config.get("temperature")),
+            "stream": False,
+        }
+        response_format = _supported_response_format(config, kwargs)
+        if response_format:
+            params["response_format"] = response_format
+        try:
+            response = await self._get_openai_client(provider).chat.completions.create(**params)
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"{provider.title()} async API error: {e}")
+            raise
+
+    async def _generate_huggingface(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        """Generate response using the HuggingFace Inference API over the pooled client"""
+        config = AppConfig.get_provider_config("huggingface")
+        if not config or not config.get("api_key"):
+            raise ValueError("Missing API key configuration for HuggingFace")
+
+        full_prompt = f"{system_prompt}\n\nUser: {prompt}\nAssistant:" if system_prompt else prompt
+        client = self._get_http_client(
+            "huggingface", headers={"Authorization": f"Bearer {config['api_key']}"}
+        )
+        try:
+            response = await client.post(
+                f"{config['base_url']}/{config['model']}",
+                json={
+                    "inputs": full_prompt,
+                    "parameters": {
+                        "max_new_tokens": kwargs.get("max_tokens", config["max_tokens"]),
+                        "temperature": kwargs.get("temperature", config["temperature"]),
+                        "return_full_text": False,
+                    },
+                },
+            )
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}: {response.text}")
+            result = response.json()
+            if isinstance(result, list) and len(result) > 0:
+                return result[0].get("generated_text", "").strip()
+            return str(result).strip()
+        except Exception as e:
+            logger.error(f"HuggingFace async API error: {e}")
+            raise
+
+    async def aclose(self) -> None:
+        """Close every pooled connection"""
+        for client in self._openai_clients.values():
+            await client.close()
+        for client in self._http_clients.values():
+            await client.aclose()
+        self._openai_clients.clear()
+        self._http_clients.clear()
 
 def get_ai_response(prompt: str, system_prompt: str | None = None, **kwargs) -> str:
     """Convenience function to get AI response"""
-    return ai_provider.generate_response(prompt, system_prompt, **kwargs)
+    return get_ai_provider().generate_response(prompt, system_prompt, **kwargs)
+
+def stream_ai_response(prompt: str, system_prompt: str | None = None, **kwargs) -> Iterator[str]:
+    """Convenience function to stream an AI response chunk by chunk"""
+    return get_ai_provider().generate_stream(prompt, system_prompt, **kwargs)
 
 def get_provider_status() -> Dict[str, Any]:
     """Get current provider status"""
-    return ai_provider.get_provider_info() 
\ No newline at end of file
+    return get_ai_provider().get_provider_info()
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Get response cache statistics"""
+    return get_ai_provider().get_cache_stats()
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """Get rate limiter queue and wait-time statistics"""
+    return get_ai_provider().get_rate_limit_stats()
+
+def get_llm_coalescing_stats() -> Dict[str, Any]:
+    """Get in-flight request coalescing statistics"""
+    return get_ai_provider().get_coalescing_stats()
@@ -0,0 +1,431 @@
+"""
+Asynchronous Apify runs for LinkedIn Profile Optimizer
+Starts task runs without waiting for them, tracks them by polling with
+exponential backoff (or by webhook, when a receiver is reachable), and
+streams dataset items as soon as a run succeeds. Runs only hold a slot of
+max_concurrent_runs while they execute, so dozens of scrapes overlap on one
+event loop instead of blocking a thread each in client.task(...).call().
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import secrets
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+
+from config import AppConfig
+from linkedin_scraper import DirectLinkedInScraper
+from telemetry import failure_reason, record_apify_run
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED"}
+WEBHOOK_EVENTS = ["ACTOR.RUN.SUCCEEDED", "ACTOR.RUN.FAILED", "ACTOR.RUN.TIMED_OUT", "ACTOR.RUN.ABORTED"]
+
+
+class ApifyRunError(Exception):
+    """A run did not succeed (failed, timed out, aborted or never started)"""
+
+    def __init__(self, message: str, run: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.run = run or {}
+
+
+class WebhookReceiver:
+    """
+    Local HTTP endpoint for Apify run webhooks. Runs started by an engine
+    with a receiver register an ad-hoc webhook pointing at url, and waiting
+    for them wakes up when the event arrives instead of at the next poll.
+    The path carries a random token, so only requests that know it count.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, public_url: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.path = f"/apify-webhook/{secrets.token_urlsafe(16)}"
+        self.events = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._received: Dict[str, Dict[str, Any]] = {}
+
+    async def start(self) -> "WebhookReceiver":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Apify webhook receiver listening on {self.host}:{self.port}")
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        base = self.public_url.rstrip("/") if self.public_url else f"http://{self.host}:{self.port}"
+        return base + self.path
+
+    def webhooks_param(self) -> str:
+        """Base64 ad-hoc webhook definition for the run start request"""
+        webhooks = [{"eventTypes": WEBHOOK_EVENTS, "requestUrl": self.url}]
+        return base64.b64encode(json.dumps(webhooks).encode("utf-8")).decode("ascii")
+
+    def deliver(self, payload: Dict[str, Any]) -> None:
+        """Record a webhook payload ({"eventData": {"actorRunId"}, "resource": run})"""
+        run = payload.get("resource") or {}
+        run_id = run.get("id") or (payload.get("eventData") or {}).get("actorRunId")
+        if not run_id:
+            return
+        self.events += 1
+        waiter = self._waiters.pop(run_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(run)
+        else:
+            self._received[run_id] = run
+
+    async def wait(self, run_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """The run from its webhook, or None if none arrived within timeout"""
+        if run_id in self._received:
+            return self._received.pop(run_id)
+        waiter = self._waiters.get(run_id)
+        if waiter is None:
+            waiter = self._waiters[run_id] = asyncio.get_running_loop().create_future()
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def discard(self, run_id: str) -> None:
+        """Forget a run that finished without (or before) its webhook"""
+        self._waiters.pop(run_id, None)
+        self._received.pop(run_id, None)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        status = "404 Not Found"
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+            if len(request_line) >= 2 and request_line[0] == "POST" and request_line[1] == self.path:
+                self.deliver(json.loads(body or b"{}"))
+                status = "200 OK"
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            logger.warning(f"Malformed Apify webhook request: {e}")
+            status = "400 Bad Request"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode("ascii"))
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+class ApifyRunEngine:
+    """Runs the saved scraping task asynchronously over the Apify REST API"""
+
+    def __init__(
+        self,
+        api_key: str,
+        task_id: str,
+        api_url: str = "https://api.apify.com/v2",
+        max_concurrent_runs: int = 5,
+        poll_initial: float = 2.0,
+        poll_max: float = 30.0,
+        poll_factor: float = 1.5,
+        run_timeout: float = 300.0,
+        request_timeout: float = 30.0,
+        page_size: int = 100,
+        webhook: Optional[WebhookReceiver] = None,
+        transport: Any = None,
+    ):
+        self.api_key = api_key
+        self.task_id = task_id.replace("/", "~")  # "user/task" is "user~task" in API paths
+        self.api_url = api_url.rstrip("/")
+        self.max_concurrent_runs = max_concurrent_runs
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_factor = poll_factor
+        self.run_timeout = run_timeout
+        self.request_timeout = request_timeout
+        self.page_size = page_size
+        self.webhook = webhook
+        self._transport = transport  # e.g. httpx.MockTransport for a stand-in API
+        self._client = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {"started": 0, "active": 0, "succeeded": 0, "failed": 0, "aborted": 0, "polls": 0, "items": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None, **overrides: Any) -> "ApifyRunEngine":
+        config = config or AppConfig.APIFY_RUNS_CONFIG
+        options = {
+            "api_key": AppConfig.APIFY_API_KEY,
+            "task_id": AppConfig.APIFY_LINKEDIN_ACTOR,
+            "api_url": config.get("api_url", "https://api.apify.com/v2"),
+            "max_concurrent_runs": config.get("max_concurrent_runs", 5),
+            "poll_initial": config.get("poll_initial", 2.0),
+            "poll_max": config.get("poll_max", 30.0),
+            "poll_factor": config.get("poll_factor", 1.5),
+            "run_timeout": config.get("run_timeout", 300.0),
+            "request_timeout": config.get("request_timeout", 30.0),
+            "page_size": AppConfig.APIFY_BATCH_CONFIG["dataset_page_size"],
+        }
+        options.update(overrides)
+        return cls(**options)
+
+    async def __aenter__(self) -> "ApifyRunEngine":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ------------- REST calls -------------
+
+    def _get_client(self):
+        """Pooled httpx client, created on first use inside the running loop"""
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.request_timeout,
+                limits=httpx.Limits(max_connections=max(10, self.max_concurrent_runs * 2)),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        response = await self._get_client().request(method, path, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def start_run(self, task_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Start a task run and return it immediately (status READY or RUNNING)"""
+        params = {"webhooks": self.webhook.webhooks_param()} if self.webhook is not None else None
+        response = await self._request("POST", f"/actor-tasks/{self.task_id}/runs", json=task_input, params=params)
+        run = response.json()["data"]
+        self.stats["started"] += 1
+        logger.info(f"Started Apify run {run.get('id')}")
+        return run
+
+    async def get_run(self, run_id: str) -> Dict[str, Any]:
+        self.stats["polls"] += 1
+        return (await self._request("GET", f"/actor-runs/{run_id}")).json()["data"]
+
+    async def abort_run(self, run_id: str) -> None:
+        try:
+            await self._request("POST", f"/actor-runs/{run_id}/abort")
+            self.stats["aborted"] += 1
+            logger.warning(f"Aborted Apify run {run_id}")
+        except Exception as e:
+            logger.error(f"Could not abort Apify run {run_id}: {e}")
+
+    # ------------- Run lifecycle -------------
+
+    async def wait_for_run(self, run: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait until a run reaches a terminal status and return it. Polls with
+        exponential backoff; with a webhook receiver, polls only as a fallback.
+        A run still going after timeout (default run_timeout) is aborted.
+        """
+        run_id = run["id"]
+        deadline = time.monotonic() + (timeout if timeout is not None else self.run_timeout)
+        delay = self.poll_initial
+        while run.get("status") not in TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await self.abort_run(run_id)
+                raise ApifyRunError(f"Apify run {run_id} did not finish in time", run)
+            if self.webhook is not None:
+                hooked = await self.webhook.wait(run_id, min(self.poll_max, remaining))
+                if hooked and hooked.get("status") in TERMINAL_STATUSES:
+                    run = hooked
+                    continue
+            else:
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * self.poll_factor, self.poll_max)
+            run = await self.get_run(run_id)
+        if self.webhook is not None:
+            self.webhook.discard(run_id)
+        return run
+
+    async def iter_items(self, run: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Dataset items of a finished run, yielded page by page as they are fetched"""
+        dataset_id = run.get("defaultDatasetId")
+        if not dataset_id:
+            raise ApifyRunError(f"Apify run {run.get('id')} has no dataset", run)
+        offset = 0
+        while True:
+            response = await self._request(
+                "GET", f"/datasets/{dataset_id}/items",
+                params={"offset": offset, "limit": self.page_size, "clean": "true"},
+            )
+            items = response.json()
+            for item in items:
+                yield item
+            offset += len(items)
+            total = int(response.headers.get("x-apify-pagination-total", offset))
+            if len(items) < self.page_size or offset >= total:
+                break
+
+    async def run_task(self, task_input: Dict[str, Any], kind: str = "async") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Start a run, wait for it while holding one of max_concurrent_runs
+        slots, then stream its dataset items. Cancelling the consumer while
+        the run is active aborts the run.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent_runs)
+        requested = len(task_input.get("profileUrls") or [])
+        start = time.perf_counter()
+        async with self._slots:
+            self.stats["active"] += 1
+            run: Dict[str, Any] = {}
+            # Shielded so a cancellation during the start request still learns the run id to abort
+            starting = asyncio.ensure_future(self.start_run(task_input))
+            try:
+                run = await asyncio.shield(starting)
+                run = await self.wait_for_run(run)
+            except asyncio.CancelledError:
+                await asyncio.shield(self._abort_started(starting, run))
+                raise
+            except Exception as e:
+                self.stats["failed"] += 1
+                record_apify_run(kind=kind, run_s=time.perf_counter() - start, requested=requested,
+                                 status="error", error=failure_reason(e))
+                raise
+            finally:
+                self.stats["active"] -= 1
+        run_s = time.perf_counter() - start
+
+        if run.get("status") != "SUCCEEDED":
+            self.stats["failed"] += 1
+            record_apify_run(kind=kind, run_s=run_s, requested=requested, status="error",
+                             error=str(run.get("status", "unknown")).lower())
+            raise ApifyRunError(f"Apify run {run.get('id')} ended with status {run.get('status')}", run)
+
+        self.stats["succeeded"] += 1
+        fetch_start = time.perf_counter()
+        count = 0
+        async for item in self.iter_items(run):
+            count += 1
+            yield item
+        self.stats["items"] += count
+        record_apify_run(kind=kind, run_s=run_s, fetch_s=time.perf_counter() - fetch_start, items=count,
+                         requested=requested, status="ok" if count else "empty")
+
+    async def _abort_started(self, starting: "asyncio.Future", run: Dict[str, Any]) -> None:
+        """Abort the run of a cancelled run_task, waiting for its start request if it is still in flight"""
+        if not run:
+            try:
+                run = await starting
+            except Exception:
+                return  # the run was never created
+        if run.get("id") and run.get("status") not in TERMINAL_STATUSES:
+            await self.abort_run(run["id"])
+
+    # ------------- Profile scraping -------------
+
+    async def stream_profiles(self, profile_urls: List[str], chunk_size: int = 1) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (canonical URL, raw item) pairs as runs finish, running one task
+        per chunk of URLs concurrently (bounded by max_concurrent_runs).
+        Invalid URLs are skipped; failed runs are logged and yield nothing.
+        """
+        canonical = list(dict.fromkeys(
+            DirectLinkedInScraper._canonical_profile_url(url)
+            for url in profile_urls
+            if DirectLinkedInScraper._is_valid_linkedin_url(url)
+        ))
+        chunks = [canonical[i:i + chunk_size] for i in range(0, len(canonical), max(1, chunk_size))]
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run_chunk(chunk: List[str]) -> None:
+            try:
+                async for item in self.run_task({"profileUrls": chunk}):
+                    item_url = item.get("linkedinUrl") or item.get("url") or ""
+                    if "/in/" in item_url:
+                        await queue.put((DirectLinkedInScraper._canonical_profile_url(item_url), item))
+                    elif len(chunk) == 1:
+                        await queue.put((chunk[0], item))
+            except ApifyRunError as e:
+                logger.error(str(e))
+            except Exception as e:
+                logger.error(f"Apify run for {len(chunk)} profile(s) failed: {e}")
+            finally:
+                await queue.put(done)
+
+        tasks = [asyncio.create_task(run_chunk(chunk)) for chunk in chunks]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                entry = await queue.get()
+                if entry is done:
+                    remaining -= 1
+                    continue
+                yield entry
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def scrape_profiles(self, profile_urls: List[str], chunk_size: int = 1) -> Dict[str, Dict[str, Any]]:
+        """
+        Standardized profiles for every input URL, like
+        DirectLinkedInScraper.scrape_profiles(); URLs no run returned get mock data.
+        """
+        scraped: Dict[str, Dict[str, Any]] = {}
+        async for url, item in self.stream_profiles(profile_urls, chunk_size):
+            scraped.setdefault(url, item)
+        results = {}
+        for url in profile_urls:
+            raw = None
+            if DirectLinkedInScraper._is_valid_linkedin_url(url):
+                raw = scraped.get(DirectLinkedInScraper._canonical_profile_url(url))
+            if raw:
+                results[url] = DirectLinkedInScraper._standardize_profile_data(raw)
+            else:
+                results[url] = DirectLinkedInScraper._get_mock_profile_data(url)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "max_concurrent_runs": self.max_concurrent_runs,
+                "webhook_events": self.webhook.events if self.webhook is not None else 0}
+
+
+async def scrape_profiles_async(profile_urls: List[str], chunk_size: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Scrape many profiles concurrently with an engine built from config. A
+    webhook receiver is started when APIFY_WEBHOOK_URL is set.
+    """
+    config = AppConfig.APIFY_RUNS_CONFIG
+    webhook = None
+    if config.get("webhook_url"):
+        webhook = await WebhookReceiver(config["webhook_host"], config["webhook_port"], config["webhook_url"]).start()
+    try:
+        async with ApifyRunEngine.from_config(webhook=webhook) as engine:
+            return await engine.scrape_profiles(profile_urls, chunk_size)
+    finally:
+        if webhook is not None:
+            await webhook.close()
+
+
+def scrape_profiles_concurrently(profile_urls: List[str], chunk_size: int = 1) -> Dict[str, Dict[str, Any]]:
+    """Blocking wrapper around scrape_profiles_async for threaded callers"""
+    return asyncio.run(scrape_profiles_async(profile_urls, chunk_size))
@@ -1,16 +1,21 @@
 import streamlit as st
 import json
 import time
+import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 
 # Import your existing modules
-from linkedin_scraper import scrape_linkedin_profile
-from agents.orchestrator import route_request
-from ai_providers import get_provider_status
+from linkedin_scraper import get_scrape_coalescing_stats, scrape_linkedin_profile
+from agents.orchestrator import route_chat
+from ai_providers import get_cache_stats, get_llm_coalescing_stats, get_provider_status, get_rate_limit_stats
+from conversation_memory import ConversationMemory
+from config import AppConfig
+from job_manager import DONE, FAILED, get_job_manager, run_request, run_stream
+from prepared_profile import prepare_profile
+from profile_model import compact_profile
+from semantic_cache import get_semantic_cache
+from telemetry import get_telemetry_stats, render_prometheus
 
 # Page configuration
 st.set_page_config(
@@ -228,6 +233,13 @@ if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = {}
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
+if 'chat_memory' not in st.session_state:
+    st.session_state.chat_memory = ConversationMemory.from_config()
+if 'stream_metrics' not in st.session_state:
+    st.session_state.stream_metrics = {}
+if 'session_id' not in st.session_state:
+    # Keys this session's background jobs in the shared job manager
+    st.session_state.session_id = uuid.uuid4().hex
 
 def get_score_class(score):
     """Return CSS class based on score"""
@@ -240,8 +252,117 @@ def get_score_class(score):
     else:
         return "score-poor"
 
+def submit_job(result_key, task_type, user_input, label, stream=False):
+    """Run an agent request on the shared worker pool; its result lands in analysis_results[result_key]"""
+    st.session_state.analysis_results.pop(result_key, None)
+    return get_job_manager().submit(
+        st.session_state.session_id, result_key,
+        run_stream if stream else run_request, user_input, task_type,
+        label=label,
+    )
+
+def collect_job(result_key):
+    """This session's job for result_key, if any; a finished one is moved into analysis_results"""
+    manager = get_job_manager()
+    job = manager.get(st.session_state.session_id, result_key)
+    if job is not None and job.status == DONE:
+        manager.pop(st.session_state.session_id, result_key)
+        st.session_state.analysis_results[result_key] = job.result
+        if job.metrics:
+            st.session_state.stream_metrics[result_key] = job.metrics
+    return job
+
+def job_running(job):
+    return job is not None and not job.finished
+
+@st.fragment(run_every=AppConfig.JOBS_CONFIG["poll_interval"])
+def show_job_progress(result_key):
+    """Partial rerun that polls a background job, then reruns the page once it is done"""
+    job = get_job_manager().get(st.session_state.session_id, result_key)
+    if job is None or job.finished:
+        st.rerun()
+    state = "waiting for a worker" if job.started_at is None else f"running for {job.elapsed:.0f}s"
+    st.info(f"⏳ {job.label} {state}. You can switch pages meanwhile; the result will be here when you come back.")
+    if job.partial:
+        st.markdown(job.partial + "▌")
+
+def _fmt_seconds(snapshot, key="p50"):
+    value = (snapshot or {}).get(key)
+    return f"{value:.2f}s" if value is not None else "–"
+
+def show_performance_metrics(provider_status):
+    """Sidebar panel: per-provider LLM latency/tokens, Apify runs and cache/queue stats"""
+    telemetry = get_telemetry_stats()
+    if not telemetry.get("enabled"):
+        st.caption("Telemetry disabled (TELEMETRY_ENABLED=false)")
+    else:
+        routing = provider_status.get("routing", {})
+        if not telemetry["llm"]:
+            st.caption("No LLM calls yet")
+        for provider, stats in telemetry["llm"].items():
+            circuit = routing.get(provider, {}).get("circuit")
+            st.markdown(f"**{provider.upper()}**" + (f" · circuit {circuit}" if circuit else ""))
+            st.caption(
+                f"{stats['requests']} calls · {stats['errors']} errors · {stats['retries']} retries · "
+                f"{stats['cache_hits']} cache hits\n\n"
+                f"latency p50 {_fmt_seconds(stats.get('latency'))} / p95 {_fmt_seconds(stats.get('latency'), 'p95')} · "
+                f"first byte p50 {_fmt_seconds(stats.get('ttfb'))} · queue p95 {_fmt_seconds(stats.get('queue_wait'), 'p95')}\n\n"
+                f"tokens {stats['prompt_tokens']:,} in / {stats['completion_tokens']:,} out"
+            )
+        for kind, stats in telemetry["apify"].items():
+            st.markdown(f"**Apify ({kind})**")
+            st.caption(
+                f"{stats['runs']} runs · {stats['failed']} failed · {stats['items']} items · "
+                f"run p50 {_fmt_seconds(stats.get('run'))} · fetch p50 {_fmt_seconds(stats.get('fetch'))}"
+            )
+
+    cache = get_cache_stats()
+    if cache.get("enabled"):
+        st.caption(f"Response cache: {cache['hit_rate']:.0%} hit rate, {cache['memory_entries']} entries")
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None:
+        semantic = semantic_cache.get_stats()
+        st.caption(f"Semantic cache: {semantic['hit_rate']:.0%} hit rate, {semantic['entries']} entries")
+    llm_flight, scrape_flight = get_llm_coalescing_stats(), get_scrape_coalescing_stats()
+    if llm_flight.get("enabled"):
+        st.caption(
+            f"Coalesced duplicates: {llm_flight['coalesced']} LLM requests, "
+            f"{scrape_flight.get('coalesced', 0)} profile loads"
+        )
+    limits = get_rate_limit_stats()
+    for provider, stats in limits.get("providers", {}).items():
+        st.caption(f"{provider} queue: {stats['queue_depth']} waiting, wait p95 {stats['wait_p95_s']:.2f}s")
+    jobs = get_job_manager().get_stats()
+    st.caption(f"Background jobs: {jobs['running']} running, {jobs['queued']} queued on {jobs['max_workers']} workers")
+    memory = st.session_state.get("chat_memory")
+    if memory is not None and len(memory):
+        stats = memory.get_stats()
+        st.caption(f"Chat memory: {stats['turns']} turns, {stats['recent_tokens'] + stats['summary_tokens']} tokens")
+
+    if telemetry.get("enabled"):
+        st.download_button(
+            label="📤 Export metrics (Prometheus)",
+            data=render_prometheus(),
+            file_name="linkedin_optimizer_metrics.prom",
+            mime="text/plain",
+            key="export_metrics",
+        )
+
+def show_stream_metrics(result_key):
+    """Show time-to-first-token and total latency of the last streamed response"""
+    metrics = st.session_state.stream_metrics.get(result_key)
+    if not metrics:
+        return
+    if metrics.get('cache_hit'):
+        st.caption(f"⚡ Served from cache in {metrics['total_s'] * 1000:.0f} ms")
+    else:
+        ttft = metrics['ttft_s'] if metrics.get('ttft_s') is not None else metrics['total_s']
+        st.caption(f"⚡ First token in {ttft:.2f}s · completed in {metrics['total_s']:.1f}s ({metrics.get('provider', 'unknown')})")
+
 def create_radar_chart(scores_dict):
     """Create a radar chart for profile scores"""
+    import plotly.graph_objects as go
+
     categories = list(scores_dict.keys())
     values = [int(score.split('/')[0]) if '/' in str(score) else int(score) for score in scores_dict.values()]
     
@@ -279,6 +400,8 @@ def create_radar_chart(scores_dict):
 
 def create_progress_chart(completeness):
     """Create a circular progress chart"""
+    import plotly.graph_objects as go
+
     fig = go.Figure(go.Indicator(
         mode = "gauge+number+delta",
         value = completeness,
@@ -391,6 +514,16 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
+        with st.expander("📈 Performance Metrics"):
+            show_performance_metrics(provider_status)
+        
+        # This session's analyses still running in the background
+        running_jobs = [job for job in get_job_manager().session_jobs(st.session_state.session_id) if not job.finished]
+        if running_jobs:
+            st.markdown('<h3 class="sub-header">⏳ Running Analyses</h3>', unsafe_allow_html=True)
+            for job in running_jobs:
+                st.caption(f"{job.label} · {job.elapsed:.0f}s")
+        
         # Navigation
         st.markdown('<h3 class="sub-header">📋 Navigation</h3>', unsafe_allow_html=True)
         page = st.selectbox(
@@ -404,10 +537,11 @@ def main():
         if st.button("🔄 Refresh Data", key="refresh"):
             st.session_state.profile_data = None
             st.session_state.analysis_results = {}
+            get_job_manager().clear_session(st.session_state.session_id)
             st.rerun()
         
         if st.button("📊 Demo Profile", key="demo"):
-            st.session_state.profile_data = scrape_linkedin_profile("demo")
+            st.session_state.profile_data = compact_profile(scrape_linkedin_profile("demo"))
             st.success("Demo profile loaded!")
             st.rerun()
     
@@ -458,7 +592,7 @@ def show_home_page():
             if st.button("🚀 Analyze Profile", key="analyze_home"):
                 if linkedin_url:
                     with st.spinner("🔄 Scraping profile data..."):
-                        st.session_state.profile_data = scrape_linkedin_profile(linkedin_url)
+                        st.session_state.profile_data = compact_profile(scrape_linkedin_profile(linkedin_url))
                     st.success("✅ Profile data loaded successfully!")
                     st.rerun()
                 else:
@@ -466,7 +600,7 @@ def show_home_page():
         
         with col_btn2:
             if st.button("🎭 Try Demo", key="demo_home"):
-                st.session_state.profile_data = scrape_linkedin_profile("demo")
+                st.session_state.profile_data = compact_profile(scrape_linkedin_profile("demo"))
                 st.success("🎭 Demo profile loaded!")
                 st.rerun()
         
@@ -506,24 +640,21 @@ def show_profile_analysis():
         st.warning("⚠️ Please load a profile first from the Home page.")
         return
     
-    # Run analysis if not already done
+    # Run analysis in the background if not already done
+    job = collect_job('profile_analysis')
     if 'profile_analysis' not in st.session_state.analysis_results:
-        with st.spinner("🧠 AI is analyzing your profile..."):
-            profile_text = f"""
-            Name: {st.session_state.profile_data.get('name', '')}
-            Headline: {st.session_state.profile_data.get('headline', '')}
-            Summary: {st.session_state.profile_data.get('summary', '')}
-            Experience: {json.dumps(st.session_state.profile_data.get('experience', []))}
-            Education: {json.dumps(st.session_state.profile_data.get('education', []))}
-            Skills: {', '.join(st.session_state.profile_data.get('skills', []))}
-            Location: {st.session_state.profile_data.get('location', '')}
-            Industry: {st.session_state.profile_data.get('industry', '')}
-            """
-            
-            analysis = route_request(profile_text, "profile")
-            st.session_state.analysis_results['profile_analysis'] = analysis
+        if job is None or (job.status == FAILED and st.button("🔄 Retry Analysis", key="retry_analysis")):
+            # Rendered once per profile version and reused across reruns
+            profile_text = prepare_profile(st.session_state.profile_data).analysis_block
+            job = submit_job('profile_analysis', "profile", profile_text, "🧠 Profile analysis", stream=True)
+        if job.status == FAILED:
+            st.error(f"❌ Profile analysis failed: {job.error}")
+        else:
+            show_job_progress('profile_analysis')
+        return
     
     analysis = st.session_state.analysis_results['profile_analysis']
+    show_stream_metrics('profile_analysis')
     
     # Display analysis results
     if isinstance(analysis, dict):
@@ -626,25 +757,23 @@ def show_job_fit_analysis():
     )
     st.markdown('</div>', unsafe_allow_html=True)
     
-    if st.button("🎯 Analyze Job Fit", key="analyze_job_fit"):
+    job = collect_job('job_fit')
+    if st.button("🎯 Analyze Job Fit", key="analyze_job_fit", disabled=job_running(job)):
         if job_description:
-            with st.spinner("🧠 Analyzing job compatibility..."):
-                profile_summary = f"""
-                Profile: {st.session_state.profile_data.get('name', '')}
-                Headline: {st.session_state.profile_data.get('headline', '')}
-                Summary: {st.session_state.profile_data.get('summary', '')}
-                Skills: {', '.join(st.session_state.profile_data.get('skills', []))}
-                Experience: {json.dumps(st.session_state.profile_data.get('experience', [])[:3])}
-                Education: {json.dumps(st.session_state.profile_data.get('education', []))}
-                
-                Job Description: {job_description}
-                """
-                
-                job_fit_analysis = route_request(profile_summary, "job_fit")
-                st.session_state.analysis_results['job_fit'] = job_fit_analysis
+            profile_summary = f"""
+            {prepare_profile(st.session_state.profile_data).job_fit_block}
+            Job Description: {job_description}
+            """
+            
+            job = submit_job('job_fit', "job_fit", profile_summary, "🎯 Job fit analysis")
         else:
             st.error("Please enter a job description")
     
+    if job_running(job):
+        show_job_progress('job_fit')
+    elif job is not None and job.status == FAILED:
+        st.error(f"❌ Job fit analysis failed: {job.error}")
+    
     # Display job fit results
     if 'job_fit' in st.session_state.analysis_results:
         analysis = st.session_state.analysis_results['job_fit']
@@ -696,21 +825,25 @@ def show_content_optimization():
         target_role = st.text_input("Enter target job title for optimization")
         st.markdown('</div>', unsafe_allow_html=True)
     
-    if st.button("✨ Optimize Content", key="optimize_content"):
+    job = collect_job('content_optimization')
+    if st.button("✨ Optimize Content", key="optimize_content", disabled=job_running(job)):
         if current_content:
-            with st.spinner("🧠 AI is optimizing your content..."):
-                optimization_prompt = f"""
-                Content Type: {content_type}
-                Current Content: {current_content}
-                Target Role: {target_role if target_role else 'General improvement'}
-                Profile Context: {st.session_state.profile_data.get('name', '')} - {st.session_state.profile_data.get('headline', '')}
-                """
-                
-                optimized_content = route_request(optimization_prompt, "content")
-                st.session_state.analysis_results['content_optimization'] = optimized_content
+            optimization_prompt = f"""
+            Content Type: {content_type}
+            Current Content: {current_content}
+            Target Role: {target_role if target_role else 'General improvement'}
+            Profile Context: {st.session_state.profile_data.get('name', '')} - {st.session_state.profile_data.get('headline', '')}
+            """
+            
+            job = submit_job('content_optimization', "content", optimization_prompt, "✨ Content optimization")
         else:
             st.error("No content found to optimize")
     
+    if job_running(job):
+        show_job_progress('content_optimization')
+    elif job is not None and job.status == FAILED:
+        st.error(f"❌ Content optimization failed: {job.error}")
+    
     # Display optimization results
     if 'content_optimization' in st.session_state.analysis_results:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
@@ -745,35 +878,43 @@ def show_career_guidance():
     )
     st.markdown('</div>', unsafe_allow_html=True)
     
-    if st.button("🚀 Get Career Guidance", key="get_guidance"):
+    job = collect_job('career_guidance')
+    if st.button("🚀 Get Career Guidance", key="get_guidance", disabled=job_running(job)):
         if career_goal:
-            with st.spinner("🧠 Generating personalized career roadmap..."):
-                guidance_prompt = f"""
-                Current Profile: {st.session_state.profile_data.get('name', '')}
-                Current Role: {st.session_state.profile_data.get('headline', '')}
-                Current Skills: {', '.join(st.session_state.profile_data.get('skills', []))}
-                Experience: {json.dumps(st.session_state.profile_data.get('experience', [])[:2])}
-                
-                Career Goals:
-                - Desired Role: {career_goal}
-                - Industry: {industry_preference}
-                - Timeline: {timeline}
-                - Target Level: {experience_level}
-                - Additional Info: {additional_info}
-                """
-                
-                career_guidance = route_request(guidance_prompt, "guidance")
-                st.session_state.analysis_results['career_guidance'] = career_guidance
+            guidance_prompt = f"""
+            {prepare_profile(st.session_state.profile_data).guidance_block}
+            
+            Career Goals:
+            - Desired Role: {career_goal}
+            - Industry: {industry_preference}
+            - Timeline: {timeline}
+            - Target Level: {experience_level}
+            - Additional Info: {additional_info}
+            """
+            
+            job = submit_job('career_guidance', "guidance", guidance_prompt, "🚀 Career guidance", stream=True)
         else:
             st.error("Please enter your career goal")
     
+    if job_running(job):
+        show_job_progress('career_guidance')
+    elif job is not None and job.status == FAILED:
+        st.error(f"❌ Career guidance failed: {job.error}")
+    
     # Display guidance results
     if 'career_guidance' in st.session_state.analysis_results:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.markdown("### 🗺️ Your Personalized Career Roadmap")
         st.write(st.session_state.analysis_results['career_guidance'])
+        show_stream_metrics('career_guidance')
         st.markdown('</div>', unsafe_allow_html=True)
 
+def _trim_chat_history():
+    """Bound the displayed transcript; the model sees chat_memory, not this list"""
+    limit = AppConfig.CHAT_MEMORY_CONFIG["max_display_messages"]
+    if len(st.session_state.chat_history) > limit:
+        del st.session_state.chat_history[:-limit]
+
 def show_chat_assistant():
     """Enhanced AI chat assistant page"""
     st.markdown('<h2 class="sub-header">💬 AI Career Coach</h2>', unsafe_allow_html=True)
@@ -817,21 +958,18 @@ def show_chat_assistant():
                 
                 # Get AI response
                 with st.spinner("🤔 AI is thinking..."):
-                    context = ""
-                    if st.session_state.profile_data:
-                        context = f"User's profile context: {st.session_state.profile_data.get('name', '')} - {st.session_state.profile_data.get('headline', '')}"
-                    
-                    full_prompt = f"{context}\n\nUser question: {user_input}"
-                    ai_response = route_request(full_prompt, "chat")
+                    ai_response = route_chat(user_input, st.session_state.profile_data, st.session_state.chat_memory)
                     
                     # Add AI response to history
                     st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
+                    _trim_chat_history()
                 
                 st.rerun()
     
     with col2:
         if st.button("🗑️ Clear Chat", key="clear_chat"):
             st.session_state.chat_history = []
+            st.session_state.chat_memory.clear()
             st.rerun()
     
     # Quick questions
@@ -851,14 +989,10 @@ def show_chat_assistant():
                 st.session_state.chat_history.append({"role": "user", "content": question})
                 
                 with st.spinner("🤔 AI is thinking..."):
-                    context = ""
-                    if st.session_state.profile_data:
-                        context = f"User's profile context: {st.session_state.profile_data.get('name', '')} - {st.session_state.profile_data.get('headline', '')}"
-                    
-                    full_prompt = f"{context}\n\nUser question: {question}"
-                    ai_response = route_request(full_prompt, "chat")
+                    ai_response = route_chat(question, st.session_state.profile_data, st.session_state.chat_memory, standalone=True)
                     
                     st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
+                    _trim_chat_history()
                 
                 st.rerun()
 
@@ -0,0 +1,438 @@
+"""
+Batch profile analysis for LinkedIn Profile Optimizer
+Analyzes many profiles from the command line: reads LinkedIn URLs (one per
+line) or JSONL of standardized profiles, runs scrape + analyze_profile on a
+bounded worker pool sized from the providers' request budgets, and streams
+results to JSONL (or Parquet) as they complete. Finished profiles are
+checkpointed, so a rerun after a crash or a 429 storm resumes where it left off.
+
+Usage:
+    python batch_runner.py urls.txt -o results.jsonl
+    python batch_runner.py profiles.jsonl -o results.parquet --workers 4
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Callable, Deque, Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from config import AppConfig
+from linkedin_scraper import DirectLinkedInScraper, scrape_linkedin_profile, warm_profile_store
+from prepared_profile import profile_version
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class RetryableError(Exception):
+    """The item failed for a transient reason (no provider answered, scrape fell back to mock data)"""
+
+
+def load_linkedin_agent(priority: str = "batch") -> Any:
+    """LinkedInOptimizerAgent from agents.py, which the agents/ package shadows for normal imports"""
+    spec = importlib.util.spec_from_file_location("linkedin_agents", os.path.join(HERE, "agents.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.LinkedInOptimizerAgent(priority=priority)
+
+
+def provider_workers(config: Optional[Dict[str, Any]] = None) -> int:
+    """Workers the available providers can keep busy: requests/min x expected latency, capped"""
+    config = config or AppConfig.BATCH_CONFIG
+    rpm = 0
+    for provider, available in AppConfig.get_available_providers().items():
+        if available:
+            rpm += (AppConfig.get_provider_config(provider) or {}).get("requests_per_minute") or 60
+    workers = int(rpm * config.get("expected_latency", 15.0) / 60)
+    return max(1, min(config.get("max_workers", 8), workers))
+
+
+# ------------- Input -------------
+
+def read_items(path: str) -> List[Dict[str, Any]]:
+    """
+    Batch items from a file of URLs or JSONL records. A JSONL record is either
+    a standardized profile or {"url": ...}. Each item gets a stable key (the
+    canonical profile URL, else a content hash) used for checkpointing.
+    """
+    items: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            profile = None
+            url = line
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping invalid JSON on line {line_no}: {e}")
+                    continue
+                url = record.get("url") or record.get("profile_url") or ""
+                if set(record) - {"url", "profile_url"}:
+                    profile = record
+            if DirectLinkedInScraper._is_valid_linkedin_url(url):
+                key = DirectLinkedInScraper._canonical_profile_url(url)
+            elif profile is not None:
+                key = f"sha:{profile_version(profile)}"
+            else:
+                logger.warning(f"Skipping line {line_no}: not a LinkedIn profile URL or profile record")
+                continue
+            if key in seen:
+                continue
+            seen.add(key)
+            items.append({"key": key, "url": url, "profile": profile})
+    return items
+
+
+# ------------- Output -------------
+
+class Checkpoint:
+    """Append-only file of finished item keys"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def load(self) -> Set[str]:
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def mark(self, key: str) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(key + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _ok_keys(records: List[Dict[str, Any]]) -> List[str]:
+    return [record["key"] for record in records if record.get("status") == "ok"]
+
+
+class JsonlSink:
+    """
+    One JSON record per line, appended as results complete. Sinks return the
+    keys of successful records once they are on disk, for checkpointing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> List[str]:
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        return _ok_keys([record])
+
+    def close(self) -> List[str]:
+        self._file.close()
+        return []
+
+
+class ParquetSink:
+    """
+    Parquet output written in row groups (requires pyarrow). Parquet files
+    cannot be appended to, so a resumed run writes the next part file.
+    """
+
+    COLUMNS = ("key", "profile_url", "name", "status", "attempts", "elapsed_ms", "completed_at", "error", "analysis")
+
+    def __init__(self, path: str, row_group: int = 500):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow); use a .jsonl output instead") from e
+        stem, ext = os.path.splitext(path)
+        part = 0
+        while os.path.exists(path):
+            part += 1
+            path = f"{stem}.part{part}{ext}"
+        self.path = path
+        self.row_group = row_group
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = None
+
+    def write(self, record: Dict[str, Any]) -> List[str]:
+        row = {column: record.get(column) for column in self.COLUMNS}
+        row["analysis"] = json.dumps(record.get("analysis"), ensure_ascii=False, default=str)
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group:
+            return self._flush()
+        return []
+
+    def _flush(self) -> List[str]:
+        """Write buffered rows as one row group; returns their keys (buffered rows are not durable yet)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return []
+        table = pa.Table.from_pylist(self._rows, schema=self._schema(pa))
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        durable = _ok_keys(self._rows)
+        self._rows = []
+        return durable
+
+    @staticmethod
+    def _schema(pa: Any) -> Any:
+        return pa.schema([
+            ("key", pa.string()), ("profile_url", pa.string()), ("name", pa.string()), ("status", pa.string()),
+            ("attempts", pa.int32()), ("elapsed_ms", pa.float64()), ("completed_at", pa.string()),
+            ("error", pa.string()), ("analysis", pa.string()),
+        ])
+
+    def close(self) -> List[str]:
+        durable = self._flush()
+        if self._writer is not None:
+            self._writer.close()
+        return durable
+
+
+def rotate_output(path: str) -> List[str]:
+    """
+    Move an earlier run's output (and its Parquet part files) aside, to
+    <name>.<timestamp><ext>, so a fresh run does not append to it. Returns
+    the new paths.
+    """
+    directory = os.path.dirname(path) or "."
+    stem, ext = os.path.splitext(os.path.basename(path))
+    part = re.compile(rf"{re.escape(stem)}(\.part\d+)?{re.escape(ext)}")
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    moved = []
+    for name in sorted(os.listdir(directory)):
+        if not part.fullmatch(name):
+            continue
+        new = os.path.join(directory, f"{name[:len(name) - len(ext)]}.{stamp}{ext}")
+        os.replace(os.path.join(directory, name), new)
+        moved.append(new)
+    return moved
+
+
+def open_sink(path: str, config: Optional[Dict[str, Any]] = None) -> Any:
+    config = config or AppConfig.BATCH_CONFIG
+    if path.endswith(".parquet"):
+        return ParquetSink(path, config.get("parquet_row_group", 500))
+    return JsonlSink(path)
+
+
+# ------------- Runner -------------
+
+class _Backoff:
+    """Shared pause for all workers after a transient failure, doubling while failures continue"""
+
+    def __init__(self, base: float, maximum: float):
+        self.base = base
+        self.maximum = maximum
+        self.delay = base
+        self.until = 0.0
+        self._lock = threading.Lock()
+
+    def trip(self, reason: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now < self.until:
+                return  # already backing off for this outage
+            self.until = now + self.delay
+            logger.warning(f"{reason}: pausing batch for {self.delay:.0f}s")
+            self.delay = min(self.delay * 2, self.maximum)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.delay = self.base
+
+    def wait(self) -> None:
+        remaining = self.until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+class BatchRunner:
+    """Scrape and analyze profiles on a bounded pool, writing results as they complete"""
+
+    def __init__(
+        self,
+        agent: Any = None,
+        workers: Optional[int] = None,
+        config: Optional[Dict[str, Any]] = None,
+        scrape_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+    ):
+        self.config = config or AppConfig.BATCH_CONFIG
+        self.agent = agent if agent is not None else load_linkedin_agent("batch")
+        self.workers = workers or provider_workers(self.config)
+        self.scrape_fn = scrape_fn or scrape_linkedin_profile
+        self.max_attempts = self.config.get("max_attempts", 3)
+        self._backoff = _Backoff(self.config.get("backoff", 30.0), self.config.get("max_backoff", 300.0))
+
+    def _process(self, item: Dict[str, Any], attempt: int) -> Dict[str, Any]:
+        self._backoff.wait()
+        start = time.perf_counter()
+        profile = item["profile"]
+        if profile is None:
+            profile = self.scrape_fn(item["url"])
+            if (profile.get("raw_data") or {}).get("source") == "mock_data":
+                raise RetryableError("scrape failed (got mock data)")
+        analysis = self.agent.analyze_profile(profile)
+        if analysis.get("ai_unavailable"):
+            raise RetryableError("no AI provider available")
+        return {
+            "key": item["key"],
+            "profile_url": profile.get("profile_url") or item["url"],
+            "name": profile.get("name", ""),
+            "status": "ok",
+            "attempts": attempt,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+            "error": None,
+            "analysis": analysis,
+        }
+
+    def run(self, items: Iterable[Dict[str, Any]], sink: Any, checkpoint: Optional[Checkpoint] = None) -> Dict[str, Any]:
+        """Process every item not yet in the checkpoint; returns run statistics"""
+        done = checkpoint.load() if checkpoint is not None else set()
+        pending: Deque[Tuple[Dict[str, Any], int]] = deque((item, 1) for item in items if item["key"] not in done)
+        total = len(pending)
+        stats = {"total": total, "skipped": len(done), "ok": 0, "failed": 0, "retries": 0}
+        if not total:
+            logger.info("Nothing to do: every item is already checkpointed")
+            sink.close()
+            return stats
+        logger.info(f"Analyzing {total} profiles with {self.workers} workers ({len(done)} already done)")
+
+        start = last_report = time.monotonic()
+        in_flight: Dict[Any, Tuple[Dict[str, Any], int]] = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        try:
+            while pending or in_flight:
+                # Keep the queue short so a crash loses little and memory stays flat
+                while pending and len(in_flight) < self.workers * 2:
+                    item, attempt = pending.popleft()
+                    in_flight[executor.submit(self._process, item, attempt)] = (item, attempt)
+                finished, _ = wait(in_flight, timeout=self.config.get("progress_interval", 10.0), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    item, attempt = in_flight.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        if isinstance(e, RetryableError):
+                            self._backoff.trip(str(e))
+                        if attempt < self.max_attempts:
+                            logger.warning(f"{item['key']} failed (attempt {attempt}): {e}; retrying")
+                            pending.append((item, attempt + 1))
+                            stats["retries"] += 1
+                        else:
+                            logger.error(f"{item['key']} failed after {attempt} attempts: {e}")
+                            sink.write({"key": item["key"], "profile_url": item["url"], "status": "error",
+                                        "attempts": attempt, "error": str(e), "analysis": None,
+                                        "completed_at": datetime.now().isoformat(timespec="seconds")})
+                            stats["failed"] += 1
+                        continue
+                    self._backoff.reset()
+                    self._checkpoint(checkpoint, sink.write(record))
+                    stats["ok"] += 1
+
+                now = time.monotonic()
+                if now - last_report >= self.config.get("progress_interval", 10.0):
+                    last_report = now
+                    logger.info(self._progress(stats, now - start))
+        except KeyboardInterrupt:
+            logger.warning("Interrupted; finished profiles are checkpointed, rerun to resume")
+            for future in in_flight:
+                future.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._checkpoint(checkpoint, sink.close())
+            if checkpoint is not None:
+                checkpoint.close()
+
+        elapsed = time.monotonic() - start
+        stats["elapsed_s"] = round(elapsed, 1)
+        stats["profiles_per_min"] = round(stats["ok"] / elapsed * 60, 2) if elapsed else 0.0
+        logger.info(f"Batch finished: {self._progress(stats, elapsed)}")
+        return stats
+
+    @staticmethod
+    def _checkpoint(checkpoint: Optional[Checkpoint], keys: List[str]) -> None:
+        """Mark keys done only once the sink reports their records are on disk"""
+        if checkpoint is not None:
+            for key in keys:
+                checkpoint.mark(key)
+
+    @staticmethod
+    def _progress(stats: Dict[str, Any], elapsed: float) -> str:
+        finished = stats["ok"] + stats["failed"]
+        rate = finished / elapsed * 60 if elapsed else 0.0
+        remaining = stats["total"] - finished
+        eta = _format_duration(remaining / rate * 60) if rate and remaining else "-"
+        return (
+            f"{finished}/{stats['total']} profiles ({stats['ok']} ok, {stats['failed']} failed, "
+            f"{stats['retries']} retries), {rate:.1f} profiles/min, ETA {eta}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze LinkedIn profiles in bulk")
+    parser.add_argument("input", help="File of LinkedIn URLs (one per line) or JSONL of profiles")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="Output .jsonl or .parquet file")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, help="Worker threads (default: from provider request budgets)")
+    parser.add_argument("--limit", type=int, help="Only process the first N items")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Start over: drop the checkpoint and move the existing output aside")
+    parser.add_argument("--warm", action="store_true", help="Bulk-scrape pending URLs into the profile store first")
+    args = parser.parse_args(argv)
+
+    items = read_items(args.input)[:args.limit]
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output}.checkpoint")
+    if args.fresh:
+        if os.path.exists(checkpoint.path):
+            os.remove(checkpoint.path)
+        for path in rotate_output(args.output):
+            logger.info(f"Moved the previous output to {path}")
+    if args.warm:
+        done = checkpoint.load()
+        urls = [item["url"] for item in items if item["profile"] is None and item["key"] not in done]
+        logger.info(f"Profile store warm-up: {warm_profile_store(urls)}")
+
+    runner = BatchRunner(workers=args.workers)
+    try:
+        stats = runner.run(items, open_sink(args.output), checkpoint)
+    except KeyboardInterrupt:
+        return 130
+    print(json.dumps(stats))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Benchmark: cold-start import time of the app and agent modules.
+
+Imports each target in a fresh interpreter with `python -X importtime` and
+reports its cumulative import time (best of --repeat runs) and the modules
+that cost the most. Fails (exit status 1) when a target exceeds its budget
+or when a module that should only be imported on first use (openai,
+apify_client, plotly.express) is pulled in at import time.
+
+Importing app runs the Streamlit script in bare mode, so its figure
+includes building the home page.
+
+Usage:
+    python benchmarks/bench_import_time.py [TARGET ...] [--repeat R] [--top N]
+    python benchmarks/bench_import_time.py --budget app=1200 --budget ai_providers=100
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Cumulative import time budgets in milliseconds (streamlit alone is ~400 ms of app)
+BUDGETS_MS = {
+    "ai_providers": 150,
+    "linkedin_scraper": 100,
+    "agents.orchestrator": 300,
+    "job_manager": 100,
+    "batch_runner": 200,
+    "app": 1500,
+}
+
+# Heavy SDKs that must stay behind lazy accessors
+DEFERRED_MODULES = ("openai", "apify_client", "plotly.express")
+
+
+def import_times(target):
+    """{module: (self_us, cumulative_us)} for one fresh `import target`"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"import {target} failed: {tail[0]}")
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(target, repeat):
+    """Best run for a target: the run with the lowest cumulative time"""
+    runs = [import_times(target) for _ in range(repeat)]
+    return min(runs, key=lambda times: times.get(target, (0, 0))[1])
+
+
+def top_packages(times, target, count):
+    """Top-level packages by total self time, excluding the target itself"""
+    totals = {}
+    for name, (self_us, _) in times.items():
+        if name == target:
+            continue
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("targets", nargs="*", default=list(BUDGETS_MS), help="modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh imports per target (best is reported)")
+    parser.add_argument("--top", type=int, default=5, help="most expensive packages to list per target")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="override a budget (repeatable)")
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS_MS)
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        budgets[name] = float(value)
+
+    failures = []
+    print(f"{'module':<22} {'import ms':>10} {'budget ms':>10}  top packages (self ms)")
+    for target in args.targets:
+        try:
+            times = measure(target, args.repeat)
+        except RuntimeError as e:
+            failures.append(str(e))
+            print(f"{target:<22} {'error':>10}")
+            continue
+        total_ms = times.get(target, (0, 0))[1] / 1000
+        budget = budgets.get(target)
+        top = ", ".join(f"{name} {us / 1000:.0f}" for name, us in top_packages(times, target, args.top))
+        print(f"{target:<22} {total_ms:>10.1f} {budget if budget is not None else '-':>10}  {top}")
+
+        if budget is not None and total_ms > budget:
+            failures.append(f"{target}: {total_ms:.0f} ms exceeds the {budget:g} ms budget")
+        eager = [name for name in DEFERRED_MODULES if name in times]
+        if eager:
+            failures.append(f"{target}: imports {', '.join(eager)} at import time")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Benchmark: response parsing hot paths on recorded LLM responses.
+
+Runs the text-processing functions of agents.py (the _parse_*_response
+entry points and the _extract_* helpers they call) and the regex parser of
+agents/profile_agent.py against the recorded responses in
+benchmarks/fixtures/, including the markdown-bold, numbered and
+missing-section variants the fallbacks exist for. No provider is called.
+
+For every fixture and function it reports the time per call, throughput and
+the peak memory allocated during one call (tracemalloc). Results can be
+saved and compared against an earlier run to spot regressions:
+
+Usage:
+    python benchmarks/bench_parsers.py [--number N] [--repeat R] [--only SUBSTRING]
+    python benchmarks/bench_parsers.py --save baseline.json
+    python benchmarks/bench_parsers.py --compare baseline.json [--threshold 10]
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from agents.profile_agent import ProfileAnalysisAgent  # noqa: E402
+from section_parser import parse_sections  # noqa: E402
+
+FIXTURE_DIR = os.path.join(HERE, "fixtures")
+
+SAMPLE_PROFILE = {
+    "name": "Alex Morgan",
+    "headline": "Senior Software Engineer",
+    "summary": "Engineer who scaled a SaaS platform to 2M+ users and cut API latency by 40%.",
+    "location": "San Francisco, CA",
+    "experience": [
+        {"title": "Senior Software Engineer", "company": "TechCorp", "duration": "2021 - Present"},
+        {"title": "Software Engineer", "company": "StartupXYZ", "duration": "2018 - 2021"},
+        {"title": "Junior Developer", "company": "WebAgency", "duration": "2016 - 2018"},
+    ],
+    "education": [{"school": "UC Berkeley", "degree": "BS Computer Science", "duration": "2012 - 2016"}],
+    "skills": ["Python", "JavaScript", "React", "Node.js", "AWS", "Docker", "Kubernetes"],
+    "connections": 500,
+}
+ORIGINAL_CONTENT = "Senior Software Engineer at TechCorp"
+JOB_DESCRIPTION = "Staff Platform Engineer: Go, Kubernetes, Terraform, Kafka."
+
+
+def load_agents():
+    """agents.py as a module (the agents/ package shadows it for normal imports)"""
+    spec = importlib.util.spec_from_file_location("linkedin_agents", os.path.join(ROOT, "agents.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_cases(agent, profile_agent):
+    """Functions to run per response type, as (label, callable taking the response text)"""
+    return {
+        "profile_analysis": [
+            ("_parse_analysis_response", lambda text: agent._parse_analysis_response(text, SAMPLE_PROFILE)),
+            ("_extract_score", lambda text: agent._extract_score(text, "overall")),
+            ("_extract_list_items", lambda text: agent._extract_list_items(text, "strengths")),
+            ("ProfileAnalysisAgent.parse_response", profile_agent.parse_response),
+        ],
+        "job_fit": [
+            ("_parse_job_fit_response", lambda text: agent._parse_job_fit_response(text, SAMPLE_PROFILE, JOB_DESCRIPTION)),
+            ("_extract_score", lambda text: agent._extract_score(text, "fit")),
+        ],
+        "content_optimization": [
+            ("_parse_optimization_response", lambda text: agent._parse_optimization_response(text, "headline", ORIGINAL_CONTENT)),
+            ("_extract_optimized_content", agent._extract_optimized_content),
+            ("_extract_alternatives", agent._extract_alternatives),
+        ],
+        "career_guidance": [
+            ("_parse_career_guidance_response", lambda text: agent._parse_career_guidance_response(text, SAMPLE_PROFILE)),
+        ],
+    }
+
+
+def load_fixtures(kinds):
+    fixtures = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        if not name.endswith(".txt"):
+            continue
+        kind = next((k for k in kinds if name.startswith(k)), None)
+        if kind is None:
+            continue
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            fixtures.append((name[:-4], kind, f.read()))
+    return fixtures
+
+
+def uncached(fn):
+    # Clear the section parser memo so each call measures a real parse
+    def call(text):
+        parse_sections.cache_clear()
+        return fn(text)
+    return call
+
+
+def measure_time(fn, text, number, repeat):
+    best = min(timeit.repeat(lambda: fn(text), number=number, repeat=repeat))
+    return best / number
+
+
+def measure_alloc(fn, text):
+    """Peak bytes allocated during one call and bytes still held afterwards"""
+    fn(text)  # warm regex and other module-level caches first
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = fn(text)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - before, current - before
+
+
+def run(args):
+    agents = load_agents()
+    cases = build_cases(agents.LinkedInOptimizerAgent(), ProfileAnalysisAgent())
+    fixtures = load_fixtures(cases)
+    if not fixtures:
+        sys.exit(f"No fixtures found in {FIXTURE_DIR}")
+
+    results = {}
+    for fixture, kind, text in fixtures:
+        for label, fn in cases[kind]:
+            key = f"{fixture}::{label}"
+            if args.only and args.only not in key:
+                continue
+            fn = fn if args.memo else uncached(fn)
+            seconds = measure_time(fn, text, args.number, args.repeat)
+            peak, retained = measure_alloc(fn, text)
+            results[key] = {
+                "us_per_call": seconds * 1e6,
+                "calls_per_s": 1 / seconds if seconds else 0.0,
+                "peak_bytes": peak,
+                "retained_bytes": retained,
+            }
+    return results
+
+
+def _delta(new, old):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def print_results(results, baseline=None, threshold=10.0):
+    """Aligned table; with a baseline, adds time/alloc deltas and returns the regressed keys"""
+    width = max(len(k) for k in results) + 2
+    header = f"{'fixture::function':<{width}} {'µs/call':>9} {'calls/s':>10} {'peak KiB':>9}"
+    if baseline:
+        header += f" {'Δ time':>8} {'Δ peak':>8}"
+    print(header)
+
+    regressions = []
+    for key, row in results.items():
+        line = (
+            f"{key:<{width}} {row['us_per_call']:>9.1f} {row['calls_per_s']:>10,.0f} "
+            f"{row['peak_bytes'] / 1024:>9.1f}"
+        )
+        old = (baseline or {}).get(key)
+        if old:
+            time_delta = _delta(row["us_per_call"], old["us_per_call"])
+            peak_delta = _delta(row["peak_bytes"], old["peak_bytes"])
+            line += f" {time_delta:>+7.1f}% {peak_delta:>+7.1f}%"
+            if time_delta > threshold or peak_delta > threshold:
+                regressions.append(key)
+                line += "  REGRESSION"
+        elif baseline:
+            line += f" {'new':>8}"
+        print(line)
+
+    total = sum(row["us_per_call"] for row in results.values())
+    print(f"{'TOTAL':<{width}} {total:>9.1f}")
+    if baseline:
+        shared = [k for k in results if k in baseline]
+        if shared:
+            old_total = sum(baseline[k]["us_per_call"] for k in shared)
+            new_total = sum(results[k]["us_per_call"] for k in shared)
+            print(f"Shared cases: {len(shared)}, total time {_delta(new_total, old_total):+.1f}% vs baseline")
+        missing = [k for k in baseline if k not in results]
+        if missing:
+            print(f"Not run (in baseline only): {len(missing)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is reported)")
+    parser.add_argument("--only", help="run only cases whose fixture::function contains this")
+    parser.add_argument("--memo", action="store_true", help="keep the parse_sections memo between calls")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON for later comparison")
+    parser.add_argument("--compare", metavar="PATH", help="compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent slowdown or extra peak memory reported as a regression")
+    args = parser.parse_args()
+
+    # The fallbacks log on every call; keep the output to the table
+    logging.disable(logging.WARNING)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = run(args)
+    if not results:
+        sys.exit("No cases matched")
+    regressions = print_results(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "number": args.number,
+                "repeat": args.repeat,
+                "memo": args.memo,
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Microbenchmark: section_parser.parse_sections vs the legacy regex cascade.
+
+Runs every list lookup that agents.py performs for a response against the
+recorded responses in benchmarks/fixtures/ and reports the time per full
+response parse (all lookups for that response).
+
+Fails (exit status 1) when a lookup listed in EXPECTED returns anything
+other than its known-correct items.
+
+Usage:
+    python benchmarks/bench_section_parser.py [--number N] [--repeat R]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from legacy_list_extractor import extract_list_items  # noqa: E402
+from section_parser import parse_sections  # noqa: E402
+
+FIXTURE_DIR = os.path.join(HERE, "fixtures")
+
+# Keywords agents.py looks up for each response type
+LOOKUPS = {
+    "profile_analysis": ["strengths", "weaknesses", "recommendations", "keywords"],
+    "job_fit": ["missing skills", "competitive advantages", "improvement recommendations", "application tips"],
+    "content_optimization": ["key improvements", "keywords added"],
+    "career_guidance": [
+        "growth opportunities", "priority skills", "learning resources",
+        "networking strategy", "market trends", "action plan",
+    ],
+}
+
+# Known-correct lookups, checked on every run (the legacy cascade gets some of these wrong)
+EXPECTED = {
+    "profile_analysis_numbered.txt": {
+        "weaknesses": [
+            "Headline does not state a specialization or outcome, so it blends in with similar profiles",
+            "Earlier roles have no metrics, which makes their impact hard to judge",
+            "Skills section omits distributed systems, observability and Terraform",
+            "No recommendations from managers or peers to add social proof",
+        ],
+        "keywords": [
+            "Platform Engineering, Distributed Systems, Kubernetes, Terraform, Observability, Technical Leadership",
+        ],
+    },
+}
+
+
+def load_fixtures():
+    fixtures = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        if not name.endswith(".txt"):
+            continue
+        kind = next((k for k in LOOKUPS if name.startswith(k)), None)
+        if kind is None:
+            continue
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            fixtures.append((name, f.read(), LOOKUPS[kind]))
+    return fixtures
+
+
+def run_legacy(text, keywords):
+    return [extract_list_items(text, keyword)[:10] for keyword in keywords]
+
+
+def run_parser(text, keywords):
+    # Bypass the memo so each iteration measures a real parse
+    sections = parse_sections.__wrapped__(text)
+    return [sections.get(keyword)[:10] for keyword in keywords]
+
+
+def run_parser_cached(text, keywords):
+    sections = parse_sections(text)
+    return [sections.get(keyword)[:10] for keyword in keywords]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is reported)")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        sys.exit(f"No fixtures found in {FIXTURE_DIR}")
+
+    print(f"{'fixture':<42} {'legacy µs':>10} {'parser µs':>10} {'memo µs':>9} {'speedup':>8}  agree")
+    totals = [0.0, 0.0, 0.0]
+    mismatches = []
+    for name, text, keywords in fixtures:
+        timings = []
+        for fn in (run_legacy, run_parser, run_parser_cached):
+            best = min(timeit.repeat(lambda: fn(text, keywords), number=args.number, repeat=args.repeat))
+            timings.append(best / args.number * 1e6)
+        for i, value in enumerate(timings):
+            totals[i] += value
+
+        legacy, new = run_legacy(text, keywords), run_parser(text, keywords)
+        agree = sum(1 for a, b in zip(legacy, new) if a == b)
+        for keyword, items in EXPECTED.get(name, {}).items():
+            got = new[keywords.index(keyword)]
+            if got != items:
+                mismatches.append(f"{name} {keyword}: expected {items!r}, got {got!r}")
+        print(
+            f"{name:<42} {timings[0]:>10.1f} {timings[1]:>10.1f} {timings[2]:>9.1f} "
+            f"{timings[0] / timings[1]:>7.1f}x  {agree}/{len(keywords)}"
+        )
+
+    print(
+        f"{'TOTAL':<42} {totals[0]:>10.1f} {totals[1]:>10.1f} {totals[2]:>9.1f} "
+        f"{totals[0] / totals[1]:>7.1f}x"
+    )
+
+    if mismatches:
+        print()
+        for mismatch in mismatches:
+            print(f"FAIL {mismatch}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
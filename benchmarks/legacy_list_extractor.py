@@ -0,0 +1,157 @@
+"""
+Reference copy of the regex-cascade list extractor that agents.py used before
+section_parser. Kept only so bench_section_parser.py can compare against it;
+logging calls are dropped and the fallback path returns [].
+"""
+
+import re
+from typing import List
+
+
+def extract_list_items(text: str, keyword: str) -> List[str]:
+    """Legacy regex-cascade extractor (agents.py before the section parser)"""
+    keyword_variations = [
+        keyword.lower(),
+        keyword.lower().replace('_', ' '),
+        keyword.lower().replace('_', ''),
+        keyword.upper(),
+        keyword.capitalize(),
+        keyword.title()
+    ]
+
+    # Add specific variations for common keywords
+    if keyword.lower() == 'application':
+        keyword_variations.extend(['application tips', 'tips', 'application strategy'])
+    elif keyword.lower() == 'improvements':
+        keyword_variations.extend(['key improvements', 'improvements made', 'changes'])
+    elif keyword.lower() == 'networking':
+        keyword_variations.extend(['networking strategy', 'network building', 'professional network'])
+    elif keyword.lower() == 'opportunities':
+        keyword_variations.extend(['growth opportunities', 'career opportunities', 'next career moves'])
+    elif keyword.lower() == 'resources':
+        keyword_variations.extend(['learning resources', 'courses', 'certifications', 'training'])
+    elif keyword.lower() == 'action':
+        keyword_variations.extend(['action plan', 'roadmap', 'next steps', 'recommendations'])
+
+    section_patterns = []
+    for var in keyword_variations:
+        section_patterns.extend([
+            # Pattern 1: Section header followed by ** and then content
+            rf"{re.escape(var)}[:\s]*\n?\*\*\n?(.*?)(?=\n\n|\n[A-Z][A-Z\s]*:|\n\d+\.|$)",
+            # Pattern 2: Section header with content directly after
+            rf"{re.escape(var)}[:\s]*\n?((?:(?!\n\n|\n[A-Z][A-Z\s]*:).)*)",
+            # Pattern 3: Section header in bold
+            rf"\*\*{re.escape(var)}\*\*[:\s]*\n?(.*?)(?=\n\n|\n\*\*[A-Z]|\n\d+\.|$)",
+            # Pattern 4: Section header with markdown
+            rf"#{1,3}\s*{re.escape(var)}[:\s]*\n?(.*?)(?=\n\n|\n#{1,3}|\n\d+\.|$)",
+            # Pattern 5: Section header at start of line
+            rf"^{re.escape(var)}[:\s]*\n?((?:(?!\n\n|\n[A-Z][A-Z\s]*:).)*)",
+            # Pattern 6: Numbered section
+            rf"^\d+\.\s*{re.escape(var)}[:\s]*\n?(.*?)(?=\n\n|\n\d+\.|\n[A-Z]|$)"
+        ])
+
+    section_text = ""
+    matched_pattern = ""
+
+    for pattern in section_patterns:
+        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL | re.MULTILINE)
+        if match:
+            section_text = match.group(1).strip()
+            matched_pattern = pattern
+            break
+
+    if not section_text:
+
+        lines = text.split('\n')
+        for i, line in enumerate(lines):
+            if any(var in line.lower() for var in keyword_variations):
+                # Found keyword, collect following lines
+                section_lines = []
+                start_collecting = False
+
+                # Check if the next line is just ** (common AI formatting)
+                if i + 1 < len(lines) and lines[i + 1].strip() == '**':
+                    start_collecting = True
+                    start_idx = i + 2  # Skip the ** line
+                else:
+                    start_collecting = True
+                    start_idx = i + 1
+
+                if start_collecting:
+                    for j in range(start_idx, min(start_idx + 20, len(lines))):  # Look ahead 20 lines max
+                        if j >= len(lines):
+                            break
+                        next_line = lines[j].strip()
+                        if not next_line:
+                            continue
+                        # Stop if we hit another major section
+                        if (re.match(r'^[A-Z][A-Z\s]*:$', next_line) or
+                            re.match(r'^\*\*[A-Z]', next_line) or
+                            next_line.isupper()):
+                            break
+                        section_lines.append(next_line)
+
+                if section_lines:
+                    section_text = '\n'.join(section_lines)
+                    break
+
+    # Extract items from the section text
+    items = []
+    if section_text:
+        # Enhanced item extraction patterns
+        item_patterns = [
+            r'^\s*[•\-\*]\s*(.+)',  # Bullet points
+            r'^\s*\d+\.\s*(.+)',    # Numbered lists
+            r'^\s*-\s*(.+)',        # Dash lists
+            r'^\s*\*\s*(.+)',       # Asterisk lists
+            r'^\s*→\s*(.+)',        # Arrow lists
+            r'^\s*▪\s*(.+)',        # Square bullet
+            r'^\s*◦\s*(.+)',        # Circle bullet
+        ]
+
+        lines = section_text.split('\n')
+        for line in lines:
+            line = line.strip()
+            if not line or len(line) < 3:
+                continue
+
+            # Try each pattern
+            item_found = False
+            for pattern in item_patterns:
+                match = re.match(pattern, line)
+                if match:
+                    item_content = match.group(1).strip()
+                    if len(item_content) > 5:  # Only substantial content
+                        items.append(item_content)
+                        item_found = True
+                        break
+
+            # If no pattern matched but it's a substantial line, include it
+            if not item_found and len(line) > 10:
+                # Skip if it looks like a section header
+                if not (re.match(r'^[A-Z][A-Z\s]*:$', line) or
+                       line.startswith('**') and line.endswith('**')):
+                    items.append(line)
+
+    # Clean up and format items
+    cleaned_items = []
+    for item in items:
+        # Remove markdown formatting
+        cleaned_item = re.sub(r'\*\*(.*?)\*\*', r'\1', item)  # **bold** → bold
+        cleaned_item = re.sub(r'\*(.*?)\*', r'\1', cleaned_item)  # *italic* → italic
+
+        # Remove extra symbols and clean up
+        cleaned_item = cleaned_item.strip(' -•*:→▪◦')
+
+        # Remove trailing colons
+        if cleaned_item.endswith(':'):
+            cleaned_item = cleaned_item[:-1].strip()
+
+        # Only add substantial content
+        if len(cleaned_item) > 8 and not cleaned_item.lower().startswith('detailed'):
+            cleaned_items.append(cleaned_item)
+
+    if cleaned_items:
+        return cleaned_items[:10]  # Limit to top 10 items
+    else:
+        return []
@@ -22,6 +22,10 @@ class AIProviderConfig:
         "model": "meta/llama3-70b-instruct",
         "max_tokens": 2048,
         "temperature": 0.7,
+        "supports_response_format": True,
+        # Client-side limits (None = unlimited); free tier allows ~40 requests/min
+        "requests_per_minute": int(os.getenv("NVIDIA_RPM", "40")),
+        "tokens_per_minute": None,
     }
 
     # ---------- Groq (alternative – free) ----------
@@ -31,6 +35,9 @@ class AIProviderConfig:
         "model": "llama-3.1-8b-instant",
         "max_tokens": 4096,
         "temperature": 0.7,
+        "supports_response_format": True,
+        "requests_per_minute": int(os.getenv("GROQ_RPM", "30")),
+        "tokens_per_minute": int(os.getenv("GROQ_TPM", "6000")),
     }
 
     # ---------- Hugging Face (backup – free) ----------
@@ -40,6 +47,49 @@ class AIProviderConfig:
         "model": "microsoft/DialoGPT-large",
         "max_tokens": 1024,
         "temperature": 0.7,
+        "supports_response_format": False,
+        "requests_per_minute": int(os.getenv("HUGGINGFACE_RPM", "30")),
+        "tokens_per_minute": None,
+    }
+
+    # ---------- Shared HTTP connection pool ----------
+    # Used by AsyncAIProvider (one pooled client per provider) and by the
+    # HuggingFace requests session. HTTP/2 is used when the h2 package is installed.
+    HTTP_POOL_CONFIG = {
+        "max_connections": int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "200")),
+        "max_keepalive_connections": int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "50")),
+        "keepalive_expiry": 30.0,
+        "http2": True,
+        "timeout": 60.0,
+        "connect_timeout": 10.0,
+    }
+
+    # ---------- Provider routing ----------
+    # Rolling latency/error window per provider and circuit breaker settings.
+    # A provider with open circuit is skipped until a half-open probe succeeds;
+    # another provider must beat the preferred one's p95 by preferred_margin.
+    # explore_rate is the share of requests sent to the least-measured provider.
+    ROUTING_CONFIG = {
+        "enabled": os.getenv("AI_ROUTING_ENABLED", "true").lower() != "false",
+        "window_size": 100,
+        "window_seconds": 300.0,
+        "min_samples": 5,
+        "preferred_margin": 1.25,
+        "max_error_rate": 0.5,
+        "explore_rate": 0.05,
+        "failure_threshold": 3,
+        "open_seconds": 30.0,
+        "max_open_seconds": 300.0,
+    }
+
+    # ---------- Client-side rate limiting ----------
+    # Per-provider token buckets use requests_per_minute / tokens_per_minute from
+    # the provider configs above. Requests over the limit wait in a bounded
+    # priority queue (interactive chat > default > batch) for at most max_wait seconds.
+    RATE_LIMIT_CONFIG = {
+        "enabled": os.getenv("AI_RATE_LIMIT_ENABLED", "true").lower() != "false",
+        "max_queue": int(os.getenv("AI_RATE_LIMIT_MAX_QUEUE", "100")),
+        "max_wait": {"interactive": 30.0, "default": 60.0, "batch": 300.0},
     }
 
 
@@ -60,6 +110,164 @@ class AppConfig:
         "APIFY_LINKEDIN_ACTOR",
         "mritunjayp.tt.21/mass-linkedin-profile-scraper"  # Your saved task
     )
+    # Batch scraping: profile URLs packed into one task run, and dataset page size
+    APIFY_BATCH_CONFIG = {
+        "chunk_size": int(os.getenv("APIFY_BATCH_CHUNK_SIZE", "25")),
+        "dataset_page_size": 100,
+    }
+
+    # Asynchronous run engine (apify_runner.py): runs are started without
+    # blocking, polled with exponential backoff (or woken by a webhook when
+    # APIFY_WEBHOOK_URL points at the local receiver) and aborted after
+    # run_timeout seconds. At most max_concurrent_runs are active at once.
+    APIFY_RUNS_CONFIG = {
+        "api_url": "https://api.apify.com/v2",
+        "max_concurrent_runs": int(os.getenv("APIFY_MAX_CONCURRENT_RUNS", "5")),
+        "poll_initial": 2.0,
+        "poll_max": 30.0,
+        "poll_factor": 1.5,
+        "run_timeout": 300.0,
+        "request_timeout": 30.0,
+        "webhook_host": "127.0.0.1",
+        "webhook_port": int(os.getenv("APIFY_WEBHOOK_PORT", "0")),
+        "webhook_url": os.getenv("APIFY_WEBHOOK_URL"),
+    }
+
+    # --------- Scraped profile store ----------
+    # Profiles younger than max_age are served from disk; older ones up to
+    # max_stale are served immediately and refreshed in the background.
+    PROFILE_STORE_CONFIG = {
+        "enabled": os.getenv("PROFILE_STORE_ENABLED", "true").lower() != "false",
+        "path": os.getenv("PROFILE_STORE_DB", ".profile_store.db"),
+        "max_age": 24 * 3600,
+        "max_stale": 30 * 24 * 3600,
+        "refresh_workers": 2,
+    }
+
+    # --------- LLM response cache ----------
+    # TTLs are in seconds; 0 means "never expires". Set RESPONSE_CACHE_DB to a
+    # file path to enable the on-disk SQLite tier shared across processes.
+    RESPONSE_CACHE_CONFIG = {
+        "enabled": os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() != "false",
+        "max_entries": 512,
+        "max_bytes": 16 * 1024 * 1024,
+        "default_ttl": 3600,
+        "sqlite_path": os.getenv("RESPONSE_CACHE_DB"),
+        "sqlite_max_bytes": 256 * 1024 * 1024,
+        "task_ttls": {
+            "profile": 6 * 3600,
+            "job_fit": 6 * 3600,
+            "content": 3600,
+            "guidance": 6 * 3600,
+            "chat": 900,
+        },
+    }
+
+    # --------- Request coalescing (singleflight.py) ----------
+    # Identical LLM requests and profile scrapes that overlap in time share
+    # one upstream call instead of each paying for it.
+    SINGLEFLIGHT_CONFIG = {
+        "enabled": os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() != "false",
+    }
+
+    # --------- Semantic chat cache ----------
+    # Near-duplicate chat questions (cosine similarity >= threshold on hashed
+    # n-gram embeddings) from similar profiles reuse an earlier answer.
+    SEMANTIC_CACHE_CONFIG = {
+        "enabled": os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() != "false",
+        "threshold": float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.75")),
+        "max_entries": 1024,
+        "ttl": 24 * 3600,
+        "dims": 2048,
+    }
+
+    # --------- Chat memory ----------
+    # Recent turns are kept verbatim up to history_tokens; older turns are
+    # folded into a rolling summary of at most summary_tokens. Folding goes
+    # down to fold_ratio of the budget so it runs once every few turns.
+    CHAT_MEMORY_CONFIG = {
+        "history_tokens": int(os.getenv("CHAT_HISTORY_TOKENS", "1500")),
+        "summary_tokens": 300,
+        "fold_ratio": 0.5,
+        "min_recent_turns": 2,
+        "llm_summary": os.getenv("CHAT_LLM_SUMMARY", "true").lower() != "false",
+        "max_display_messages": 200,
+    }
+
+    # --------- Incremental re-analysis (incremental_analysis.py) ----------
+    # analyze_profile() keeps each profile's last analysis with per-section
+    # content hashes; re-running it only re-scores the sections that changed.
+    # More than max_changed_sections changes get a full analysis instead.
+    INCREMENTAL_ANALYSIS_CONFIG = {
+        "enabled": os.getenv("INCREMENTAL_ANALYSIS_ENABLED", "true").lower() != "false",
+        "max_changed_sections": int(os.getenv("INCREMENTAL_MAX_CHANGED_SECTIONS", "3")),
+        "max_profiles": 256,
+        "ttl": 24 * 3600,
+    }
+
+    # --------- Full report fan-out ----------
+    # Bounded pool shared by every route_full_report() call in the process;
+    # agent_timeout is the per-agent budget in seconds.
+    FULL_REPORT_CONFIG = {
+        "max_workers": int(os.getenv("FULL_REPORT_MAX_WORKERS", "10")),
+        "agent_timeout": 120.0,
+        "chat_question": "What are the three highest-impact quick wins for this LinkedIn profile?",
+    }
+
+    # --------- Background analysis jobs (job_manager.py) ----------
+    # App pages submit agent requests to one worker pool shared by all
+    # sessions and poll for the result every poll_interval seconds. Results
+    # that are never collected are dropped after result_ttl seconds.
+    JOBS_CONFIG = {
+        "max_workers": int(os.getenv("JOB_MAX_WORKERS", "8")),
+        "result_ttl": 3600.0,
+        "max_jobs": 2000,
+        "poll_interval": 1.0,
+    }
+
+    # --------- Telemetry ----------
+    # Per-call LLM and Apify metrics (telemetry.py), shown in the sidebar and
+    # exportable as Prometheus text; recent_calls bounds the call log.
+    TELEMETRY_CONFIG = {
+        "enabled": os.getenv("TELEMETRY_ENABLED", "true").lower() != "false",
+        "recent_calls": 200,
+        "latency_buckets": [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0],
+    }
+
+    # --------- Batch profile analysis (batch_runner.py) ----------
+    # Workers default to what the available providers' request budgets can keep
+    # busy (requests/min x expected_latency / 60), capped at max_workers.
+    # Items that fail because no provider answered are retried after a shared
+    # exponential backoff, up to max_attempts per run.
+    BATCH_CONFIG = {
+        "max_workers": int(os.getenv("BATCH_MAX_WORKERS", "8")),
+        "expected_latency": 15.0,
+        "max_attempts": 3,
+        "backoff": 30.0,
+        "max_backoff": 300.0,
+        "progress_interval": 10.0,
+        "parquet_row_group": 500,
+    }
+
+    # --------- Offline job matching ----------
+    # Local skill/keyword pre-scoring in job_matching.py. source_coverage is how
+    # much a skill counts depending on where the profile mentions it; bm25_k1
+    # and bm25_b shape term-frequency saturation in job descriptions.
+    JOB_MATCHING_CONFIG = {
+        "source_coverage": {
+            "skills": 1.0,
+            "experience": 0.8,
+            "certifications": 0.7,
+            "education": 0.5,
+            "headline": 0.6,
+            "summary": 0.6,
+        },
+        "preferred_weight": 0.5,
+        "bm25_k1": 1.2,
+        "bm25_b": 0.75,
+        "skill_weight": 0.75,
+        "max_missing_skills": 8,
+    }
 
     # Single-agent prompt (unchanged but included for completeness)
     AGENT_CONFIG = {
@@ -71,6 +279,11 @@ class AppConfig:
             "Always deliver specific, actionable advice, quantified assessments, "
             "and industry-relevant insights."
         ),
+        # Opt-in structured output: agents request JSON validated against
+        # schemas.py instead of scraping the free-text format.
+        "json_mode": os.getenv("AGENT_JSON_MODE", "false").lower() == "true",
+        "json_max_tokens": 1200,
+        "json_max_retries": 1,
     }
 
     # ---------- Helper methods ----------
@@ -0,0 +1,186 @@
+"""
+Conversation memory for LinkedIn Profile Optimizer
+Keeps chat history within a token budget: recent turns are sent verbatim,
+older turns are folded into a rolling summary that is updated incrementally,
+so prompt size stays bounded however long the session runs.
+"""
+
+import logging
+import re
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+from config import AppConfig
+from token_utils import count_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a LinkedIn career coach. "
+    "Keep facts about the user (goals, role, constraints), advice already given and open questions. "
+    "Be concise and write plain sentences."
+)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so it fits max_tokens"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= max_tokens - 1:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low]) + "…"
+
+
+def extractive_summary(summary: str, turns: List[Dict[str, str]], max_tokens: int) -> str:
+    """Local fallback: keep the first sentence of every folded turn"""
+    lines = [summary] if summary else []
+    for turn in turns:
+        first = _SENTENCE_RE.split(turn["content"].strip(), 1)[0]
+        lines.append(f"{turn['role'].title()}: {truncate_to_tokens(first, 40)}")
+    # Newest information matters most: drop the oldest lines first
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+
+def llm_summary(summary: str, turns: List[Dict[str, str]], max_tokens: int) -> str:
+    """Fold turns into the existing summary with one short LLM call"""
+    from ai_providers import UNAVAILABLE_MESSAGE, get_ai_response
+
+    transcript = "\n".join(f"{t['role'].title()}: {t['content']}" for t in turns)
+    prompt = (
+        f"CURRENT SUMMARY:\n{summary or '(empty)'}\n\n"
+        f"NEW MESSAGES:\n{transcript}\n\n"
+        f"Rewrite the summary to include the new messages in at most {max_tokens * 3 // 4} words."
+    )
+    response = get_ai_response(prompt, SUMMARY_SYSTEM_PROMPT, task="summary", max_tokens=max_tokens, temperature=0.2)
+    if not response or response == UNAVAILABLE_MESSAGE:
+        return extractive_summary(summary, turns, max_tokens)
+    return truncate_to_tokens(response.strip(), max_tokens)
+
+
+class ConversationMemory:
+    """Token-budgeted chat history with a rolling summary of older turns"""
+
+    def __init__(
+        self,
+        history_tokens: int = 1500,
+        summary_tokens: int = 300,
+        fold_ratio: float = 0.5,
+        min_recent_turns: int = 2,
+        summarizer: Optional[Callable[[str, List[Dict[str, str]], int], str]] = None,
+    ):
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.fold_ratio = fold_ratio
+        self.min_recent_turns = min_recent_turns
+        self.summarizer = summarizer or llm_summary
+        self.summary = ""
+        self.turns: List[Dict[str, Any]] = []  # recent turns, each with its token count
+        self.folded_turns = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None, **overrides: Any) -> "ConversationMemory":
+        config = config or AppConfig.CHAT_MEMORY_CONFIG
+        options = {
+            "history_tokens": config.get("history_tokens", 1500),
+            "summary_tokens": config.get("summary_tokens", 300),
+            "fold_ratio": config.get("fold_ratio", 0.5),
+            "min_recent_turns": config.get("min_recent_turns", 2),
+            "summarizer": None if config.get("llm_summary", True) else extractive_summary,
+        }
+        options.update(overrides)
+        return cls(**options)
+
+    @classmethod
+    def from_messages(cls, messages: List[Dict[str, str]], **kwargs: Any) -> "ConversationMemory":
+        """Build memory from a plain [{"role", "content"}] list (summarizes locally unless told otherwise)"""
+        kwargs.setdefault("summarizer", extractive_summary)
+        memory = cls.from_config(**kwargs)
+        for message in messages:
+            memory.add(message.get("role", "user"), message.get("content", ""))
+        return memory
+
+    def __len__(self) -> int:
+        return self.folded_turns + len(self.turns)
+
+    @property
+    def recent_tokens(self) -> int:
+        return sum(turn["tokens"] for turn in self.turns)
+
+    def add(self, role: str, content: str) -> None:
+        """Record a turn; folds the oldest turns into the summary once the budget is exceeded"""
+        with self._lock:
+            self.turns.append({"role": role, "content": content, "tokens": count_tokens(content) + 2})
+            if self.recent_tokens > self.history_tokens:
+                self._fold()
+
+    def _fold(self) -> None:
+        # Fold down to fold_ratio of the budget, not just under it, so the
+        # summarizer runs once every few turns instead of on every turn
+        target = int(self.history_tokens * self.fold_ratio)
+        folded = []
+        while len(self.turns) > self.min_recent_turns and self.recent_tokens > target:
+            folded.append(self.turns.pop(0))
+        if not folded:
+            return
+        turns = [{"role": t["role"], "content": t["content"]} for t in folded]
+        try:
+            self.summary = truncate_to_tokens(self.summarizer(self.summary, turns, self.summary_tokens), self.summary_tokens)
+        except Exception as e:
+            logger.error(f"Conversation summary failed, using extractive summary: {e}")
+            self.summary = extractive_summary(self.summary, turns, self.summary_tokens)
+        self.folded_turns += len(folded)
+        logger.info(f"Folded {len(folded)} chat turns into the summary ({count_tokens(self.summary)} tokens)")
+
+    def render(self, max_tokens: Optional[int] = None) -> str:
+        """
+        Prompt block with the summary and as many recent turns (newest first)
+        as fit max_tokens (defaults to the history budget plus the summary).
+        """
+        with self._lock:
+            budget = max_tokens if max_tokens is not None else self.history_tokens + self.summary_tokens
+            summary = truncate_to_tokens(self.summary, budget // 2) if self.summary else ""
+            budget -= count_tokens(summary)
+            lines: List[str] = []
+            for turn in reversed(self.turns):
+                if turn["tokens"] > budget:
+                    if not lines:
+                        # Always keep the latest turn, shortened if it must be
+                        lines.append(f"{turn['role'].title()}: {truncate_to_tokens(turn['content'], max(budget, 20))}")
+                    break
+                lines.append(f"{turn['role'].title()}: {turn['content']}")
+                budget -= turn["tokens"]
+        block = ""
+        if summary:
+            block += f"CONVERSATION SUMMARY:\n{summary}\n"
+        if lines:
+            block += "CONVERSATION HISTORY:\n" + "\n".join(reversed(lines)) + "\n"
+        return block
+
+    def clear(self) -> None:
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+            self.folded_turns = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "turns": self.folded_turns + len(self.turns),
+                "recent_turns": len(self.turns),
+                "folded_turns": self.folded_turns,
+                "recent_tokens": self.recent_tokens,
+                "summary_tokens": count_tokens(self.summary),
+            }
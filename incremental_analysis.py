@@ -0,0 +1,269 @@
+"""
+Incremental profile re-analysis for LinkedIn Profile Optimizer
+Keeps each profile's last analysis together with content hashes of its
+sections (headline, summary, every experience entry, education, skills).
+When the profile is analyzed again, only the sections whose hashes changed
+go back to the LLM; the scores and list items of the others are reused and
+merged with the new ones. Only profiles with a LinkedIn URL are tracked
+across edits; others can only reuse an analysis of identical content.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from config import AppConfig
+from linkedin_scraper import DirectLinkedInScraper
+from prepared_profile import profile_version
+from section_parser import parse_sections
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("headline", "summary", "experience", "education", "skills")
+
+# Every section is judged in the light of these; a change re-analyzes everything
+CONTEXT_FIELDS = ("name", "location", "industry")
+
+# List fields of an analysis and how many items a merged analysis keeps
+LIST_LIMITS = {"strengths": 6, "weaknesses": 5, "recommendations": 8, "keywords": 6}
+
+# An item mentioning one of these is taken to be about that section
+SECTION_TERMS = {
+    "headline": ("headline",),
+    "summary": ("summary", "about section"),
+    "experience": ("experience", "position", "role", "employer"),
+    "education": ("education", "degree", "school", "university"),
+    "skills": ("skill", "endorsement"),
+}
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def section_hashes(profile_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Content hash per section; experience gets one hash per position"""
+    return {
+        "context": _digest({field: profile_data.get(field) for field in CONTEXT_FIELDS}),
+        "headline": _digest(profile_data.get("headline") or ""),
+        "summary": _digest(profile_data.get("summary") or ""),
+        "experience": [_digest(entry) for entry in profile_data.get("experience") or []],
+        "education": _digest(profile_data.get("education") or []),
+        "skills": _digest(profile_data.get("skills") or []),
+    }
+
+
+def profile_key(profile_data: Dict[str, Any]) -> str:
+    """
+    Identity of a profile across edits: its canonical LinkedIn URL. A profile
+    without one is keyed by its full content hash, so it can only match an
+    identical profile (never someone else's with the same name).
+    """
+    url = profile_data.get("profile_url") or ""
+    if DirectLinkedInScraper._is_valid_linkedin_url(url):
+        return DirectLinkedInScraper._canonical_profile_url(url)
+    return f"version:{profile_version(profile_data)}"
+
+
+def changed_positions(old: Dict[str, Any], new: Dict[str, Any]) -> List[int]:
+    """1-based indexes of experience entries that are new or differ from before"""
+    return [i + 1 for i, digest in enumerate(new["experience"]) if digest not in old["experience"]]
+
+
+def section_for(item: str, sections: Optional[List[str]] = None) -> Optional[str]:
+    """Section an item talks about, judged by the terms it mentions"""
+    text = item.lower()
+    for section in sections or SECTIONS:
+        if any(term in text for term in SECTION_TERMS[section]):
+            return section
+    return None
+
+
+def parse_section_update(response: str, sections: List[str]) -> Dict[str, Any]:
+    """
+    Scores and items from a re-analysis response. A section whose score is
+    missing is left out, so the merge keeps its previous score rather than
+    a default.
+    """
+    scores = {}
+    for section in sections:
+        match = re.search(rf"^\W*{section}\W*:?\s*(\d{{1,3}})", response, re.IGNORECASE | re.MULTILINE)
+        if match:
+            scores[section] = min(int(match.group(1)), 100)
+    parsed = parse_sections(response)
+    update: Dict[str, Any] = {"section_scores": scores}
+    for field in LIST_LIMITS:
+        update[field] = list(parsed.get(field) or [])
+    return update
+
+
+class AnalysisRecord:
+    """A profile's last analysis, the section hashes it was made from and which section each item is about"""
+
+    def __init__(
+        self,
+        hashes: Dict[str, Any],
+        analysis: Dict[str, Any],
+        item_sections: Optional[Dict[str, str]] = None,
+        base_feedback: Optional[str] = None,
+    ):
+        self.hashes = hashes
+        self.analysis = copy.deepcopy(analysis)
+        self.item_sections = item_sections or {}
+        # Feedback of the last full analysis; re-analyses are shown on top of it
+        self.base_feedback = analysis.get("detailed_feedback", "") if base_feedback is None else base_feedback
+        self.updated_at = time.time()
+
+    def changed_sections(self, hashes: Dict[str, Any]) -> List[str]:
+        if hashes["context"] != self.hashes["context"]:
+            return list(SECTIONS)
+        return [section for section in SECTIONS if hashes[section] != self.hashes[section]]
+
+    def result(self, changed: List[str]) -> Dict[str, Any]:
+        """Copy of the stored analysis, noting which sections were re-analyzed"""
+        analysis = copy.deepcopy(self.analysis)
+        analysis["incremental"] = {
+            "changed_sections": list(changed),
+            "reused_sections": [section for section in SECTIONS if section not in changed],
+        }
+        return analysis
+
+    def merge(self, hashes: Dict[str, Any], update: Dict[str, Any], changed: List[str], response: str) -> "AnalysisRecord":
+        """
+        New record with the changed sections' scores and items taken from
+        update and everything else kept. The overall score moves by the
+        average change in section scores.
+        """
+        analysis = copy.deepcopy(self.analysis)
+        old_scores = analysis.get("section_scores", {})
+        new_scores = {**old_scores, **update["section_scores"]}
+        shift = sum(new_scores[s] - old_scores.get(s, new_scores[s]) for s in update["section_scores"]) / len(SECTIONS)
+        analysis["section_scores"] = new_scores
+        analysis["overall_score"] = min(max(round(analysis.get("overall_score", 75) + shift), 0), 100)
+
+        item_sections = {}
+        for field, limit in LIST_LIMITS.items():
+            fresh = update.get(field) or []
+            previous = analysis.get(field, [])
+            if field == "keywords":
+                # Keywords are about the profile as a whole: add the new ones in front
+                kept = previous
+            else:
+                kept = [
+                    item for item in previous
+                    if (self.item_sections.get(item) or section_for(item)) not in changed
+                ]
+            for item in fresh:
+                item_sections[item] = section_for(item, changed) or changed[0]
+            seen = set()
+            merged = []
+            for item in fresh + kept:
+                if item.lower() not in seen:
+                    seen.add(item.lower())
+                    merged.append(item)
+            analysis[field] = merged[:limit] or previous
+
+        names = ", ".join(section.title() for section in changed)
+        analysis["detailed_feedback"] = f"RE-ANALYZED SECTIONS ({names}):\n{response}\n\nEARLIER ANALYSIS:\n{self.base_feedback}"
+        kept_sections = {
+            item: section for item, section in {**self.item_sections, **item_sections}.items()
+            if any(item in analysis[field] for field in LIST_LIMITS)
+        }
+        return AnalysisRecord(hashes, analysis, kept_sections, self.base_feedback)
+
+
+class AnalysisStore:
+    """Bounded LRU of the last analysis per profile"""
+
+    def __init__(self, max_profiles: int = 256, ttl: float = 24 * 3600, max_changed_sections: int = 3):
+        self.max_profiles = max_profiles
+        self.ttl = ttl
+        self.max_changed_sections = max_changed_sections
+        self._records: "OrderedDict[str, AnalysisRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.full = 0
+        self.incremental = 0
+        self.unchanged = 0
+        self.sections_reanalyzed = 0
+        self.sections_reused = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["AnalysisStore"]:
+        config = config or AppConfig.INCREMENTAL_ANALYSIS_CONFIG
+        if not config.get("enabled", True):
+            return None
+        return cls(
+            max_profiles=config.get("max_profiles", 256),
+            ttl=config.get("ttl", 24 * 3600),
+            max_changed_sections=config.get("max_changed_sections", 3),
+        )
+
+    def get(self, profile_data: Dict[str, Any]) -> Optional[AnalysisRecord]:
+        key = profile_key(profile_data)
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return None
+            if time.time() - record.updated_at > self.ttl:
+                del self._records[key]
+                return None
+            self._records.move_to_end(key)
+            return record
+
+    def put(self, profile_data: Dict[str, Any], record: AnalysisRecord) -> None:
+        key = profile_key(profile_data)
+        with self._lock:
+            self._records[key] = record
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_profiles:
+                self._records.popitem(last=False)
+
+    def note(self, mode: str, changed: List[str]) -> None:
+        """Count an analysis: mode is "full", "incremental" or "unchanged" """
+        with self._lock:
+            setattr(self, mode, getattr(self, mode) + 1)
+            if mode != "full":
+                self.sections_reanalyzed += len(changed)
+                self.sections_reused += len(SECTIONS) - len(changed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reanalyses = self.incremental + self.unchanged
+            return {
+                "profiles": len(self._records),
+                "full": self.full,
+                "incremental": self.incremental,
+                "unchanged": self.unchanged,
+                "sections_reanalyzed": self.sections_reanalyzed,
+                "sections_reused": self.sections_reused,
+                "reuse_rate": self.sections_reused / (reanalyses * len(SECTIONS)) if reanalyses else 0.0,
+            }
+
+
+_store: Optional[AnalysisStore] = None
+_store_built = False
+_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> Optional[AnalysisStore]:
+    """Process-wide analysis store (None when incremental re-analysis is disabled)"""
+    global _store, _store_built
+    if not _store_built:
+        with _store_lock:
+            if not _store_built:
+                _store = AnalysisStore.from_config()
+                _store_built = True
+    return _store
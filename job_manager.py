@@ -0,0 +1,194 @@
+"""
+Background analysis jobs for LinkedIn Profile Optimizer
+Runs agent requests on a shared worker pool instead of inside a Streamlit
+rerun. Jobs are keyed by session and task and their results are kept in a
+server-side store, so a page can be left while its analysis runs and picks
+the result up (or the streamed text so far) on the next render.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from config import AppConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """One submitted agent request and its progress"""
+
+    def __init__(self, session_id: str, task: str, label: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.task = task
+        self.label = label or task
+        self.status = QUEUED
+        self.partial = ""  # streamed text received so far
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.metrics: Optional[Dict[str, Any]] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self) -> float:
+        start = self.started_at or self.submitted_at
+        return (self.finished_at or time.time()) - start
+
+
+class JobManager:
+    """Shared worker pool plus a store of jobs keyed by (session_id, task)"""
+
+    def __init__(self, max_workers: int = 8, result_ttl: float = 3600.0, max_jobs: int = 2000):
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs: Dict[Tuple[str, str], Job] = {}
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._failed = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> "JobManager":
+        config = config or AppConfig.JOBS_CONFIG
+        return cls(
+            max_workers=config.get("max_workers", 8),
+            result_ttl=config.get("result_ttl", 3600.0),
+            max_jobs=config.get("max_jobs", 2000),
+        )
+
+    def submit(self, session_id: str, task: str, fn: Callable[..., Any], *args: Any, label: str = "") -> Job:
+        """
+        Run fn(*args) in the background and return its Job. fn may take a
+        keyword argument `job` to report progress (see run_stream). A job
+        still running for the same session and task is returned as is.
+        """
+        key = (session_id, task)
+        with self._lock:
+            current = self._jobs.get(key)
+            if current is not None and not current.finished:
+                return current
+            job = Job(session_id, task, label)
+            self._jobs[key] = job
+            self._submitted += 1
+            self._evict()
+        self._executor.submit(self._run, job, fn, args)
+        logger.info(f"Submitted {task} job {job.id} for session {session_id[:8]}")
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, job=job)
+            job.status = DONE
+        except Exception as e:
+            logger.error(f"{job.task} job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+            with self._lock:
+                self._failed += 1
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, session_id: str, task: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get((session_id, task))
+
+    def pop(self, session_id: str, task: str) -> Optional[Job]:
+        """Remove and return a finished job (running jobs are left alone)"""
+        with self._lock:
+            job = self._jobs.get((session_id, task))
+            if job is None or not job.finished:
+                return None
+            return self._jobs.pop((session_id, task))
+
+    def session_jobs(self, session_id: str) -> List[Job]:
+        with self._lock:
+            jobs = [job for (sid, _), job in self._jobs.items() if sid == session_id]
+        return sorted(jobs, key=lambda job: job.submitted_at)
+
+    def clear_session(self, session_id: str) -> None:
+        """Forget a session's jobs; ones still running finish and are discarded"""
+        with self._lock:
+            for key in [key for key in self._jobs if key[0] == session_id]:
+                del self._jobs[key]
+
+    def _evict(self) -> None:
+        # Drop finished jobs nobody collected within result_ttl, then the
+        # oldest finished ones if the store is still over max_jobs
+        now = time.time()
+        expired = [key for key, job in self._jobs.items() if job.finished and now - job.finished_at > self.result_ttl]
+        for key in expired:
+            del self._jobs[key]
+        if len(self._jobs) > self.max_jobs:
+            finished = sorted((job.finished_at, key) for key, job in self._jobs.items() if job.finished)
+            for _, key in finished[:len(self._jobs) - self.max_jobs]:
+                del self._jobs[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            return {
+                "max_workers": self.max_workers,
+                "queued": sum(1 for job in jobs if job.status == QUEUED),
+                "running": sum(1 for job in jobs if job.status == RUNNING),
+                "stored": len(jobs),
+                "sessions": len({job.session_id for job in jobs}),
+                "submitted": self._submitted,
+                "failed": self._failed,
+            }
+
+
+def run_request(user_input: str, task_type: str, job: Optional[Job] = None) -> Any:
+    """Job body: one blocking agent request"""
+    from agents.orchestrator import route_request
+
+    return route_request(user_input, task_type)
+
+
+def run_stream(user_input: str, task_type: str, job: Optional[Job] = None) -> Any:
+    """Job body: stream an agent request, exposing the text so far as job.partial"""
+    from agents.orchestrator import finalize_stream, stream_request
+
+    def save_metrics(metrics: Dict[str, Any]) -> None:
+        if job is not None:
+            job.metrics = metrics
+
+    text = ""
+    for chunk in stream_request(user_input, task_type, on_metrics=save_metrics):
+        text += chunk
+        if job is not None:
+            job.partial = text
+    return finalize_stream(text.strip(), task_type)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide job manager, shared by all Streamlit sessions"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager.from_config()
+    return _manager
@@ -0,0 +1,288 @@
+"""
+Job matching for LinkedIn Profile Optimizer
+Deterministic, offline pre-scoring of a profile against a job description.
+Skills are normalized through skill_taxonomy, weighted BM25-style by how much
+the job description stresses them and scored with NumPy, so skill match,
+missing skills and the evidence behind each match need no LLM call.
+"""
+
+import logging
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+
+from config import AppConfig
+from skill_taxonomy import display_name, extract_skills, normalize_skill, tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could did do does
+doing during each either etc for from had has have having he her here his how i if in including into is it
+its itself just least like may me more most must my no nor not of off on once only or other our ours out
+over own per plus same she should so some such than that the their them then there these they this those
+through to too under until up us very via was we well were what when where which while who whom why will
+with within without would you your yours
+ability able across candidate candidates company experience experienced familiarity including join
+knowledge looking new years year work working role team teams strong skills skill excellent good great
+proficiency proficient understanding required requirements preferred responsibilities qualifications
+""".split())
+
+# Lines or sections introduced by these are nice-to-haves, not requirements
+_PREFERRED_RE = re.compile(r"\b(nice to have|nice-to-have|preferred|bonus|a plus|desirable|optional)\b", re.IGNORECASE)
+_REQUIRED_RE = re.compile(r"\b(requirements?|required|must have|must-have|qualifications|you have|what you.ll need)\b", re.IGNORECASE)
+
+# Fields of an experience/certification entry that hold free text (mock and Apify shapes)
+_TEXT_KEYS = ("title", "description", "subComponents", "text", "skills")
+
+
+def keyword_terms(text: str) -> Counter:
+    """Content-word counts of a text (stopwords and numbers dropped)"""
+    return Counter(
+        token.strip(".") for token in tokenize(text)
+        if len(token) > 1 and token not in STOPWORDS and not token.replace(".", "").isdigit()
+    )
+
+
+def _flatten_text(value: Any) -> Iterable[str]:
+    """All strings nested in an Apify-style entry (subComponents -> description -> text)"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key in _TEXT_KEYS:
+            if key in value:
+                yield from _flatten_text(value[key])
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten_text(item)
+
+
+def _entry_label(entry: Dict[str, Any]) -> str:
+    title = entry.get("title") or entry.get("name") or ""
+    company = entry.get("company") or entry.get("issuer") or (entry.get("subtitle") or "").split("·")[0].strip()
+    if title and company:
+        return f"{title} at {company}"
+    return title or company
+
+
+class ProfileFeatures:
+    """Skills (coverage and evidence) and keyword counts extracted once from a profile"""
+
+    def __init__(self, skills: Dict[str, float], evidence: Dict[str, List[str]], terms: Counter):
+        self.skills = skills
+        self.evidence = evidence
+        self.terms = terms
+
+    @classmethod
+    def from_profile(cls, profile_data: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> "ProfileFeatures":
+        config = config or AppConfig.JOB_MATCHING_CONFIG
+        coverage_by_source = config.get("source_coverage", {})
+        skills: Dict[str, float] = {}
+        evidence: Dict[str, List[str]] = {}
+        texts: List[str] = []
+
+        def add(canonical: str, source: str, label: str) -> None:
+            coverage = coverage_by_source.get(source, 0.5)
+            skills[canonical] = max(skills.get(canonical, 0.0), coverage)
+            labels = evidence.setdefault(canonical, [])
+            if label not in labels and len(labels) < 3:
+                labels.append(label)
+
+        # Explicitly listed skills also teach the extractor their exact wording
+        listed: Dict[str, str] = {}
+        for skill in profile_data.get("skills") or []:
+            name = (skill.get("title") or skill.get("name")) if isinstance(skill, dict) else skill
+            if not name:
+                continue
+            canonical = normalize_skill(str(name))
+            if canonical:
+                listed[" ".join(tokenize(str(name)))] = canonical
+                add(canonical, "skills", "Listed skill")
+                texts.append(str(name))
+
+        for entry in profile_data.get("experience") or []:
+            if not isinstance(entry, dict):
+                continue
+            text = " ".join(_flatten_text(entry))
+            texts.append(text)
+            label = _entry_label(entry) or "Experience"
+            for canonical in extract_skills(text, listed):
+                add(canonical, "experience", label)
+
+        for entry in profile_data.get("certifications") or []:
+            name = _entry_label(entry) if isinstance(entry, dict) else str(entry)
+            texts.append(name)
+            for canonical in extract_skills(name, listed):
+                add(canonical, "certifications", f"Certification: {name}")
+
+        for entry in profile_data.get("education") or []:
+            if not isinstance(entry, dict):
+                continue
+            degree = entry.get("degree") or entry.get("subtitle") or ""
+            school = entry.get("school") or entry.get("title") or ""
+            text = " ".join([degree, entry.get("field_of_study") or "", *_flatten_text(entry.get("description") or "")])
+            texts.append(text)
+            label = f"{degree}, {school}" if degree and school else (degree or school or "Education")
+            for canonical in extract_skills(text, listed):
+                add(canonical, "education", label)
+
+        for source in ("headline", "summary"):
+            text = profile_data.get(source) or ""
+            texts.append(text)
+            for canonical in extract_skills(text, listed):
+                add(canonical, source, source.title())
+
+        return cls(skills, evidence, keyword_terms(" ".join(texts)))
+
+
+class JobFeatures:
+    """Skill term frequencies (preferred skills discounted) and keyword counts of a job description"""
+
+    def __init__(self, skills: Dict[str, float], terms: Counter, length: int):
+        self.skills = skills
+        self.terms = terms
+        self.length = length
+
+    @classmethod
+    def from_text(cls, job_description: str, config: Optional[Dict[str, Any]] = None) -> "JobFeatures":
+        config = config or AppConfig.JOB_MATCHING_CONFIG
+        preferred_weight = config.get("preferred_weight", 0.5)
+        skills: Dict[str, float] = {}
+        in_preferred = False
+        for line in (job_description or "").splitlines():
+            # A header switches the section; an inline marker only affects its line
+            is_header = len(line.split()) <= 6 and line.rstrip().endswith(":")
+            if _PREFERRED_RE.search(line):
+                weight = preferred_weight
+                if is_header:
+                    in_preferred = True
+            elif _REQUIRED_RE.search(line) and is_header:
+                in_preferred = False
+                weight = 1.0
+            else:
+                weight = preferred_weight if in_preferred else 1.0
+            for canonical, count in extract_skills(line).items():
+                skills[canonical] = skills.get(canonical, 0.0) + count * weight
+        terms = keyword_terms(job_description or "")
+        return cls(skills, terms, sum(terms.values()))
+
+    def skill_weights(
+        self,
+        idf: Optional[Dict[str, float]] = None,
+        avg_length: Optional[float] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, float]:
+        """
+        BM25 weight of every skill the job asks for: saturated term frequency
+        (mentioning Python five times is not five times as important) times
+        IDF over a job corpus when one is available.
+        """
+        config = config or AppConfig.JOB_MATCHING_CONFIG
+        k1 = config.get("bm25_k1", 1.2)
+        b = config.get("bm25_b", 0.75)
+        norm = 1.0 - b + b * (self.length / avg_length) if avg_length else 1.0
+        weights = {}
+        for canonical, tf in self.skills.items():
+            saturated = tf * (k1 + 1) / (tf + k1 * norm)
+            weights[canonical] = saturated * (idf.get(canonical, 1.0) if idf else 1.0)
+        return weights
+
+
+def inverse_document_frequency(document_frequency: Dict[str, int], documents: int) -> Dict[str, float]:
+    """BM25 IDF (always positive) from per-term document counts"""
+    return {
+        term: math.log(1.0 + (documents - df + 0.5) / (df + 0.5))
+        for term, df in document_frequency.items()
+    }
+
+
+def keyword_similarity(profile_terms: Counter, job_terms: Counter, idf: Optional[Dict[str, float]] = None) -> float:
+    """TF-IDF cosine similarity (0-1) of two keyword bags"""
+    vocabulary = list(job_terms.keys() | profile_terms.keys())
+    if not vocabulary or not job_terms or not profile_terms:
+        return 0.0
+    weights = np.fromiter((idf.get(t, 1.0) if idf else 1.0 for t in vocabulary), dtype=np.float64, count=len(vocabulary))
+    job_vec = np.log1p(np.fromiter((job_terms.get(t, 0) for t in vocabulary), dtype=np.float64, count=len(vocabulary))) * weights
+    profile_vec = np.log1p(np.fromiter((profile_terms.get(t, 0) for t in vocabulary), dtype=np.float64, count=len(vocabulary))) * weights
+    denominator = np.linalg.norm(job_vec) * np.linalg.norm(profile_vec)
+    return float(job_vec @ profile_vec / denominator) if denominator else 0.0
+
+
+def score_job_fit(
+    profile: ProfileFeatures,
+    job: JobFeatures,
+    idf: Optional[Dict[str, float]] = None,
+    avg_length: Optional[float] = None,
+    config: Optional[Dict[str, Any]] = None,
+    keyword_idf: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Weighted skill overlap between precomputed profile and job features.
+
+    skill_match is the share of the job's skill weight the profile covers
+    (a listed skill covers it fully, one only seen in experience or the
+    summary partially); missing skills come back heaviest first.
+    """
+    config = config or AppConfig.JOB_MATCHING_CONFIG
+    weights = job.skill_weights(idf, avg_length, config)
+    keyword_match = round(100 * keyword_similarity(profile.terms, job.terms, keyword_idf))
+
+    if not weights:
+        # Nothing recognizable as a skill in the JD: keywords are all we have
+        return {
+            "skill_match": keyword_match,
+            "keyword_match": keyword_match,
+            "fit_score": keyword_match,
+            "matched_skills": [],
+            "missing_skills": [],
+            "job_skills": 0,
+        }
+
+    names = list(weights)
+    w = np.fromiter(weights.values(), dtype=np.float64, count=len(names))
+    coverage = np.fromiter((profile.skills.get(s, 0.0) for s in names), dtype=np.float64, count=len(names))
+    skill_match = round(float(100 * (w @ coverage) / w.sum()))
+
+    order = np.argsort(-w, kind="stable")
+    matched = [
+        {
+            "skill": display_name(names[i]),
+            "weight": round(float(w[i]), 3),
+            "coverage": float(coverage[i]),
+            "evidence": profile.evidence.get(names[i], []),
+        }
+        for i in order if coverage[i] > 0
+    ]
+    missing = [display_name(names[i]) for i in order if coverage[i] == 0]
+
+    skill_weight = config.get("skill_weight", 0.75)
+    return {
+        "skill_match": skill_match,
+        "keyword_match": keyword_match,
+        "fit_score": round(skill_weight * skill_match + (1 - skill_weight) * keyword_match),
+        "matched_skills": matched,
+        "missing_skills": missing[:config.get("max_missing_skills", 8)],
+        "job_skills": len(names),
+    }
+
+
+def prescore_job_fit(
+    profile_data: Dict[str, Any],
+    job_description: str,
+    idf: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Score one profile against one job description locally, in milliseconds"""
+    start = time.perf_counter()
+    result = score_job_fit(ProfileFeatures.from_profile(profile_data), JobFeatures.from_text(job_description), idf)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    logger.debug(
+        f"Job fit pre-score: skill match {result['skill_match']}%, "
+        f"{len(result['missing_skills'])} missing skills in {result['elapsed_ms']}ms"
+    )
+    return result
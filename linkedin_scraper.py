@@ -3,13 +3,17 @@ LinkedIn Profile Scraper using Apify Client SDK
 Uses the working approach from test_apify_scrape.py with ApifyClient task execution.
 """
 
+import copy
 import logging
+import threading
 import time
-from typing import Dict, Any, Optional
-
-from apify_client import ApifyClient
+from typing import Dict, Any, Optional, List
+from urllib.parse import urlparse
 
 from config import AppConfig
+from profile_store import ProfileStore
+from singleflight import SingleFlight
+from telemetry import failure_reason, record_apify_run
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +26,16 @@ class DirectLinkedInScraper:
     def __init__(self) -> None:
         self.api_key: str = AppConfig.APIFY_API_KEY
         self.task_id: str = AppConfig.APIFY_LINKEDIN_ACTOR
-        self.client = ApifyClient(self.api_key)
+        self._client = None
+
+    @property
+    def client(self):
+        """ApifyClient, created on first use (the SDK is slow to import)"""
+        if self._client is None:
+            from apify_client import ApifyClient
+
+            self._client = ApifyClient(self.api_key)
+        return self._client
 
     # ------------- Public API -------------
 
@@ -45,8 +58,98 @@ class DirectLinkedInScraper:
 
         return self._get_mock_profile_data(profile_url)
 
+    def scrape_profiles(self, profile_urls: List[str], chunk_size: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Scrape many profiles, packing up to chunk_size URLs into each task run.
+
+        Returns a dict mapping every input URL to standardized profile data.
+        URLs the batch run did not return are retried one by one through
+        scrape_profile(), which falls back to mock data on failure.
+        """
+        chunk_size = chunk_size or AppConfig.APIFY_BATCH_CONFIG["chunk_size"]
+        results: Dict[str, Dict[str, Any]] = {}
+
+        # Deduplicate on the canonical URL, remembering every input spelling
+        by_canonical: Dict[str, List[str]] = {}
+        for url in profile_urls:
+            if not self._is_valid_linkedin_url(url):
+                logger.error(f"Invalid LinkedIn profile URL supplied: {url}")
+                results[url] = self._get_mock_profile_data(url)
+                continue
+            by_canonical.setdefault(self._canonical_profile_url(url), []).append(url)
+
+        canonical_urls = list(by_canonical)
+        logger.info(f"Batch scraping {len(canonical_urls)} profiles in chunks of {chunk_size}")
+
+        for start in range(0, len(canonical_urls), chunk_size):
+            chunk = canonical_urls[start:start + chunk_size]
+            try:
+                scraped = self._scrape_batch_via_apify(chunk)
+            except Exception as exc:
+                logger.error(f"Apify batch scraping error: {exc}")
+                scraped = {}
+
+            for canonical in chunk:
+                raw = scraped.get(canonical)
+                if raw:
+                    profile = self._standardize_profile_data(raw)
+                else:
+                    logger.warning(f"{canonical} missing from batch run – scraping individually")
+                    profile = self.scrape_profile(canonical)
+                for url in by_canonical[canonical]:
+                    results[url] = profile
+
+        return results
+
     # ------------- Internal helpers -------------
 
+    def _scrape_batch_via_apify(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the saved task once for many URLs and page through its dataset.
+        Returns raw items keyed by canonical profile URL.
+        """
+        task_input = {
+            "profileUrls": urls
+        }
+
+        logger.info(f"Starting saved task run for {len(urls)} profiles...")
+        start = time.perf_counter()
+        try:
+            run = self.client.task(self.task_id).call(task_input=task_input)
+        except Exception as exc:
+            record_apify_run(kind="batch", run_s=time.perf_counter() - start, requested=len(urls),
+                             status="error", error=failure_reason(exc))
+            raise
+        run_s = time.perf_counter() - start
+
+        if not run or "defaultDatasetId" not in run:
+            logger.error("No dataset ID found in run result. Task may have failed.")
+            record_apify_run(kind="batch", run_s=run_s, requested=len(urls), status="error", error="no_dataset")
+            return {}
+
+        fetch_start = time.perf_counter()
+        dataset = self.client.dataset(run["defaultDatasetId"])
+        page_size = AppConfig.APIFY_BATCH_CONFIG["dataset_page_size"]
+        items_by_url: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        while True:
+            page = dataset.list_items(offset=offset, limit=page_size)
+            for item in page.items:
+                item_url = item.get("linkedinUrl") or item.get("url") or ""
+                if "/in/" in item_url:
+                    items_by_url.setdefault(self._canonical_profile_url(item_url), item)
+            offset += len(page.items)
+            if len(page.items) < page_size or offset >= (page.total or 0):
+                break
+
+        fetch_s = time.perf_counter() - fetch_start
+        record_apify_run(kind="batch", run_s=run_s, fetch_s=fetch_s, items=len(items_by_url), requested=len(urls))
+        logger.info(
+            f"Batch run returned {len(items_by_url)} of {len(urls)} profiles "
+            f"(run {run_s:.1f}s, dataset fetch {fetch_s:.2f}s)"
+        )
+        return items_by_url
+
     def _scrape_via_apify(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Run saved task and return the first dataset item, if any.
@@ -58,14 +161,23 @@ class DirectLinkedInScraper:
         }
 
         logger.info("Starting saved task run...")
-        run = self.client.task(self.task_id).call(task_input=task_input)
+        start = time.perf_counter()
+        try:
+            run = self.client.task(self.task_id).call(task_input=task_input)
+        except Exception as exc:
+            record_apify_run(kind="single", run_s=time.perf_counter() - start, status="error", error=failure_reason(exc))
+            raise
+        run_s = time.perf_counter() - start
         
-        logger.info("Task run started successfully.")
+        logger.info(f"Task run finished in {run_s:.1f}s.")
 
         # Retrieve dataset results
         if run and "defaultDatasetId" in run:
+            fetch_start = time.perf_counter()
             dataset = self.client.dataset(run["defaultDatasetId"])
             items = dataset.list_items().items
+            record_apify_run(kind="single", run_s=run_s, fetch_s=time.perf_counter() - fetch_start,
+                             items=len(items), status="ok" if items else "empty")
 
             if items:
                 logger.info("Scraped profile data successfully")
@@ -75,6 +187,7 @@ class DirectLinkedInScraper:
                 return None
         else:
             logger.error("No dataset ID found in run result. Task may have failed.")
+            record_apify_run(kind="single", run_s=run_s, status="error", error="no_dataset")
             return None
 
     @staticmethod
@@ -85,6 +198,16 @@ class DirectLinkedInScraper:
             "linkedin.com/in/"
         )
 
+    @staticmethod
+    def _canonical_profile_url(url: str) -> str:
+        """Normalize a profile URL to https://www.linkedin.com/in/<slug>."""
+        url = url.strip()
+        if "://" not in url:
+            url = "https://" + url
+        path = urlparse(url).path.rstrip("/")
+        slug = path.split("/in/", 1)[-1].split("/")[0].lower()
+        return f"https://www.linkedin.com/in/{slug}"
+
     @staticmethod
     def _standardize_profile_data(raw: Dict[str, Any]) -> Dict[str, Any]:
         """Map Apify fields to internal schema expected by agents."""
@@ -210,9 +333,92 @@ class DirectLinkedInScraper:
 
 # ------------- Convenience wrapper -------------
 
-_scraper_instance = DirectLinkedInScraper()
+# Created on first use so importing this module opens no client or database
+_scraper_instance: Optional[DirectLinkedInScraper] = None
+_profile_store: Optional[ProfileStore] = None
+_profile_store_built = False
+_instances_lock = threading.Lock()
+_scrape_flight = SingleFlight.from_config("scrape")
+
+
+def get_scraper() -> DirectLinkedInScraper:
+    """Process-wide scraper"""
+    global _scraper_instance
+    if _scraper_instance is None:
+        with _instances_lock:
+            if _scraper_instance is None:
+                _scraper_instance = DirectLinkedInScraper()
+    return _scraper_instance
+
+
+def get_profile_store() -> Optional[ProfileStore]:
+    """Process-wide profile store (None when disabled)"""
+    global _profile_store, _profile_store_built
+    if not _profile_store_built:
+        with _instances_lock:
+            if not _profile_store_built:
+                _profile_store = ProfileStore.from_config()
+                _profile_store_built = True
+    return _profile_store
+
+
+def scrape_linkedin_profile(profile_url: str, force_refresh: bool = False) -> Dict[str, Any]:
+    """Module-level helper used by Streamlit app and agents.
+
+    Valid profile URLs go through the profile store, so repeat loads are a
+    local read; pass force_refresh=True to bypass it. Concurrent loads of the
+    same profile share one scrape (each caller gets its own copy).
+    """
+    if _scrape_flight is None:
+        return _load_profile(profile_url, force_refresh)
+    key = profile_url
+    if DirectLinkedInScraper._is_valid_linkedin_url(profile_url):
+        key = DirectLinkedInScraper._canonical_profile_url(profile_url)
+    profile, shared = _scrape_flight.do((key, force_refresh), _load_profile, profile_url, force_refresh)
+    return copy.deepcopy(profile) if shared else profile
+
+
+def get_scrape_coalescing_stats() -> Dict[str, Any]:
+    """Profile loads performed vs. served from an identical in-flight load"""
+    if _scrape_flight is None:
+        return {"enabled": False}
+    return {"enabled": True, **_scrape_flight.get_stats()}
+
+
+def _load_profile(profile_url: str, force_refresh: bool = False) -> Dict[str, Any]:
+    store = get_profile_store()
+    if store is None or not DirectLinkedInScraper._is_valid_linkedin_url(profile_url):
+        return get_scraper().scrape_profile(profile_url)
+    return store.get_or_scrape(
+        DirectLinkedInScraper._canonical_profile_url(profile_url),
+        get_scraper().scrape_profile,
+        force_refresh=force_refresh,
+    )
+
+
+def warm_profile_store(profile_urls: List[str]) -> Dict[str, int]:
+    """Bulk-load profiles into the store with batched task runs."""
+    store = get_profile_store()
+    if store is None:
+        return {"requested": len(profile_urls), "scraped": 0, "fresh": 0}
+    canonical_urls = [
+        DirectLinkedInScraper._canonical_profile_url(url)
+        for url in profile_urls
+        if DirectLinkedInScraper._is_valid_linkedin_url(url)
+    ]
+    return store.warm(canonical_urls, get_scraper().scrape_profiles)
+
+
+def scrape_linkedin_profiles(profile_urls: List[str], chunk_size: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Batch helper: one task run per chunk of profile URLs."""
+    return get_scraper().scrape_profiles(profile_urls, chunk_size)
+
 
+def build_profile_index():
+    """Reverse-matching index over every stored profile, kept current as new profiles are scraped."""
+    from match_index import ProfileIndex
 
-def scrape_linkedin_profile(profile_url: str) -> Dict[str, Any]:
-    """Module-level helper used by Streamlit app and agents."""
-    return _scraper_instance.scrape_profile(profile_url)
+    store = get_profile_store()
+    if store is None:
+        return ProfileIndex()
+    return ProfileIndex.from_store(store)
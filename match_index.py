@@ -0,0 +1,455 @@
+"""
+Match index for LinkedIn Profile Optimizer
+Inverted indexes over job descriptions (one profile against thousands of
+jobs) and over scraped profiles (one job against thousands of candidates).
+Postings are scored with NumPy, top-k is a heap partial sort, and only the
+shortlist gets the full job_matching explanation.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Any, Hashable, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from config import AppConfig
+from job_matching import JobFeatures, ProfileFeatures, inverse_document_frequency, score_job_fit
+from profile_model import CompactProfile
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InvertedIndex:
+    """
+    Per-field postings (term -> slots, values) over a growing set of documents.
+    Every field shares one slot numbering, so score vectors from different
+    fields line up. Removal leaves a tombstone that is masked out of results;
+    postings are compacted once tombstones outnumber live documents.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self._keys: List[Optional[Hashable]] = []  # slot -> key, None once removed
+        self._slots: Dict[Hashable, int] = {}
+        self._documents: List[Optional[Dict[str, Dict[str, float]]]] = []
+        self._lengths: List[float] = []
+        self._postings: Dict[str, Dict[str, Tuple[List[int], List[float]]]] = {f: {} for f in self.fields}
+        self._arrays: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        self.document_frequency: Dict[str, Counter] = {f: Counter() for f in self.fields}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    @property
+    def size(self) -> int:
+        """Number of slots, live or tombstoned (length of every score vector)"""
+        return len(self._keys)
+
+    def keys(self) -> List[Hashable]:
+        return list(self._slots)
+
+    def add(self, key: Hashable, fields: Dict[str, Dict[str, float]], length: float = 0.0) -> int:
+        """Index a document (replacing any previous version of key) and return its slot"""
+        if key in self._slots:
+            self.remove(key)
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._slots[key] = slot
+        self._documents.append({f: dict(fields.get(f) or {}) for f in self.fields})
+        self._lengths.append(float(length))
+        for field in self.fields:
+            postings = self._postings[field]
+            for term, value in (fields.get(field) or {}).items():
+                slots, values = postings.setdefault(term, ([], []))
+                slots.append(slot)
+                values.append(float(value))
+                self._arrays.pop((field, term), None)
+                self.document_frequency[field][term] += 1
+        self.version += 1
+        return slot
+
+    def remove(self, key: Hashable) -> bool:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        self._keys[slot] = None
+        for field, terms in (self._documents[slot] or {}).items():
+            frequency = self.document_frequency[field]
+            for term in terms:
+                frequency[term] -= 1
+                if frequency[term] <= 0:
+                    del frequency[term]
+        self._documents[slot] = None
+        self.version += 1
+        if len(self._keys) - len(self._slots) > max(len(self._slots), 64):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Drop tombstones and renumber slots"""
+        live = [(key, self._documents[slot], self._lengths[slot]) for key, slot in self._slots.items()]
+        version = self.version
+        self.__init__(self.fields)
+        for key, fields, length in live:
+            self.add(key, fields, length)
+        self.version = version + 1
+
+    def postings(self, field: str, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(slots, values) arrays for a term; may include tombstoned slots"""
+        arrays = self._arrays.get((field, term))
+        if arrays is None:
+            slots, values = self._postings[field].get(term, ([], []))
+            arrays = (np.asarray(slots, dtype=np.int64), np.asarray(values, dtype=np.float64))
+            self._arrays[(field, term)] = arrays
+        return arrays
+
+    def alive(self) -> np.ndarray:
+        return np.fromiter((key is not None for key in self._keys), dtype=bool, count=len(self._keys))
+
+    def lengths(self) -> np.ndarray:
+        return np.asarray(self._lengths, dtype=np.float64)
+
+    def average_length(self) -> float:
+        if not self._slots:
+            return 0.0
+        return sum(self._lengths[slot] for slot in self._slots.values()) / len(self._slots)
+
+    def idf(self, field: str) -> Dict[str, float]:
+        return inverse_document_frequency(self.document_frequency[field], len(self._slots))
+
+    def accumulate(
+        self,
+        field: str,
+        query: Mapping[str, float],
+        transform: Optional[Callable[[str, np.ndarray, np.ndarray], np.ndarray]] = None,
+    ) -> np.ndarray:
+        """
+        Score every slot: sum over query terms of query weight times the
+        (optionally transformed) posting value. Each term's postings are
+        added in one vectorized step.
+        """
+        scores = np.zeros(len(self._keys), dtype=np.float64)
+        for term, weight in query.items():
+            slots, values = self.postings(field, term)
+            if slots.size:
+                # A document appears at most once per term, so fancy-index += is safe
+                scores[slots] += weight * (transform(term, slots, values) if transform else values)
+        return scores
+
+    def per_document(self, field: str, transform: Callable[[str, np.ndarray, np.ndarray], np.ndarray]) -> np.ndarray:
+        """Sum of transform(postings) over every term of every document (e.g. vector norms)"""
+        totals = np.zeros(len(self._keys), dtype=np.float64)
+        for term in self._postings[field]:
+            slots, values = self.postings(field, term)
+            totals[slots] += transform(term, slots, values)
+        return totals
+
+    def top_k(self, scores: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+        """Best k live documents with a positive score, best first (heap partial sort)"""
+        candidates = np.flatnonzero((scores > 0) & self.alive())
+        best = heapq.nlargest(k, candidates.tolist(), key=scores.__getitem__)
+        return [(self._keys[slot], float(scores[slot])) for slot in best]
+
+
+class JobIndex:
+    """Skill and keyword indexes over a corpus of job descriptions"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or AppConfig.JOB_MATCHING_CONFIG
+        self.index = InvertedIndex(("skills", "keywords"))
+        self.jobs: Dict[Hashable, Dict[str, Any]] = {}
+        self._cache_version: Optional[int] = None
+        self._cache: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def __contains__(self, job_id: Hashable) -> bool:
+        return job_id in self.jobs
+
+    @classmethod
+    def build(cls, jobs: Union[Mapping[Hashable, Any], Iterable[Any]], config: Optional[Dict[str, Any]] = None) -> "JobIndex":
+        """Index a mapping of job_id -> description (or job dict), or a sequence keyed by position"""
+        start = time.perf_counter()
+        index = cls(config)
+        index.add_many(jobs)
+        logger.info(f"Indexed {len(index)} jobs in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+
+    def add_many(self, jobs: Union[Mapping[Hashable, Any], Iterable[Any]]) -> None:
+        items = jobs.items() if isinstance(jobs, Mapping) else enumerate(jobs)
+        for job_id, job in items:
+            if isinstance(job, dict):
+                self.add(job_id, job.get("description", ""), **{k: v for k, v in job.items() if k != "description"})
+            else:
+                self.add(job_id, job)
+
+    def add(self, job_id: Hashable, description: str, **metadata: Any) -> None:
+        """Add or replace one job; metadata (title, company, url...) is returned with results"""
+        features = JobFeatures.from_text(description, self.config)
+        keywords = {t: float(np.log1p(c)) for t, c in features.terms.items()}
+        self.index.add(job_id, {"skills": features.skills, "keywords": keywords}, features.length)
+        self.jobs[job_id] = {"description": description, "features": features, "metadata": metadata}
+
+    def remove(self, job_id: Hashable) -> bool:
+        if self.jobs.pop(job_id, None) is None:
+            return False
+        self.index.remove(job_id)
+        return True
+
+    def _corpus_stats(self) -> Dict[str, Any]:
+        """IDF, BM25 length norms and per-job normalizers; rebuilt only after the corpus changes"""
+        version = self.index.version
+        if self._cache_version == version:
+            return self._cache
+        k1 = self.config.get("bm25_k1", 1.2)
+        b = self.config.get("bm25_b", 0.75)
+        avg_length = self.index.average_length()
+        length_norm = 1.0 - b + b * (self.index.lengths() / avg_length) if avg_length else np.ones(self.index.size)
+        skill_idf = self.index.idf("skills")
+        keyword_idf = self.index.idf("keywords")
+
+        def bm25(term: str, slots: np.ndarray, tf: np.ndarray) -> np.ndarray:
+            return tf * (k1 + 1) / (tf + k1 * length_norm[slots]) * skill_idf.get(term, 1.0)
+
+        def keyword_square(term: str, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+            return (values * keyword_idf.get(term, 1.0)) ** 2
+
+        self._cache = {
+            "avg_length": avg_length,
+            "skill_idf": skill_idf,
+            "keyword_idf": keyword_idf,
+            "bm25": bm25,
+            "skill_totals": self.index.per_document("skills", bm25),
+            "keyword_norms": np.sqrt(self.index.per_document("keywords", keyword_square)),
+        }
+        self._cache_version = version
+        return self._cache
+
+    def score_all(self, profile: ProfileFeatures) -> np.ndarray:
+        """Fit score (0-100) of profile against every slot in the index"""
+        stats = self._corpus_stats()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skill_scores = self.index.accumulate("skills", profile.skills, stats["bm25"])
+            skill_match = np.where(stats["skill_totals"] > 0, 100 * skill_scores / stats["skill_totals"], np.nan)
+
+            keyword_idf = stats["keyword_idf"]
+            query = {t: float(np.log1p(c)) * keyword_idf.get(t, 1.0) for t, c in profile.terms.items()}
+            query_norm = float(np.sqrt(sum(v * v for v in query.values())))
+            dots = self.index.accumulate("keywords", query, lambda term, slots, values: values * keyword_idf.get(term, 1.0))
+            denominator = stats["keyword_norms"] * query_norm
+            keyword_match = np.where(denominator > 0, 100 * dots / denominator, 0.0)
+
+        skill_weight = self.config.get("skill_weight", 0.75)
+        # Jobs without recognizable skills are ranked on keywords alone, as in score_job_fit
+        return np.where(
+            np.isnan(skill_match),
+            keyword_match,
+            skill_weight * np.nan_to_num(skill_match) + (1 - skill_weight) * keyword_match,
+        )
+
+    def rank(self, profile: Union[ProfileFeatures, Dict[str, Any]], top_k: int = 10) -> List[Dict[str, Any]]:
+        """Top-k jobs for a profile, each with the full skill breakdown"""
+        start = time.perf_counter()
+        if not isinstance(profile, ProfileFeatures):
+            profile = ProfileFeatures.from_profile(profile, self.config)
+        stats = self._corpus_stats()
+        shortlist = self.index.top_k(self.score_all(profile), top_k)
+
+        results = []
+        for rank, (job_id, score) in enumerate(shortlist, 1):
+            job = self.jobs[job_id]
+            detail = score_job_fit(
+                profile, job["features"], stats["skill_idf"], stats["avg_length"], self.config, stats["keyword_idf"]
+            )
+            results.append({
+                "rank": rank,
+                "job_id": job_id,
+                "score": round(score, 2),
+                **job["metadata"],
+                **detail,
+            })
+        logger.info(
+            f"Ranked {len(self)} jobs, kept top {len(results)} in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+        return results
+
+
+class ProfileIndex:
+    """
+    Skill and keyword indexes over standardized profiles for reverse matching.
+    Safe to feed from scraper threads while recruiters rank against it.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or AppConfig.JOB_MATCHING_CONFIG
+        self.index = InvertedIndex(("skills", "keywords"))
+        self.profiles: Dict[Hashable, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._cache_version: Optional[int] = None
+        self._cache: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def __contains__(self, profile_id: Hashable) -> bool:
+        return profile_id in self.profiles
+
+    @classmethod
+    def build(cls, profiles: Union[Mapping[Hashable, Dict[str, Any]], Iterable[Dict[str, Any]]], config: Optional[Dict[str, Any]] = None) -> "ProfileIndex":
+        """Index a mapping of profile_id -> profile, or a sequence keyed by profile_url (or position)"""
+        start = time.perf_counter()
+        index = cls(config)
+        index.add_many(profiles)
+        logger.info(f"Indexed {len(index)} profiles in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+
+    @classmethod
+    def from_store(cls, store: Any, follow: bool = True, config: Optional[Dict[str, Any]] = None) -> "ProfileIndex":
+        """Index every profile in a ProfileStore; with follow=True, newly stored profiles are added as they arrive"""
+        index = cls.build(dict(store.profiles()), config)
+        if follow:
+            store.subscribe(index.add)
+        return index
+
+    def add_many(self, profiles: Union[Mapping[Hashable, Dict[str, Any]], Iterable[Dict[str, Any]]]) -> None:
+        items = profiles.items() if isinstance(profiles, Mapping) else (
+            (profile.get("profile_url") or position, profile) for position, profile in enumerate(profiles)
+        )
+        for profile_id, profile in items:
+            self.add(profile_id, profile)
+
+    def add(self, profile_id: Hashable, profile_data: Dict[str, Any]) -> None:
+        """Add or replace one profile (e.g. right after it was scraped)"""
+        features = ProfileFeatures.from_profile(profile_data, self.config)
+        keywords = {t: float(np.log1p(c)) for t, c in features.terms.items()}
+        metadata = {
+            "name": profile_data.get("name", ""),
+            "headline": profile_data.get("headline", ""),
+            "profile_url": profile_data.get("profile_url", ""),
+        }
+        with self._lock:
+            self.index.add(profile_id, {"skills": features.skills, "keywords": keywords}, sum(features.terms.values()))
+            self.profiles[profile_id] = {
+                "features": features,
+                "metadata": metadata,
+                "profile": CompactProfile.from_dict(profile_data),
+            }
+
+    def profile(self, profile_id: Hashable) -> Dict[str, Any]:
+        """Indexed profile in the dict schema agents expect (without the raw payload)"""
+        return self.profiles[profile_id]["profile"].to_dict()
+
+    def remove(self, profile_id: Hashable) -> bool:
+        with self._lock:
+            if self.profiles.pop(profile_id, None) is None:
+                return False
+            self.index.remove(profile_id)
+            return True
+
+    def _corpus_stats(self) -> Dict[str, Any]:
+        """Keyword IDF and per-profile keyword norms; rebuilt only after the pool changes"""
+        if self._cache_version == self.index.version:
+            return self._cache
+        keyword_idf = self.index.idf("keywords")
+
+        def keyword_square(term: str, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+            return (values * keyword_idf.get(term, 1.0)) ** 2
+
+        self._cache = {
+            "keyword_idf": keyword_idf,
+            "keyword_norms": np.sqrt(self.index.per_document("keywords", keyword_square)),
+        }
+        self._cache_version = self.index.version
+        return self._cache
+
+    def score_all(self, job: JobFeatures) -> np.ndarray:
+        """Fit score (0-100) of every indexed profile against one job"""
+        stats = self._corpus_stats()
+        weights = job.skill_weights(config=self.config)
+        keyword_idf = stats["keyword_idf"]
+        query = {t: float(np.log1p(c)) * keyword_idf.get(t, 1.0) for t, c in job.terms.items()}
+        query_norm = float(np.sqrt(sum(v * v for v in query.values())))
+        dots = self.index.accumulate("keywords", query, lambda term, slots, values: values * keyword_idf.get(term, 1.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = stats["keyword_norms"] * query_norm
+            keyword_match = np.where(denominator > 0, 100 * dots / denominator, 0.0)
+        if not weights:
+            return keyword_match
+        # Coverage postings weighted by how much the job stresses each skill
+        skill_match = 100 * self.index.accumulate("skills", weights) / sum(weights.values())
+        skill_weight = self.config.get("skill_weight", 0.75)
+        return skill_weight * skill_match + (1 - skill_weight) * keyword_match
+
+    def rank(self, job_description: Union[JobFeatures, str], top_k: int = 20) -> List[Dict[str, Any]]:
+        """Top-k profiles for a job, each with matched skills, evidence and gaps"""
+        start = time.perf_counter()
+        job = job_description if isinstance(job_description, JobFeatures) else JobFeatures.from_text(job_description, self.config)
+        with self._lock:
+            stats = self._corpus_stats()
+            shortlist = self.index.top_k(self.score_all(job), top_k)
+            entries = [(profile_id, score, self.profiles[profile_id]) for profile_id, score in shortlist]
+
+        results = []
+        for rank, (profile_id, score, entry) in enumerate(entries, 1):
+            detail = score_job_fit(entry["features"], job, config=self.config, keyword_idf=stats["keyword_idf"])
+            results.append({
+                "rank": rank,
+                "profile_id": profile_id,
+                "score": round(score, 2),
+                **entry["metadata"],
+                **detail,
+                "explanation": _explain(detail),
+            })
+        logger.info(
+            f"Ranked {len(self)} profiles, kept top {len(results)} in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+        return results
+
+
+def _explain(detail: Dict[str, Any]) -> str:
+    """One-line recruiter summary of a match"""
+    matched = ", ".join(
+        f"{m['skill']} ({m['evidence'][0]})" if m["evidence"] else m["skill"] for m in detail["matched_skills"][:4]
+    )
+    parts = [f"{detail['skill_match']}% skill match"]
+    if matched:
+        parts.append(f"strongest: {matched}")
+    if detail["missing_skills"]:
+        parts.append(f"gaps: {', '.join(detail['missing_skills'][:3])}")
+    return "; ".join(parts)
+
+
+def rank_jobs(
+    profile_data: Union[ProfileFeatures, Dict[str, Any]],
+    jobs: Union[JobIndex, Mapping[Hashable, Any], Iterable[Any]],
+    top_k: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    Rank jobs for a profile. Pass a prebuilt JobIndex to reuse it across
+    profiles; a mapping/sequence of descriptions is indexed on the fly.
+    """
+    index = jobs if isinstance(jobs, JobIndex) else JobIndex.build(jobs)
+    return index.rank(profile_data, top_k)
+
+
+def rank_profiles(
+    job_description: str,
+    profiles: Union[ProfileIndex, Mapping[Hashable, Dict[str, Any]], Iterable[Dict[str, Any]]],
+    top_k: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Rank candidate profiles for a job. Pass a ProfileIndex to reuse it; a
+    mapping/sequence of standardized profiles is indexed on the fly.
+    """
+    index = profiles if isinstance(profiles, ProfileIndex) else ProfileIndex.build(profiles)
+    return index.rank(job_description, top_k)
@@ -0,0 +1,228 @@
+"""
+Prepared profile for LinkedIn Profile Optimizer
+Renders the profile text that agent prompts and app pages embed (formatted
+experience, JSON blocks, skill lists) once per profile version instead of on
+every call. A PreparedProfile is keyed by a content hash, so loading the same
+profile again reuses it and a changed profile gets a fresh one.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Dict, Any, List, Optional, Tuple
+
+# Bounded so a long-running process does not keep every profile it has seen
+MAX_PREPARED_PROFILES = 64
+
+
+def profile_version(profile_data: Dict[str, Any]) -> str:
+    """Content hash of a standardized profile (raw scraper payload excluded)"""
+    data = {k: v for k, v in profile_data.items() if k != "raw_data"}
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def _shorten(text: str, limit: int) -> str:
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def format_experience(experience: List[Dict], limit: int = 3) -> str:
+    """Bullet list of the most recent positions with shortened descriptions"""
+    if not experience:
+        return "No experience listed"
+    formatted = []
+    for exp in experience[:limit]:
+        description = _shorten(exp.get('description', '') or '', 200) or 'No description'
+        formatted.append(
+            f"• {exp.get('title', 'N/A')} at {exp.get('company', 'N/A')} ({exp.get('duration', 'N/A')})\n  {description}"
+        )
+    return "\n".join(formatted)
+
+
+def format_recent_experience(experience: List[Dict]) -> str:
+    """Most recent position with a longer description"""
+    if not experience:
+        return "No experience listed"
+    recent = experience[0]
+    description = _shorten(recent.get('description', '') or '', 300) or 'No description'
+    return f"{recent.get('title', 'N/A')} at {recent.get('company', 'N/A')} ({recent.get('duration', 'N/A')})\n{description}"
+
+
+def format_education(education: List[Dict]) -> str:
+    """Bullet list of degrees"""
+    if not education:
+        return "No education listed"
+    return "\n".join(
+        f"• {edu.get('degree', 'N/A')} from {edu.get('school', 'N/A')} ({edu.get('duration', 'N/A')})"
+        for edu in education
+    )
+
+
+def assess_experience_level(experience: List[Dict]) -> str:
+    """Rough seniority from the number of positions"""
+    if not experience:
+        return "Entry Level"
+    total_years = len(experience) * 1.5  # Rough estimate
+    if total_years < 2:
+        return "Entry Level"
+    elif total_years < 5:
+        return "Mid Level"
+    elif total_years < 10:
+        return "Senior Level"
+    return "Executive Level"
+
+
+class PreparedProfile:
+    """
+    Memoized prompt fragments for one profile version. Treat the underlying
+    profile dict as immutable: edits should produce a new dict (which gets
+    a new version), as loading a profile in the app does.
+    """
+
+    def __init__(self, profile_data: Dict[str, Any], version: Optional[str] = None):
+        self.data = profile_data
+        self.version = version or profile_version(profile_data)
+        self._fragments: Dict[Tuple[Any, ...], str] = {}
+
+    def get(self, key: str, default: Any = "") -> Any:
+        return self.data.get(key, default)
+
+    @property
+    def experience(self) -> List[Dict]:
+        return self.data.get('experience', []) or []
+
+    @property
+    def education(self) -> List[Dict]:
+        return self.data.get('education', []) or []
+
+    @property
+    def skills(self) -> List[str]:
+        return self.data.get('skills', []) or []
+
+    # ------------- Fragments used by agents.py -------------
+
+    @cached_property
+    def experience_text(self) -> str:
+        return format_experience(self.experience)
+
+    @cached_property
+    def recent_experience_text(self) -> str:
+        return format_recent_experience(self.experience)
+
+    @cached_property
+    def education_text(self) -> str:
+        return format_education(self.education)
+
+    @cached_property
+    def experience_level(self) -> str:
+        return assess_experience_level(self.experience)
+
+    def skills_text(self, limit: Optional[int] = None, ellipsis: bool = False) -> str:
+        """Comma-separated skills (first limit of them; "..." marks a cut list if ellipsis)"""
+        key = ("skills", limit, ellipsis)
+        if key not in self._fragments:
+            skills = self.skills if limit is None else self.skills[:limit]
+            text = ', '.join(skills)
+            if ellipsis and limit is not None and len(self.skills) > limit:
+                text += '...'
+            self._fragments[key] = text
+        return self._fragments[key]
+
+    # ------------- JSON blocks used by the app and orchestrator -------------
+
+    def experience_json(self, limit: Optional[int] = None) -> str:
+        """JSON of all positions (full) or the most recent limit of them (top-3, recent-only)"""
+        key = ("experience_json", limit)
+        if key not in self._fragments:
+            self._fragments[key] = json.dumps(self.experience if limit is None else self.experience[:limit])
+        return self._fragments[key]
+
+    @cached_property
+    def education_json(self) -> str:
+        return json.dumps(self.education)
+
+    @cached_property
+    def analysis_block(self) -> str:
+        """Full profile block for the profile analysis prompt"""
+        return (
+            f"Name: {self.get('name')}\n"
+            f"Headline: {self.get('headline')}\n"
+            f"Summary: {self.get('summary')}\n"
+            f"Experience: {self.experience_json()}\n"
+            f"Education: {self.education_json}\n"
+            f"Skills: {self.skills_text()}\n"
+            f"Location: {self.get('location')}\n"
+            f"Industry: {self.get('industry')}\n"
+        )
+
+    @cached_property
+    def job_fit_block(self) -> str:
+        """Profile block for job fit prompts (top-3 positions)"""
+        return (
+            f"Profile: {self.get('name')}\n"
+            f"Headline: {self.get('headline')}\n"
+            f"Summary: {self.get('summary')}\n"
+            f"Skills: {self.skills_text()}\n"
+            f"Experience: {self.experience_json(3)}\n"
+            f"Education: {self.education_json}\n"
+        )
+
+    @cached_property
+    def guidance_block(self) -> str:
+        """Profile block for career guidance prompts (two most recent positions)"""
+        return (
+            f"Current Profile: {self.get('name')}\n"
+            f"Current Role: {self.get('headline')}\n"
+            f"Current Skills: {self.skills_text()}\n"
+            f"Experience: {self.experience_json(2)}\n"
+        )
+
+    @cached_property
+    def context_line(self) -> str:
+        """Name - headline, for short prompts (content optimization, chat)"""
+        return f"{self.get('name')} - {self.get('headline')}"
+
+
+_by_version: "OrderedDict[str, PreparedProfile]" = OrderedDict()
+_by_identity: "OrderedDict[int, Tuple[Dict[str, Any], Tuple, str]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _signature(profile_data: Dict[str, Any]) -> Tuple:
+    """Cheap check that a dict seen before was not replaced or resized in place"""
+    return tuple((k, id(v), len(v) if isinstance(v, (str, list, dict)) else v) for k, v in profile_data.items())
+
+
+def prepare_profile(profile_data: Any) -> PreparedProfile:
+    """
+    Return the PreparedProfile for a profile dict (or pass one through).
+    The same dict object is recognized without re-hashing; a different dict
+    with identical content shares the fragments of the earlier one.
+    """
+    if isinstance(profile_data, PreparedProfile):
+        return profile_data
+    profile_data = profile_data or {}
+    signature = _signature(profile_data)
+    with _lock:
+        seen = _by_identity.get(id(profile_data))
+        if seen is not None and seen[0] is profile_data and seen[1] == signature:
+            prepared = _by_version.get(seen[2])
+            if prepared is not None:
+                _by_version.move_to_end(seen[2])
+                return prepared
+
+    version = profile_version(profile_data)
+    with _lock:
+        prepared = _by_version.get(version)
+        if prepared is None:
+            prepared = PreparedProfile(profile_data, version)
+            _by_version[version] = prepared
+            while len(_by_version) > MAX_PREPARED_PROFILES:
+                _by_version.popitem(last=False)
+        _by_version.move_to_end(version)
+        _by_identity[id(profile_data)] = (profile_data, signature, version)
+        while len(_by_identity) > MAX_PREPARED_PROFILES:
+            _by_identity.popitem(last=False)
+        return prepared
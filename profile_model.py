@@ -0,0 +1,240 @@
+"""
+Compact profile model for LinkedIn Profile Optimizer
+Slotted records for profiles held in memory in bulk (profile indexes, batch
+pools, Streamlit sessions). Repeated strings (skills, titles, companies,
+locations) are interned, and the raw Apify payload is dropped unless asked
+for: it can be reloaded lazily, e.g. from the profile store. Agents keep
+working on the dict schema via to_dict()/from_dict().
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, Optional, Tuple
+
+MOCK_SOURCE = "mock_data"
+
+
+def _intern(value: Any) -> str:
+    """Intern short, frequently repeated strings; long free text is left alone"""
+    if not isinstance(value, str):
+        return "" if value is None else str(value)
+    return sys.intern(value) if len(value) <= 80 else value
+
+
+def _extra(data: Dict[str, Any], known: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """Keys outside the typed fields, kept so conversion back is lossless (None when there are none)"""
+    extra = {k: v for k, v in data.items() if k not in known}
+    return extra or None
+
+
+def _split_entry(data: Dict[str, Any], fields: Tuple[str, ...]) -> Tuple[Dict[str, str], int, Optional[Dict[str, Any]]]:
+    """
+    String values of an entry's typed fields, a bitmask of which of them were
+    present, and every other key (non-string values included) kept as is
+    """
+    typed: Dict[str, str] = {}
+    present = 0
+    extra: Dict[str, Any] = {}
+    for key, value in data.items():
+        if key in fields and isinstance(value, str):
+            typed[key] = value
+            present |= 1 << fields.index(key)
+        else:
+            extra[key] = value
+    return typed, present, extra or None
+
+
+def _entry_dict(entry: Any) -> Dict[str, Any]:
+    """Entry back in dict form: exactly the typed fields the input had, then the rest"""
+    if entry.present is None:
+        data = {name: getattr(entry, name) for name in entry.FIELDS if getattr(entry, name)}
+    else:
+        data = {name: getattr(entry, name) for i, name in enumerate(entry.FIELDS) if entry.present >> i & 1}
+    if entry.extra:
+        data.update(entry.extra)
+    return data
+
+
+@dataclass(slots=True)
+class Position:
+    """One experience entry"""
+
+    title: str = ""
+    company: str = ""
+    duration: str = ""
+    location: str = ""
+    description: str = ""
+    present: Optional[int] = None  # bitmask over FIELDS of the keys the input had (None: non-empty ones)
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = ("title", "company", "duration", "location", "description")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Position":
+        typed, present, extra = _split_entry(data, cls.FIELDS)
+        return cls(
+            title=_intern(typed.get("title", "")),
+            company=_intern(typed.get("company", "")),
+            duration=_intern(typed.get("duration", "")),
+            location=_intern(typed.get("location", "")),
+            description=typed.get("description", ""),
+            present=present,
+            extra=extra,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _entry_dict(self)
+
+
+@dataclass(slots=True)
+class Education:
+    """One education entry"""
+
+    school: str = ""
+    degree: str = ""
+    duration: str = ""
+    description: str = ""
+    present: Optional[int] = None  # bitmask over FIELDS of the keys the input had (None: non-empty ones)
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = ("school", "degree", "duration", "description")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Education":
+        typed, present, extra = _split_entry(data, cls.FIELDS)
+        return cls(
+            school=_intern(typed.get("school", "")),
+            degree=_intern(typed.get("degree", "")),
+            duration=_intern(typed.get("duration", "")),
+            description=typed.get("description", ""),
+            present=present,
+            extra=extra,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _entry_dict(self)
+
+
+# Top-level short string fields of the standardized profile schema (interned)
+_TEXT_FIELDS = ("name", "headline", "location", "profile_url", "profile_image", "industry", "company", "school")
+_LIST_FIELDS = ("languages", "certifications", "volunteer", "projects")
+_PROFILE_FIELDS = _TEXT_FIELDS + _LIST_FIELDS + ("summary", "experience", "education", "skills", "connections", "raw_data")
+
+
+@dataclass(slots=True)
+class CompactProfile:
+    """Standardized profile without the duplicated raw payload"""
+
+    name: str = ""
+    headline: str = ""
+    location: str = ""
+    summary: str = ""
+    profile_url: str = ""
+    profile_image: str = ""
+    industry: str = ""
+    company: str = ""
+    school: str = ""
+    experience: Tuple[Position, ...] = ()
+    education: Tuple[Education, ...] = ()
+    skills: Tuple[str, ...] = ()
+    connections: int = 0
+    languages: Tuple[Dict[str, Any], ...] = ()
+    certifications: Tuple[Dict[str, Any], ...] = ()
+    volunteer: Tuple[Dict[str, Any], ...] = ()
+    projects: Tuple[Dict[str, Any], ...] = ()
+    source: str = ""  # raw_data["source"], e.g. "mock_data"
+    extra: Optional[Dict[str, Any]] = None
+    raw: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+    raw_loader: Optional[Callable[[], Dict[str, Any]]] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(
+        cls,
+        profile_data: Dict[str, Any],
+        keep_raw: bool = False,
+        raw_loader: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> "CompactProfile":
+        """
+        Build from the dict schema returned by the scraper. The raw payload is
+        only kept with keep_raw=True; otherwise raw_loader (if given) is used to
+        fetch it on demand.
+        """
+        raw = profile_data.get("raw_data") or {}
+        return cls(
+            **{name: _intern(profile_data.get(name)) for name in _TEXT_FIELDS},
+            summary=profile_data.get("summary") or "",
+            experience=tuple(Position.from_dict(e) for e in profile_data.get("experience") or [] if isinstance(e, dict)),
+            education=tuple(Education.from_dict(e) for e in profile_data.get("education") or [] if isinstance(e, dict)),
+            skills=tuple(_intern(s) for s in profile_data.get("skills") or [] if s),
+            connections=profile_data.get("connections") or 0,
+            **{name: tuple(profile_data.get(name) or []) for name in _LIST_FIELDS},
+            source=_intern(raw.get("source", "")) if isinstance(raw, dict) else "",
+            extra=_extra(profile_data, _PROFILE_FIELDS),
+            raw=raw if keep_raw and raw else None,
+            raw_loader=raw_loader,
+        )
+
+    @property
+    def raw_data(self) -> Dict[str, Any]:
+        """Raw scraper payload: kept copy, lazily loaded one, or just the source marker"""
+        if self.raw is not None:
+            return self.raw
+        if self.raw_loader is not None:
+            raw = self.raw_loader()
+            if raw:
+                return raw
+        return {"source": self.source} if self.source else {}
+
+    @property
+    def is_mock(self) -> bool:
+        return self.source == MOCK_SOURCE
+
+    def to_dict(self, include_raw: bool = False) -> Dict[str, Any]:
+        """
+        Dict in the schema agents expect. raw_data holds only the source marker
+        unless include_raw=True (which may load it from disk).
+        """
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "headline": self.headline,
+            "location": self.location,
+            "summary": self.summary,
+            "experience": [e.to_dict() for e in self.experience],
+            "education": [e.to_dict() for e in self.education],
+            "skills": list(self.skills),
+            "connections": self.connections,
+            "profile_url": self.profile_url,
+            "profile_image": self.profile_image,
+            "industry": self.industry,
+            "company": self.company,
+            "school": self.school,
+        }
+        data.update({name: list(getattr(self, name)) for name in _LIST_FIELDS})
+        if self.extra:
+            data.update(self.extra)
+        data["raw_data"] = self.raw_data if include_raw else ({"source": self.source} if self.source else {})
+        return data
+
+
+def compact_profile(profile_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Dict-schema profile with interned strings and without the raw payload,
+    for holding in long-lived state such as a Streamlit session
+    """
+    return CompactProfile.from_dict(profile_data).to_dict()
+
+
+def profile_memory_size(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate deep size in bytes (shared and interned objects counted once)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(profile_memory_size(k, seen) + profile_memory_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(profile_memory_size(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(profile_memory_size(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    return size
@@ -0,0 +1,229 @@
+"""
+Profile store for LinkedIn Profile Optimizer
+Persists standardized profile data keyed by canonical profile URL so repeat
+loads are a local read instead of a full Apify task run.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple, Callable, Iterator, List
+
+from config import AppConfig
+from profile_model import CompactProfile
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ProfileStore:
+    """SQLite-backed profile store with max-age and stale-while-revalidate policy"""
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_age: float = 24 * 3600,
+        max_stale: float = 30 * 24 * 3600,
+        refresh_workers: int = 2,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS profiles (
+                profile_url TEXT PRIMARY KEY,
+                profile_json TEXT NOT NULL,
+                raw_json TEXT,
+                scraped_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="profile-refresh")
+        self._refreshing: set = set()
+        self._subscribers: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["ProfileStore"]:
+        """Build a store from AppConfig.PROFILE_STORE_CONFIG, or None when disabled"""
+        config = config or AppConfig.PROFILE_STORE_CONFIG
+        if not config.get("enabled", True):
+            return None
+        try:
+            return cls(
+                path=config.get("path") or ":memory:",
+                max_age=config.get("max_age", 24 * 3600),
+                max_stale=config.get("max_stale", 30 * 24 * 3600),
+                refresh_workers=config.get("refresh_workers", 2),
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open profile store {config.get('path')}: {e}")
+            return None
+
+    # ------------- Storage -------------
+
+    def get(self, profile_url: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (profile, scraped_at) for a canonical URL, if stored"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT profile_json, raw_json, scraped_at FROM profiles WHERE profile_url = ?",
+                (profile_url,),
+            ).fetchone()
+        if row is None:
+            return None
+        profile_json, raw_json, scraped_at = row
+        profile = json.loads(profile_json)
+        profile["raw_data"] = json.loads(raw_json) if raw_json else {}
+        return profile, scraped_at
+
+    def put(self, profile_url: str, profile: Dict[str, Any], scraped_at: Optional[float] = None) -> None:
+        """Store a standardized profile; raw_data is kept in its own column"""
+        data = {k: v for k, v in profile.items() if k != "raw_data"}
+        raw = profile.get("raw_data")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (profile_url, profile_json, raw_json, scraped_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    profile_url,
+                    json.dumps(data, ensure_ascii=False),
+                    json.dumps(raw, ensure_ascii=False) if raw is not None else None,
+                    scraped_at or time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def load_raw(self, profile_url: str) -> Dict[str, Any]:
+        """Raw scraper payload for a stored profile ({} if none)"""
+        with self._lock:
+            row = self._conn.execute("SELECT raw_json FROM profiles WHERE profile_url = ?", (profile_url,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else {}
+
+    def get_compact(self, profile_url: str) -> Optional[CompactProfile]:
+        """Stored profile as a CompactProfile whose raw payload is only read from disk when accessed"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT profile_json FROM profiles WHERE profile_url = ?", (profile_url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CompactProfile.from_dict(json.loads(row[0]), raw_loader=self._raw_loader(profile_url))
+
+    def compact_profiles(self) -> Iterator[Tuple[str, CompactProfile]]:
+        """Every stored profile as (profile_url, CompactProfile), raw payload loaded lazily"""
+        for profile_url, profile in self.profiles():
+            yield profile_url, CompactProfile.from_dict(profile, raw_loader=self._raw_loader(profile_url))
+
+    def _raw_loader(self, profile_url: str) -> Callable[[], Dict[str, Any]]:
+        def load() -> Dict[str, Any]:
+            return self.load_raw(profile_url)
+        return load
+
+    def profiles(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Every stored (profile_url, profile) pair, without raw data"""
+        with self._lock:
+            rows = self._conn.execute("SELECT profile_url, profile_json FROM profiles").fetchall()
+        for profile_url, profile_json in rows:
+            yield profile_url, json.loads(profile_json)
+
+    def subscribe(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call callback(profile_url, profile) whenever a scraped profile is stored"""
+        self._subscribers.append(callback)
+
+    def invalidate(self, profile_url: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM profiles WHERE profile_url = ?", (profile_url,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    # ------------- Freshness policy -------------
+
+    def get_or_scrape(
+        self,
+        profile_url: str,
+        scrape_fn: Callable[[str], Dict[str, Any]],
+        force_refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Serve a profile according to the freshness policy:
+        fresh (younger than max_age) is returned as-is; stale but younger than
+        max_stale is returned immediately while a background refresh runs;
+        anything older, missing or force_refresh scrapes synchronously.
+        """
+        cached = None if force_refresh else self.get(profile_url)
+        if cached is not None:
+            profile, scraped_at = cached
+            age = time.time() - scraped_at
+            if age < self.max_age:
+                logger.info(f"Profile store hit for {profile_url} (age {age:.0f}s)")
+                return profile
+            if age < self.max_stale:
+                logger.info(f"Serving stale profile for {profile_url} (age {age:.0f}s), refreshing in background")
+                self.refresh_async(profile_url, scrape_fn)
+                return profile
+
+        profile = scrape_fn(profile_url)
+        self._store_if_real(profile_url, profile)
+        return profile
+
+    def refresh_async(self, profile_url: str, scrape_fn: Callable[[str], Dict[str, Any]]) -> None:
+        """Re-scrape a profile on the background pool, once per URL at a time"""
+        with self._lock:
+            if profile_url in self._refreshing:
+                return
+            self._refreshing.add(profile_url)
+
+        def refresh() -> None:
+            try:
+                self._store_if_real(profile_url, scrape_fn(profile_url))
+            except Exception as e:
+                logger.error(f"Background refresh failed for {profile_url}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(profile_url)
+
+        self._refresher.submit(refresh)
+
+    def warm(
+        self,
+        profile_urls: List[str],
+        batch_scrape_fn: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, int]:
+        """Bulk-load every URL that is missing or past max_age with one batch scrape"""
+        now = time.time()
+        to_scrape = []
+        for url in dict.fromkeys(profile_urls):
+            cached = self.get(url)
+            if cached is None or now - cached[1] >= self.max_age:
+                to_scrape.append(url)
+
+        stored = 0
+        if to_scrape:
+            for url, profile in batch_scrape_fn(to_scrape).items():
+                if self._store_if_real(url, profile):
+                    stored += 1
+        logger.info(f"Profile store warm-up: {stored} scraped, {len(profile_urls) - len(to_scrape)} already fresh")
+        return {"requested": len(profile_urls), "scraped": stored, "fresh": len(profile_urls) - len(to_scrape)}
+
+    def _store_if_real(self, profile_url: str, profile: Dict[str, Any]) -> bool:
+        """Persist real scrape results; mock fallbacks are never stored"""
+        raw = profile.get("raw_data") or {}
+        if raw.get("source") == "mock_data":
+            return False
+        self.put(profile_url, profile)
+        for callback in self._subscribers:
+            try:
+                callback(profile_url, profile)
+            except Exception as e:
+                logger.error(f"Profile store subscriber failed for {profile_url}: {e}")
+        return True
@@ -0,0 +1,262 @@
+"""
+Provider router for LinkedIn Profile Optimizer
+Tracks rolling latency, error rate and rate limiting per AI provider, guards
+each provider with a circuit breaker and orders providers for every request
+so the fastest healthy one is tried first.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
+
+from config import AppConfig, AIProviderConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROVIDER_PRIORITY = ["nvidia", "groq", "huggingface"]
+
+_HTTP_STATUS_RE = re.compile(r"HTTP (\d{3})")
+
+
+def error_status_code(error: Exception) -> Optional[int]:
+    """Best-effort HTTP status of a provider error (openai exceptions or 'HTTP 429: ...')"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    match = _HTTP_STATUS_RE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class ProviderStats:
+    """Rolling window of request outcomes for one provider"""
+
+    def __init__(self, window_size: int = 100, window_seconds: float = 300.0):
+        self.window_seconds = window_seconds
+        # (finished_at, latency_s, ok, rate_limited)
+        self._samples: Deque[Tuple[float, float, bool, bool]] = deque(maxlen=window_size)
+
+    def add(self, latency: float, ok: bool, rate_limited: bool = False) -> None:
+        self._samples.append((time.monotonic(), latency, ok, rate_limited))
+
+    def reset(self) -> None:
+        self._samples.clear()
+
+    def _recent(self) -> List[Tuple[float, float, bool, bool]]:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return list(self._samples)
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = self._recent()
+        latencies = sorted(s[1] for s in samples if s[2])
+        total = len(samples)
+        errors = sum(1 for s in samples if not s[2])
+        return {
+            "requests": total,
+            "successes": len(latencies),
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "rate_limited": sum(1 for s in samples if s[3]),
+            "p50_s": round(_percentile(latencies, 50), 4) if latencies else None,
+            "p95_s": round(_percentile(latencies, 95), 4) if latencies else None,
+        }
+
+
+class CircuitBreaker:
+    """closed -> open after repeated failures -> half_open probe -> closed/open"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, open_seconds: float = 30.0, max_open_seconds: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.open_seconds = open_seconds
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    def available(self) -> bool:
+        """Whether a request could be sent now (does not claim the probe slot)"""
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self._probe_in_flight and now - self._probe_started >= self.open_seconds:
+            # Probe never reported back (cancelled request): let another one through
+            self._probe_in_flight = False
+        return self.state == self.CLOSED or not self._probe_in_flight
+
+    def acquire(self) -> bool:
+        """Claim permission to send; in half-open state only one probe is let through"""
+        if not self.available():
+            return False
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.open_seconds = self.base_open_seconds
+        self._probe_in_flight = False
+
+    def record_failure(self, trip: bool = False) -> None:
+        """Count a failure; trip=True (e.g. HTTP 429) opens the breaker immediately"""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN:
+            # Failed probe: stay away longer next time
+            self._open(min(self.open_seconds * 2, self.max_open_seconds))
+        elif trip or self.consecutive_failures >= self.failure_threshold:
+            self._open(self.open_seconds)
+
+    def _open(self, seconds: float) -> None:
+        self.state = self.OPEN
+        self.open_seconds = seconds
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+
+class ProviderRouter:
+    """Latency-aware provider ordering with per-provider circuit breakers"""
+
+    def __init__(
+        self,
+        providers: List[str],
+        preferred: Optional[str] = None,
+        window_size: int = 100,
+        window_seconds: float = 300.0,
+        min_samples: int = 5,
+        preferred_margin: float = 1.25,
+        max_error_rate: float = 0.5,
+        explore_rate: float = 0.05,
+        failure_threshold: int = 3,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0,
+    ):
+        self.providers = list(providers)
+        self.preferred = preferred if preferred in self.providers else (self.providers[0] if self.providers else None)
+        self.min_samples = min_samples
+        self.preferred_margin = preferred_margin
+        self.max_error_rate = max_error_rate
+        self.explore_rate = explore_rate
+        self.stats = {p: ProviderStats(window_size, window_seconds) for p in self.providers}
+        self.breakers = {p: CircuitBreaker(failure_threshold, open_seconds, max_open_seconds) for p in self.providers}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, preferred: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> "ProviderRouter":
+        """Build a router over the providers that have API keys"""
+        config = config or AIProviderConfig.ROUTING_CONFIG
+        available = AppConfig.get_available_providers()
+        providers = [p for p in PROVIDER_PRIORITY if available.get(p)] or [preferred or AppConfig.DEFAULT_PROVIDER]
+        if preferred and preferred not in providers:
+            providers.insert(0, preferred)
+        return cls(
+            providers,
+            preferred=preferred,
+            window_size=config.get("window_size", 100),
+            window_seconds=config.get("window_seconds", 300.0),
+            min_samples=config.get("min_samples", 5),
+            preferred_margin=config.get("preferred_margin", 1.25),
+            max_error_rate=config.get("max_error_rate", 0.5),
+            explore_rate=config.get("explore_rate", 0.05),
+            failure_threshold=config.get("failure_threshold", 3),
+            open_seconds=config.get("open_seconds", 30.0),
+            max_open_seconds=config.get("max_open_seconds", 300.0),
+        )
+
+    def _rank(self, provider: str, snap: Dict[str, Any]) -> Tuple[int, float, int]:
+        """Sort key: healthy first, then p95 latency (preferred gets a margin), then priority"""
+        unhealthy = int(snap["requests"] >= self.min_samples and snap["error_rate"] > self.max_error_rate)
+        if snap["successes"] >= self.min_samples:
+            latency = snap["p95_s"]
+            if provider == self.preferred:
+                latency /= self.preferred_margin
+        elif provider == self.preferred:
+            # Unmeasured (startup or just recovered): the preferred provider goes first
+            latency = 0.0
+        else:
+            # Not enough data: rank after measured providers, in static priority order
+            latency = float("inf")
+        if provider == self.preferred:
+            priority = 0
+        elif provider in PROVIDER_PRIORITY:
+            priority = 1 + PROVIDER_PRIORITY.index(provider)
+        else:
+            priority = len(PROVIDER_PRIORITY) + 1
+        return unhealthy, latency, priority
+
+    def candidates(self) -> List[str]:
+        """Providers to try for one request, best first; open breakers are skipped"""
+        with self._lock:
+            snaps = {p: self.stats[p].snapshot() for p in self.providers}
+            ordered = sorted(self.providers, key=lambda p: self._rank(p, snaps[p]))
+            if len(ordered) > 1 and random.random() < self.explore_rate:
+                # Occasionally lead with the least-measured provider so its latency stays current
+                explore = min(ordered[1:], key=lambda p: snaps[p]["requests"])
+                if self.breakers[explore].state == CircuitBreaker.CLOSED:
+                    ordered.remove(explore)
+                    ordered.insert(0, explore)
+            allowed = [p for p in ordered if self.breakers[p].available()]
+            # A provider due a half-open probe goes first: a real request is the
+            # probe, and on failure the caller simply moves on to the next provider
+            allowed.sort(key=lambda p: self.breakers[p].state != CircuitBreaker.HALF_OPEN)
+        if not allowed:
+            logger.warning("All provider circuits are open; failing fast")
+        return allowed
+
+    def acquire(self, provider: str) -> bool:
+        """Claim a request slot for provider right before sending to it"""
+        with self._lock:
+            breaker = self.breakers.get(provider)
+            return breaker is None or breaker.acquire()
+
+    def record_success(self, provider: str, latency: float) -> None:
+        with self._lock:
+            if provider not in self.stats:
+                return
+            if self.breakers[provider].state != CircuitBreaker.CLOSED:
+                # Judge the recovered provider on fresh samples, not the outage
+                logger.info(f"Provider {provider} recovered, closing circuit")
+                self.stats[provider].reset()
+            self.stats[provider].add(latency, ok=True)
+            self.breakers[provider].record_success()
+
+    def record_failure(self, provider: str, latency: float, error: Optional[Exception] = None) -> None:
+        rate_limited = error is not None and error_status_code(error) == 429
+        with self._lock:
+            if provider not in self.stats:
+                return
+            self.stats[provider].add(latency, ok=False, rate_limited=rate_limited)
+            breaker = self.breakers[provider]
+            breaker.record_failure(trip=rate_limited)
+            if breaker.state == CircuitBreaker.OPEN:
+                logger.warning(
+                    f"Circuit open for {provider} for {breaker.open_seconds:g}s"
+                    f"{' (rate limited)' if rate_limited else ''}"
+                )
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider rolling stats and breaker state"""
+        with self._lock:
+            return {
+                p: {**self.stats[p].snapshot(), "circuit": self.breakers[p].state, "preferred": p == self.preferred}
+                for p in self.providers
+            }
@@ -0,0 +1,260 @@
+"""
+Rate limiter for LinkedIn Profile Optimizer
+Client-side token buckets (requests/min and tokens/min) per AI provider with a
+bounded priority queue in front, so bursts wait their turn instead of turning
+into 429 errors from free-tier endpoints.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional
+
+from config import AIProviderConfig, AppConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "default": 1, "batch": 2}
+
+# Task types that are someone waiting on a chat reply
+INTERACTIVE_TASKS = {"chat"}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted (queue full or wait too long)"""
+
+
+def priority_for(task: Optional[str] = None, priority: Optional[str] = None) -> str:
+    """Resolve a priority name from an explicit value or the task type"""
+    if priority in PRIORITIES:
+        return priority
+    return "interactive" if task in INTERACTIVE_TASKS else "default"
+
+
+class TokenBucket:
+    """Continuously refilling bucket; may go negative to account for usage after the fact"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available (0 if it is available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def drain(self) -> None:
+        """Empty the bucket (the provider told us we are over its limit)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class ProviderRateLimiter:
+    """Token buckets for one provider plus a bounded priority queue of waiting requests"""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_queue: int = 100,
+        max_wait: Optional[Dict[str, float]] = None,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_queue = max_queue
+        self.max_wait = dict(max_wait or {})
+        self._cond = threading.Condition()
+        self._queue: List[list] = []  # heap of [priority, seq, tokens]
+        self._seq = itertools.count()
+        self._waits: Deque[float] = deque(maxlen=500)
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "timeouts": 0, "throttled": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.request_bucket is not None or self.token_bucket is not None
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.wait_time(1))
+        if self.token_bucket is not None:
+            wait = max(wait, self.token_bucket.wait_time(tokens))
+        return wait
+
+    def _consume(self, tokens: int) -> None:
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None:
+            self.token_bucket.consume(tokens)
+
+    def has_capacity(self, tokens: int = 0) -> bool:
+        """Whether a request would be admitted right now without queueing"""
+        with self._cond:
+            return not self._queue and self._wait_time(tokens) == 0
+
+    def acquire(self, tokens: int = 0, priority: str = "default", timeout: Optional[float] = None) -> float:
+        """
+        Block until the request may be sent and return the time spent waiting.
+        Requests are admitted strictly in priority order (FIFO within a priority).
+        Raises RateLimitExceeded if the queue is full or the wait exceeds timeout.
+        """
+        if not self.enabled:
+            return 0.0
+        if timeout is None:
+            timeout = self.max_wait.get(priority)
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+
+        with self._cond:
+            if not self._queue and self._wait_time(tokens) == 0:
+                self._consume(tokens)
+                self._admit(0.0)
+                return 0.0
+            if len(self._queue) >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise RateLimitExceeded(f"Rate limit queue full ({self.max_queue} waiting)")
+
+            entry = [PRIORITIES.get(priority, PRIORITIES["default"]), next(self._seq), tokens]
+            heapq.heappush(self._queue, entry)
+            self._stats["queued"] += 1
+            try:
+                while True:
+                    wait = None
+                    if self._queue[0] is entry:
+                        wait = self._wait_time(tokens)
+                        if wait == 0:
+                            heapq.heappop(self._queue)
+                            self._consume(tokens)
+                            waited = time.monotonic() - start
+                            self._admit(waited)
+                            return waited
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["timeouts"] += 1
+                            raise RateLimitExceeded(f"Waited {timeout:g}s for rate limit capacity")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                raise
+            finally:
+                # Whoever is now at the head re-checks the buckets
+                self._cond.notify_all()
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """Non-blocking admission; never jumps ahead of queued requests"""
+        if not self.enabled:
+            return True
+        with self._cond:
+            if self._queue or self._wait_time(tokens) > 0:
+                return False
+            self._consume(tokens)
+            self._admit(0.0)
+            return True
+
+    def wait_time(self, tokens: int = 0) -> float:
+        """Estimated seconds until a request of this size could be admitted"""
+        with self._cond:
+            return self._wait_time(tokens)
+
+    def record_usage(self, tokens: int) -> None:
+        """Charge tokens that were only known after the response (completion tokens)"""
+        if self.token_bucket is not None and tokens > 0:
+            with self._cond:
+                self.token_bucket.consume(tokens)
+
+    def throttle(self) -> None:
+        """The provider answered 429: stop admitting until the buckets refill"""
+        with self._cond:
+            self._stats["throttled"] += 1
+            for bucket in (self.request_bucket, self.token_bucket):
+                if bucket is not None:
+                    bucket.drain()
+
+    def _admit(self, waited: float) -> None:
+        self._stats["admitted"] += 1
+        self._waits.append(waited)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth (total and per priority) and wait-time percentiles"""
+        with self._cond:
+            waits = sorted(self._waits)
+            names = {value: name for name, value in PRIORITIES.items()}
+            depth_by_priority = {name: 0 for name in PRIORITIES}
+            for entry in self._queue:
+                depth_by_priority[names[entry[0]]] += 1
+            stats: Dict[str, Any] = dict(self._stats)
+            stats.update(
+                queue_depth=len(self._queue),
+                queue_depth_by_priority=depth_by_priority,
+                max_queue=self.max_queue,
+                wait_p50_s=round(waits[len(waits) // 2], 4) if waits else 0.0,
+                wait_p95_s=round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+                wait_max_s=round(waits[-1], 4) if waits else 0.0,
+            )
+            if self.request_bucket is not None:
+                stats["requests_available"] = round(max(self.request_bucket.tokens, 0.0), 2)
+            if self.token_bucket is not None:
+                stats["tokens_available"] = round(self.token_bucket.tokens, 1)
+            return stats
+
+
+class RateLimiterRegistry:
+    """One ProviderRateLimiter per provider, built lazily from the provider configs"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or AIProviderConfig.RATE_LIMIT_CONFIG
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> ProviderRateLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(provider)
+                if limiter is None:
+                    provider_config = AppConfig.get_provider_config(provider) or {}
+                    limiter = ProviderRateLimiter(
+                        requests_per_minute=provider_config.get("requests_per_minute"),
+                        tokens_per_minute=provider_config.get("tokens_per_minute"),
+                        max_queue=self.config.get("max_queue", 100),
+                        max_wait=self.config.get("max_wait"),
+                    )
+                    self._limiters[provider] = limiter
+        return limiter
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {provider: limiter.get_stats() for provider, limiter in limiters.items()}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["RateLimiterRegistry"]:
+        """Build the registry, or None when rate limiting is disabled"""
+        config = config or AIProviderConfig.RATE_LIMIT_CONFIG
+        if not config.get("enabled", True):
+            return None
+        return cls(config)
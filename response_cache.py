@@ -0,0 +1,296 @@
+"""
+Response cache for LinkedIn Profile Optimizer
+Content-addressed cache for LLM responses with an in-memory LRU tier and an
+optional on-disk SQLite tier.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from config import AppConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    """Strip per-line indentation and surrounding blank lines so that
+    prompts built from indented f-strings hash identically."""
+    if not text:
+        return ""
+    return "\n".join(line.strip() for line in text.strip().splitlines())
+
+
+def make_cache_key(
+    system_prompt: Optional[str],
+    prompt: str,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    **extra: Any,
+) -> str:
+    """Return a stable SHA-256 key for a normalized generation request.
+
+    The provider is deliberately not part of the key: whichever provider
+    the router puts first, an identical request gets the cached answer.
+    """
+    payload = {
+        "system_prompt": _normalize_text(system_prompt),
+        "prompt": _normalize_text(prompt),
+        "temperature": None if temperature is None else round(float(temperature), 4),
+        "max_tokens": max_tokens,
+    }
+    if extra:
+        payload["extra"] = extra
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class MemoryLRUTier:
+    """In-memory LRU tier bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at and expires_at < time.time():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+class SQLiteTier:
+    """On-disk tier backed by a single SQLite table"""
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        now = time.time()
+        if expires_at and expires_at < now:
+            self.delete(key)
+            return None
+        self._conn.execute(
+            "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self._conn.commit()
+        return value, expires_at
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        size = len(value.encode("utf-8"))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at, size) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, value, expires_at, time.time(), size),
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired rows, then least recently accessed rows over the size budget."""
+        self._conn.execute(
+            "DELETE FROM response_cache WHERE expires_at > 0 AND expires_at < ?", (time.time(),)
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM response_cache ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM response_cache")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache for LLM responses"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 16 * 1024 * 1024,
+        default_ttl: float = 3600,
+        task_ttls: Optional[Dict[str, float]] = None,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.default_ttl = default_ttl
+        self.task_ttls = dict(task_ttls or {})
+        self.memory = MemoryLRUTier(max_entries=max_entries, max_bytes=max_bytes)
+        self.disk: Optional[SQLiteTier] = None
+        if sqlite_path:
+            try:
+                self.disk = SQLiteTier(sqlite_path, max_bytes=sqlite_max_bytes)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open response cache database {sqlite_path}: {e}")
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["ResponseCache"]:
+        """Build a cache from AppConfig.RESPONSE_CACHE_CONFIG, or None when disabled"""
+        config = config or AppConfig.RESPONSE_CACHE_CONFIG
+        if not config.get("enabled", True):
+            return None
+        return cls(
+            max_entries=config.get("max_entries", 512),
+            max_bytes=config.get("max_bytes", 16 * 1024 * 1024),
+            default_ttl=config.get("default_ttl", 3600),
+            task_ttls=config.get("task_ttls"),
+            sqlite_path=config.get("sqlite_path"),
+            sqlite_max_bytes=config.get("sqlite_max_bytes", 256 * 1024 * 1024),
+        )
+
+    def ttl_for(self, task: Optional[str] = None) -> float:
+        """Return the TTL in seconds for a task type (0 disables expiry)"""
+        if task and task in self.task_ttls:
+            return self.task_ttls[task]
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response, promoting disk hits into memory"""
+        with self._lock:
+            value = self.memory.get(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return value
+
+            if self.disk is not None:
+                try:
+                    row = self.disk.get(key)
+                except sqlite3.Error as e:
+                    logger.error(f"Response cache read error: {e}")
+                    row = None
+                if row is not None:
+                    value, expires_at = row
+                    self.memory.set(key, value, expires_at)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return value
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, task: Optional[str] = None) -> None:
+        """Store a response under key with a TTL (explicit, per-task or default)"""
+        if ttl is None:
+            ttl = self.ttl_for(task)
+        if ttl is not None and ttl < 0:
+            return
+        expires_at = time.time() + ttl if ttl else 0.0
+        with self._lock:
+            self.memory.set(key, value, expires_at)
+            if self.disk is not None:
+                try:
+                    self.disk.set(key, value, expires_at)
+                except sqlite3.Error as e:
+                    logger.error(f"Response cache write error: {e}")
+            self._stats["sets"] += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self.memory.delete(key)
+            if self.disk is not None:
+                self.disk.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.memory.clear()
+            if self.disk is not None:
+                self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["memory_entries"] = len(self.memory)
+            stats["memory_bytes"] = self.memory.size_bytes
+            stats["memory_evictions"] = self.memory.evictions
+            if self.disk is not None:
+                stats["disk_entries"] = len(self.disk)
+                stats["disk_evictions"] = self.disk.evictions
+            return stats
@@ -0,0 +1,126 @@
+"""
+Structured output schemas for LinkedIn Profile Optimizer
+Pydantic models for the JSON mode of the agents, plus helpers to pull a JSON
+object out of a model response and validate it field by field.
+"""
+
+import json
+import re
+from typing import Annotated, Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+Score = Annotated[int, Field(ge=0, le=100)]
+Items = Annotated[List[str], Field(min_length=1)]
+
+# Passed through to providers that support OpenAI-style JSON output
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+class SectionScores(BaseModel):
+    headline: Score
+    summary: Score
+    experience: Score
+    education: Score
+    skills: Score
+
+
+class ProfileAnalysisOutput(BaseModel):
+    overall_score: Score
+    section_scores: SectionScores
+    strengths: Items = Field(description="5-6 specific strengths with examples")
+    weaknesses: Items = Field(description="4-5 weaknesses and why they matter")
+    recommendations: Items = Field(description="6-8 actionable recommendations")
+    keywords: Items = Field(description="5-6 industry keywords with relevance")
+
+
+class SectionUpdateOutput(BaseModel):
+    section_scores: Dict[str, Score] = Field(description="scores of the re-analyzed sections only")
+    strengths: List[str] = Field(default_factory=list, description="2-3 strengths of the changed sections")
+    weaknesses: List[str] = Field(default_factory=list, description="2-3 weaknesses of the changed sections")
+    recommendations: List[str] = Field(default_factory=list, description="2-4 recommendations for the changed sections")
+    keywords: List[str] = Field(default_factory=list, description="new keywords the changed sections suggest")
+
+
+class JobFitOutput(BaseModel):
+    fit_score: Score
+    skill_match: Score
+    experience_match: Score
+    education_match: Score
+    missing_skills: Items = Field(description="missing skills and how to acquire them")
+    advantages: Items = Field(description="competitive advantages for this job")
+    recommendations: Items = Field(description="improvement steps with timeline")
+    application_tips: Items = Field(description="application tips")
+
+
+class ContentOptimizationOutput(BaseModel):
+    optimized_content: str = Field(min_length=10, description="complete optimized text")
+    improvements: Items = Field(description="key improvements with explanation")
+    keywords_added: Items = Field(description="keywords added")
+    alternatives: List[str] = Field(default_factory=list, description="two alternative versions")
+
+
+class CareerGuidanceOutput(BaseModel):
+    growth_opportunities: Items = Field(description="career opportunities with market demand")
+    skill_priorities: Items = Field(description="priority skills with learning timeline")
+    learning_resources: Items = Field(description="courses/certifications with provider and duration")
+    networking_strategy: Items = Field(description="networking actions")
+    market_trends: Items = Field(description="industry trends and how to leverage them")
+    action_plan: Items = Field(description="30-day to 12-month actions with success metrics")
+
+
+def json_instructions(schema: Type[BaseModel], fields: Optional[Sequence[str]] = None) -> str:
+    """Prompt suffix asking for a JSON object matching schema (optionally only some fields)"""
+    full = schema.model_json_schema()
+    properties = full["properties"]
+    wanted = list(fields) if fields else list(properties)
+    subset: Dict[str, Any] = {
+        "type": "object",
+        "properties": {name: properties[name] for name in wanted},
+        "required": [name for name in wanted if name in full.get("required", [])],
+    }
+    if "$defs" in full and "$ref" in json.dumps(subset["properties"]):
+        subset["$defs"] = full["$defs"]
+    return (
+        "Respond with a single JSON object only (no markdown, no commentary) "
+        "that validates against this JSON schema:\n"
+        + json.dumps(subset, separators=(",", ":"))
+    )
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Return the first JSON object in a response, tolerating code fences and prose around it"""
+    if not text:
+        return None
+    text = _FENCE_RE.sub("", text.strip())
+    start = text.find("{")
+    if start < 0:
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(text[start:])
+    except json.JSONDecodeError:
+        end = text.rfind("}")
+        try:
+            data = json.loads(text[start:end + 1]) if end > start else None
+        except json.JSONDecodeError:
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def validate_fields(schema: Type[BaseModel], data: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validate data against schema and split it into valid fields and fields
+    that are missing or invalid, so a retry only has to ask for the latter.
+    """
+    fields = list(schema.model_fields)
+    if not data:
+        return {}, [name for name in fields if schema.model_fields[name].is_required()]
+    try:
+        model = schema.model_validate(data)
+        return model.model_dump(), []
+    except ValidationError as e:
+        bad = {str(error["loc"][0]) for error in e.errors() if error["loc"]}
+    valid = {name: data[name] for name in fields if name in data and name not in bad}
+    return valid, [name for name in fields if name in bad]
@@ -0,0 +1,185 @@
+"""
+Section parser for LinkedIn Profile Optimizer
+Splits an LLM response into a {section_header: [items]} map in a single pass
+over its lines, so every list lookup afterwards is a dictionary read.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Lookup aliases: keyword -> other headers the model uses for the same section
+SECTION_ALIASES: Dict[str, List[str]] = {
+    "strengths": ["key strengths"],
+    "weaknesses": ["areas for improvement", "areas of improvement", "improvement areas"],
+    "recommendations": ["detailed recommendations"],
+    "keywords": ["recommended keywords"],
+    "missing skills": ["skill gaps", "skills to develop"],
+    "competitive advantages": ["advantages", "unique strengths"],
+    "priority skills": ["priority skills to develop", "skill priorities", "skills to develop"],
+    "application": ["application tips", "tips", "application strategy"],
+    "improvements": ["key improvements", "improvements made", "changes"],
+    "networking": ["networking strategy", "network building", "professional network"],
+    "opportunities": ["growth opportunities", "career opportunities", "next career moves"],
+    "resources": ["learning resources", "courses", "certifications", "training"],
+    "action": ["action plan", "roadmap", "next steps", "recommendations"],
+}
+
+_BULLET_RE = re.compile(r"^(?:[•\-\*→▪◦]|\d+\.)\s*(.+)")
+_NUMBERED_RE = re.compile(r"^\d+[.)]\s+(.+)")
+_BOLD_ONLY_RE = re.compile(r"^\*\*(.+?)\*\*\s*:?$")
+_CAPS_INLINE_RE = re.compile(r"^([A-Z][A-Z0-9 &/()'\-]{1,60}?)\s*:\s*(.*)$")
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+_ITALIC_RE = re.compile(r"\*(.*?)\*")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+_INLINE_RE = re.compile(r"^([A-Za-z][A-Za-z0-9 &/()'\-]{1,60}?)\s*:\s*(.+)$")
+
+# Headers accepted in "Header: content" form when not written in capitals
+_KNOWN_HEADERS = frozenset(
+    list(SECTION_ALIASES) + [alias for aliases in SECTION_ALIASES.values() for alias in aliases]
+)
+
+_MAX_HEADER_WORDS = 6
+
+
+def normalize_header(text: str) -> str:
+    """Lowercase a header and collapse punctuation/markdown to single spaces"""
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def _match_header(line: str) -> Optional[Tuple[str, str]]:
+    """Return (header, inline_content) if the stripped line is a section header"""
+    if line.startswith("#"):
+        header = _BOLD_RE.sub(r"\1", line.lstrip("#")).strip().rstrip(":").strip()
+        return (header, "") if header else None
+
+    numbered = _NUMBERED_RE.match(line)
+    candidate = numbered.group(1).strip() if numbered else line
+
+    bold = _BOLD_ONLY_RE.match(candidate)
+    if bold:
+        header = bold.group(1).strip().rstrip(":").strip()
+        if header and len(header.split()) <= _MAX_HEADER_WORDS:
+            return header, ""
+        return None
+
+    if candidate.endswith(":") and (numbered or not _BULLET_RE.match(candidate)):
+        header = candidate[:-1].strip()
+        if header and len(header.split()) <= (5 if numbered else _MAX_HEADER_WORDS):
+            return header, ""
+        return None
+
+    if not numbered:
+        caps = _CAPS_INLINE_RE.match(candidate)
+        if caps and caps.group(1).isupper() and len(caps.group(1).split()) <= _MAX_HEADER_WORDS:
+            return caps.group(1).strip(), caps.group(2).strip()
+
+    # "6. Recommended Keywords: a, b" or "Key Strengths: ..." for a known section
+    if numbered or (candidate[:1].isupper() and not _BULLET_RE.match(candidate)):
+        inline = _INLINE_RE.match(candidate)
+        if inline and normalize_header(inline.group(1)) in _KNOWN_HEADERS:
+            return inline.group(1).strip(), inline.group(2).strip()
+
+    return None
+
+
+def _line_to_item(line: str) -> Optional[str]:
+    """Turn a section body line into a cleaned list item, or None"""
+    if len(line) < 3:
+        return None
+    bullet = _BULLET_RE.match(line)
+    if bullet:
+        item = bullet.group(1).strip()
+        if len(item) <= 5:
+            return None
+    elif len(line) > 10:
+        item = line
+    else:
+        return None
+
+    # Remove markdown formatting and list symbols
+    item = _BOLD_RE.sub(r"\1", item)
+    item = _ITALIC_RE.sub(r"\1", item)
+    item = item.strip(" -•*:→▪◦")
+    if len(item) > 8 and not item.lower().startswith("detailed"):
+        return item
+    return None
+
+
+class ParsedSections:
+    """Section map of one response with keyword/alias lookup"""
+
+    __slots__ = ("sections", "_headers")
+
+    def __init__(self, sections: Dict[str, List[str]]):
+        self.sections = sections
+        self._headers = [f" {header} " for header in sections]
+
+    def get(self, keyword: str) -> List[str]:
+        """Return items for keyword: exact header, then aliases, then headers containing it"""
+        key = normalize_header(keyword)
+        candidates = [key] + SECTION_ALIASES.get(key, [])
+        for candidate in candidates:
+            items = self.sections.get(candidate)
+            if items:
+                return items
+        for candidate in candidates:
+            needle = f" {candidate} "
+            for header in self._headers:
+                if needle in header:
+                    items = self.sections[header[1:-1]]
+                    if items:
+                        return items
+        return []
+
+    def __contains__(self, keyword: str) -> bool:
+        return bool(self.get(keyword))
+
+
+@lru_cache(maxsize=64)
+def parse_sections(text: str) -> ParsedSections:
+    """
+    Split a response into sections in one pass over its lines.
+
+    Headers are recognised as markdown (``## Strengths``), bold
+    (``**STRENGTHS:**``), numbered (``1. Strengths:``) or plain
+    (``STRENGTHS:`` / ``KEYWORDS: a, b``) lines; a known section written as
+    ``6. Recommended Keywords: a, b`` counts too. A blank line followed by
+    non-list prose closes the current section. The first occurrence of a
+    header wins. Results are memoized per response text, so repeated
+    lookups on the same response do not re-parse it.
+    """
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    saw_gap = False
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or line == "**":
+            saw_gap = bool(current)
+            continue
+
+        header = _match_header(line)
+        if header is not None:
+            key = normalize_header(header[0])
+            if key in sections:
+                current = None  # repeated header: keep the first occurrence
+            else:
+                current = sections[key] = []
+                if header[1]:
+                    item = _line_to_item(header[1])
+                    if item:
+                        current.append(item)
+            saw_gap = False
+            continue
+
+        if current is None:
+            continue
+        if saw_gap and not _BULLET_RE.match(line):
+            current = None
+            continue
+        item = _line_to_item(line)
+        if item:
+            current.append(item)
+
+    return ParsedSections(sections)
@@ -0,0 +1,270 @@
+"""
+Semantic cache for LinkedIn Profile Optimizer
+Answers near-duplicate chat questions ("How can I optimize my LinkedIn
+headline?" / "how do i optimise my headline") from earlier answers. Questions
+are embedded as hashed word and character n-gram vectors and searched with a
+single matrix-vector product, within a bucket of similar profiles.
+"""
+
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from config import AppConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# Function words carry no meaning for matching ("how can I" = "how do I" =
+# "how to"); "why"/"when" change the question and are kept. "linkedin" is in
+# nearly every question here, so leaving it out must not cost a match.
+STOPWORDS = frozenset("""
+a an the my me i im you your yours to of in on for at by with about and or is are am be can could would should
+do does did please tell give some any it this that these those there so just really how what whats which s
+linkedin
+""".split())
+
+# A negation flips the question, so it must dominate the similarity
+NEGATIONS = frozenset({"not", "no", "never", "without", "avoid", "dont", "don", "shouldn", "stop", "t"})
+
+SPELLING_VARIANTS = {"optimise": "optimize", "optimising": "optimizing", "summarise": "summarize", "linkedin's": "linkedin"}
+
+# Words users treat as the same request ("improve my headline" = "optimize my headline")
+SYNONYMS = {
+    "improve": "optimize", "improving": "optimizing", "enhance": "optimize", "enhancing": "optimizing",
+    "boost": "optimize", "boosting": "optimizing", "strengthen": "optimize", "strengthening": "optimizing",
+}
+
+_CANONICAL_WORDS = {**SPELLING_VARIANTS, **SYNONYMS}
+
+SENIORITY_WORDS = {
+    "intern": "entry", "junior": "entry", "associate": "entry", "graduate": "entry", "entry": "entry",
+    "senior": "senior", "sr": "senior", "staff": "senior", "principal": "senior", "lead": "senior",
+    "head": "executive", "director": "executive", "vp": "executive", "chief": "executive", "cto": "executive",
+    "ceo": "executive", "founder": "executive",
+}
+
+
+def _feature_index(feature: str, dims: int) -> Tuple[int, float]:
+    """Stable (across processes) bucket and sign for a feature"""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dims, 1.0 if (h >> 31) & 1 else -1.0
+
+
+def question_words(text: str) -> List[str]:
+    words = [_CANONICAL_WORDS.get(w, w) for w in _WORD_RE.findall(text.lower())]
+    return [w for w in words if w not in STOPWORDS]
+
+
+def embed_question(text: str, dims: int = 2048) -> np.ndarray:
+    """
+    Unit-length hashed feature vector: content words, word bigrams and
+    character 4-grams of each word (so "optimize"/"optimizing" overlap).
+    """
+    vector = np.zeros(dims, dtype=np.float32)
+    words = question_words(text)
+    features: List[Tuple[str, float]] = [(f"w:{w}", 3.0 if w in NEGATIONS else 1.0) for w in words]
+    features += [(f"b:{a} {b}", 0.7) for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        grams = [padded[i:i + 4] for i in range(max(1, len(padded) - 3))]
+        features += [(f"c:{g}", 0.5 / len(grams) ** 0.5) for g in grams]
+    for feature, weight in features:
+        index, sign = _feature_index(feature, dims)
+        vector[index] += sign * weight
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def profile_bucket(profile_data: Optional[Dict[str, Any]]) -> str:
+    """
+    Coarse audience key (seniority and role) so an answer is only reused for
+    similar profiles, never across very different ones.
+    """
+    if not profile_data:
+        return "general"
+    headline = (profile_data.get("headline") or "").lower()
+    first_role = re.split(r"[|,•·@]| at ", headline)[0]
+    words = _WORD_RE.findall(first_role)
+    seniority = next((SENIORITY_WORDS[w] for w in words if w in SENIORITY_WORDS), None)
+    if seniority is None:
+        seniority = "senior" if len(profile_data.get("experience") or []) >= 4 else "mid"
+    role = " ".join(w for w in words if w not in SENIORITY_WORDS)[:40] or "unknown"
+    return f"{seniority}:{role}"
+
+
+class SemanticCache:
+    """Nearest-neighbour answer cache over question embeddings, with LRU and TTL eviction"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 24 * 3600,
+        threshold: float = 0.75,
+        dims: int = 2048,
+        embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.dims = dims
+        self.embed_fn = embed_fn or (lambda text: embed_question(text, dims))
+        # Fixed-size matrix; a slot is reused when its entry is evicted
+        self._vectors = np.zeros((max_entries, dims), dtype=np.float32)
+        self._buckets = np.full(max_entries, -1, dtype=np.int64)  # -1 = free slot
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._bucket_ids: Dict[str, int] = {}
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["SemanticCache"]:
+        """Build a cache from AppConfig.SEMANTIC_CACHE_CONFIG, or None when disabled"""
+        config = config or AppConfig.SEMANTIC_CACHE_CONFIG
+        if not config.get("enabled", True):
+            return None
+        return cls(
+            max_entries=config.get("max_entries", 1024),
+            ttl=config.get("ttl", 24 * 3600),
+            threshold=config.get("threshold", 0.75),
+            dims=config.get("dims", 2048),
+        )
+
+    def _bucket_id(self, bucket: str) -> int:
+        if bucket not in self._bucket_ids:
+            self._bucket_ids[bucket] = len(self._bucket_ids)
+        return self._bucket_ids[bucket]
+
+    def lookup(self, question: str, bucket: str = "general") -> Optional[Dict[str, Any]]:
+        """Return {"answer", "question", "similarity"} of the closest cached question above the threshold"""
+        vector = self.embed_fn(question)
+        with self._lock:
+            bucket_id = self._bucket_ids.get(bucket)
+            if bucket_id is None or not self._entries:
+                self._stats["misses"] += 1
+                return None
+            similarities = self._vectors @ vector
+            usable = (self._buckets == bucket_id) & (self._expires > time.time())
+            similarities[~usable] = -1.0
+            slot = int(np.argmax(similarities))
+            similarity = float(similarities[slot])
+            if similarity < self.threshold:
+                self._stats["misses"] += 1
+                return None
+            self._lru.move_to_end(slot)
+            entry = self._entries[slot]
+            entry["hits"] += 1
+            self._stats["hits"] += 1
+            return {"answer": entry["answer"], "question": entry["question"], "similarity": round(similarity, 4)}
+
+    def store(self, question: str, answer: str, bucket: str = "general", ttl: Optional[float] = None) -> None:
+        vector = self.embed_fn(question)
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            bucket_id = self._bucket_id(bucket)
+            # Replace an existing entry for (nearly) the same question instead of duplicating it
+            similarities = self._vectors @ vector
+            similarities[self._buckets != bucket_id] = -1.0
+            slot = int(np.argmax(similarities))
+            if similarities[slot] < 0.98:
+                slot = self._allocate()
+            self._vectors[slot] = vector
+            self._buckets[slot] = bucket_id
+            self._expires[slot] = time.time() + ttl if ttl else np.inf
+            self._entries[slot] = {"question": question, "answer": answer, "bucket": bucket, "hits": 0}
+            self._lru[slot] = None
+            self._lru.move_to_end(slot)
+            self._stats["sets"] += 1
+
+    def _allocate(self) -> int:
+        if not self._free:
+            expired = np.flatnonzero((self._buckets >= 0) & (self._expires <= time.time()))
+            for slot in expired.tolist():
+                self._release(slot)
+                self._stats["expired"] += 1
+        if not self._free:
+            slot = next(iter(self._lru))
+            self._release(slot)
+            self._stats["evictions"] += 1
+        return self._free.pop()
+
+    def _release(self, slot: int) -> None:
+        self._buckets[slot] = -1
+        self._vectors[slot] = 0.0
+        self._entries.pop(slot, None)
+        self._lru.pop(slot, None)
+        self._free.append(slot)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in list(self._entries):
+                self._release(slot)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            stats["buckets"] = len(self._bucket_ids)
+            return stats
+
+
+_default_cache: Optional[SemanticCache] = None
+_default_cache_lock = threading.Lock()
+_default_cache_built = False
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Process-wide cache shared by every chat entry point (None when disabled)"""
+    global _default_cache, _default_cache_built
+    if not _default_cache_built:
+        with _default_cache_lock:
+            if not _default_cache_built:
+                _default_cache = SemanticCache.from_config()
+                _default_cache_built = True
+    return _default_cache
+
+
+def cached_answer(
+    question: str,
+    profile_data: Optional[Dict[str, Any]],
+    generate: Callable[[], str],
+    cache: Optional[SemanticCache] = None,
+) -> str:
+    """
+    Answer from the semantic cache when a close enough question was already
+    answered for a similar profile; otherwise call generate() and cache it.
+    Answers that mention the user by name are personal and never cached.
+    """
+    if cache is None:
+        cache = get_semantic_cache()
+    if cache is None or not question.strip():
+        return generate()
+    bucket = profile_bucket(profile_data)
+    hit = cache.lookup(question, bucket)
+    if hit is not None:
+        logger.info(f"Semantic cache hit ({hit['similarity']:.2f}) for chat question in bucket {bucket}")
+        return hit["answer"]
+
+    answer = generate()
+    first_name = ((profile_data or {}).get("name") or "").split(" ")[0]
+    personal = len(first_name) > 1 and re.search(rf"\b{re.escape(first_name)}\b", answer, re.IGNORECASE)
+    if answer and not personal and not answer.startswith("I apologize"):
+        cache.store(question, answer, bucket)
+    return answer
@@ -0,0 +1,78 @@
+"""
+Request coalescing for LinkedIn Profile Optimizer
+When identical calls are in flight at the same time (several sessions loading
+the same demo profile, a double-clicked button), the first caller does the
+work and the others wait for its result instead of repeating the upstream
+call. Nothing is kept once the call finishes: caching is the response
+cache's and the profile store's job.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, Hashable, Optional, Tuple
+
+from config import AppConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution"""
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_config(cls, name: str, config: Optional[Dict[str, Any]] = None) -> Optional["SingleFlight"]:
+        config = config or AppConfig.SINGLEFLIGHT_CONFIG
+        if not config.get("enabled", True):
+            return None
+        return cls(name)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """
+        Return (fn(*args, **kwargs), shared). Callers arriving while a call for
+        key runs get that call's result (or exception) with shared=True.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.debug(f"{self.name}: joined an in-flight call")
+            return future.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "coalesced_rate": self.coalesced / total if total else 0.0,
+            }
@@ -0,0 +1,204 @@
+"""
+Skill taxonomy for LinkedIn Profile Optimizer
+Canonical skill names with the synonyms, abbreviations and spellings that
+profiles and job descriptions use for them.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Display name -> aliases (matching is case-insensitive)
+SKILL_SYNONYMS: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["python3", "py"],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": ["ts"],
+    "Java": ["java se", "java ee", "j2ee"],
+    "Go": ["golang"],
+    "Rust": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Scala": [],
+    "R": ["r programming", "rstats"],
+    "SQL": ["structured query language"],
+    "Bash": ["shell scripting", "shell", "bash scripting"],
+    "HTML": ["html5"],
+    "CSS": ["css3", "sass", "scss"],
+    # Frontend / backend frameworks
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs"],
+    "Next.js": ["nextjs"],
+    "Redux": [],
+    "Node.js": ["node", "nodejs"],
+    "Express": ["express.js", "expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring": ["spring boot", "springboot"],
+    "Ruby on Rails": ["rails", "ror"],
+    ".NET": ["dotnet", "asp.net", ".net core"],
+    "GraphQL": [],
+    "REST APIs": ["rest", "restful", "rest api", "restful apis", "restful api"],
+    "gRPC": ["protocol buffers", "protobuf"],
+    "Microservices": ["microservice", "microservices architecture", "service-oriented architecture", "soa"],
+    # Data stores and streaming
+    "PostgreSQL": ["postgres", "psql"],
+    "MySQL": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "opensearch"],
+    "Cassandra": [],
+    "DynamoDB": [],
+    "Snowflake": [],
+    "BigQuery": [],
+    "Kafka": ["apache kafka"],
+    "RabbitMQ": [],
+    "Spark": ["apache spark", "pyspark"],
+    "Hadoop": [],
+    "Airflow": ["apache airflow"],
+    "dbt": [],
+    "ETL": ["elt", "data pipelines", "data pipeline"],
+    # Cloud and infrastructure
+    "AWS": ["amazon web services", "ec2", "s3", "lambda"],
+    "Azure": ["microsoft azure"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Docker": ["containers", "containerization"],
+    "Kubernetes": ["k8s", "eks", "gke", "aks"],
+    "Terraform": ["infrastructure as code", "iac"],
+    "Ansible": [],
+    "CI/CD": ["cicd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": [],
+    "GitHub Actions": [],
+    "Git": ["github", "gitlab", "version control"],
+    "Linux": ["unix"],
+    "Observability": ["monitoring", "prometheus", "grafana", "opentelemetry", "datadog"],
+    "Serverless": [],
+    "Distributed Systems": ["distributed computing"],
+    "System Architecture": ["system design", "software architecture", "solution architecture"],
+    "Performance Optimization": ["performance tuning", "performance engineering"],
+    "Security": ["cybersecurity", "application security", "information security", "appsec"],
+    # Data science / ML
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["neural networks"],
+    "NLP": ["natural language processing"],
+    "Computer Vision": [],
+    "LLMs": ["large language models", "llm", "generative ai", "genai"],
+    "TensorFlow": [],
+    "PyTorch": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Data Analysis": ["data analytics", "analytics"],
+    "Data Visualization": ["tableau", "power bi", "looker"],
+    "Statistics": ["statistical analysis"],
+    "A/B Testing": ["ab testing", "experimentation"],
+    # Testing and process
+    "Automated Testing": ["test automation", "unit testing", "integration testing", "tdd"],
+    "Agile/Scrum": ["agile", "scrum", "kanban"],
+    "Jira": [],
+    # Product, design, business
+    "Product Management": ["product strategy", "product roadmap", "roadmapping"],
+    "Project Management": ["pmp", "program management"],
+    "UX Design": ["user experience", "ux", "ui/ux", "ux research", "user research"],
+    "UI Design": ["user interface design", "ui"],
+    "Figma": [],
+    "Stakeholder Management": ["stakeholder communication"],
+    "Salesforce": ["sfdc", "crm"],
+    "SEO": ["search engine optimization"],
+    "Digital Marketing": ["growth marketing", "performance marketing"],
+    "Financial Modeling": ["financial analysis"],
+    "Excel": ["microsoft excel", "spreadsheets"],
+    # Leadership and soft skills
+    "Team Leadership": ["leadership", "people management", "team management", "managing engineers", "tech lead"],
+    "Mentoring": ["mentor", "mentored", "mentorship", "coaching"],
+    "Communication": ["communication skills", "written communication", "presentation skills"],
+    "Cross-functional Collaboration": ["cross-functional", "cross functional", "collaboration"],
+    "Problem Solving": ["problem-solving", "troubleshooting"],
+}
+
+# Canonical skills too ambiguous to detect in free text ("go to market",
+# "R&D"); they only count when listed explicitly as a skill.
+AMBIGUOUS_SKILLS = {"go", "r", "rust", "swift", "ruby", "spring", "express", "shell", "ui", "ux",
+                    "lambda", "node", "rest", "analytics", "collaboration", "leadership", "monitoring",
+                    "containers", "coaching", "agile", "ml", "crm", "s3", "ec2"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9.+#/][a-z0-9+#./\-]*[a-z0-9+#]|[a-z0-9+#]")
+
+MAX_PHRASE_TOKENS = 4
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens that keep skill punctuation (c++, c#, node.js, ci/cd)"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _phrase(text: str) -> str:
+    return " ".join(tokenize(text))
+
+
+def _build_alias_map() -> Dict[str, str]:
+    aliases: Dict[str, str] = {}
+    for display, synonyms in SKILL_SYNONYMS.items():
+        canonical = display.lower()
+        aliases[_phrase(display)] = canonical
+        for synonym in synonyms:
+            aliases.setdefault(_phrase(synonym), canonical)
+    return aliases
+
+
+ALIASES: Dict[str, str] = _build_alias_map()
+DISPLAY_NAMES: Dict[str, str] = {display.lower(): display for display in SKILL_SYNONYMS}
+
+
+@lru_cache(maxsize=4096)
+def normalize_skill(skill: str) -> str:
+    """Map a skill as written on a profile/JD to its canonical key (unknown skills are kept, lowercased)"""
+    phrase = _phrase(skill)
+    return ALIASES.get(phrase, phrase)
+
+
+def display_name(canonical: str) -> str:
+    """Human-readable name for a canonical skill key"""
+    return DISPLAY_NAMES.get(canonical, canonical.title() if canonical.islower() else canonical)
+
+
+def is_ambiguous(phrase: str) -> bool:
+    return phrase in AMBIGUOUS_SKILLS
+
+
+def extract_skills(text: str, extra_aliases: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    Count canonical skills mentioned in free text.
+
+    Longest phrase wins (``google cloud platform`` over ``google cloud``);
+    tokens like ``react/redux`` are split when the whole token is not a skill.
+    ``extra_aliases`` adds phrases (e.g. a profile's own listed skills).
+    Ambiguous single words are ignored in free text.
+    """
+    tokens: List[str] = []
+    for token in tokenize(text):
+        if "/" in token and token not in ALIASES and not (extra_aliases and token in extra_aliases):
+            tokens.extend(part for part in token.split("/") if part)
+        else:
+            tokens.append(token.rstrip("."))
+
+    counts: Dict[str, int] = {}
+    i = 0
+    while i < len(tokens):
+        matched = 0
+        for size in range(min(MAX_PHRASE_TOKENS, len(tokens) - i), 0, -1):
+            phrase = " ".join(tokens[i:i + size])
+            canonical = ALIASES.get(phrase) or (extra_aliases.get(phrase) if extra_aliases else None)
+            if canonical is None or (size == 1 and (is_ambiguous(phrase) or is_ambiguous(canonical))):
+                continue
+            counts[canonical] = counts.get(canonical, 0) + 1
+            matched = size
+            break
+        i += matched or 1
+    return counts
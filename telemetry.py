@@ -0,0 +1,353 @@
+"""
+Telemetry for LinkedIn Profile Optimizer
+Per-call metrics for LLM requests (provider, model, tokens, queue wait,
+time to first byte, latency, retries, cache hits, failure reasons) and
+Apify task runs (run time, dataset fetch time, item count). Kept as
+in-process counters and histograms, exportable as Prometheus text.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Iterable, List, Optional, Tuple
+
+from config import AppConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+APIFY_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def failure_reason(error: Any, status_code: Optional[int] = None) -> str:
+    """Short, low-cardinality failure label: http_429, timeout, or the exception type"""
+    if isinstance(error, str):
+        return error
+    if status_code is not None:
+        return f"http_{status_code}"
+    name = type(error).__name__
+    return "timeout" if "timeout" in name.lower() else name
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a Prometheus-style quantile estimate"""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1] if self.buckets else self.sum / self.count
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "avg": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self._rounded(0.5),
+            "p95": self._rounded(0.95),
+        }
+
+    def _rounded(self, q: float) -> Optional[float]:
+        value = self.quantile(q)
+        return round(value, 4) if value is not None else None
+
+
+class Telemetry:
+    """Thread-safe registry of counters, histograms and the most recent call records"""
+
+    def __init__(self, recent_calls: int = 200, latency_buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent_calls)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["Telemetry"]:
+        """Build a registry from AppConfig.TELEMETRY_CONFIG, or None when disabled"""
+        config = config or AppConfig.TELEMETRY_CONFIG
+        if not config.get("enabled", True):
+            return None
+        return cls(
+            recent_calls=config.get("recent_calls", 200),
+            latency_buckets=config.get("latency_buckets", LATENCY_BUCKETS),
+        )
+
+    # ------------- Primitives -------------
+
+    def inc(self, name: str, labels: Dict[str, Any], value: float = 1.0, help_text: str = "") -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def observe(self, name: str, labels: Dict[str, Any], value: float,
+                buckets: Optional[Iterable[float]] = None, help_text: str = "") -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets or self.latency_buckets)
+            histogram.observe(value)
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    # ------------- Call records -------------
+
+    def record_llm_call(
+        self,
+        provider: str,
+        model: str = "unknown",
+        task: Optional[str] = None,
+        status: str = "ok",
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        queue_wait_s: float = 0.0,
+        ttfb_s: Optional[float] = None,
+        latency_s: float = 0.0,
+        retries: int = 0,
+        cache_hit: bool = False,
+        error: Optional[str] = None,
+        stream: bool = False,
+    ) -> None:
+        """One provider attempt (or cache hit); retries is the number of failed attempts before it in the request"""
+        labels = {"provider": provider, "model": model}
+        self.inc("llm_requests_total", {**labels, "task": task or "untyped", "status": status,
+                                        "cache": "hit" if cache_hit else "miss"},
+                 help_text="LLM requests by outcome")
+        if error:
+            self.inc("llm_request_failures_total", {"provider": provider, "reason": error},
+                     help_text="Failed LLM attempts by reason")
+        if prompt_tokens:
+            self.inc("llm_prompt_tokens_total", labels, prompt_tokens, help_text="Prompt tokens sent")
+        if completion_tokens:
+            self.inc("llm_completion_tokens_total", labels, completion_tokens, help_text="Completion tokens received")
+        self.observe("llm_request_latency_seconds", {"provider": provider, "cache": "hit" if cache_hit else "miss"},
+                     latency_s, help_text="End-to-end LLM request latency")
+        if not cache_hit:
+            self.observe("llm_queue_wait_seconds", {"provider": provider}, queue_wait_s,
+                         help_text="Time spent waiting for client-side rate limit capacity")
+        if ttfb_s is not None:
+            self.observe("llm_time_to_first_byte_seconds", {"provider": provider}, ttfb_s,
+                         help_text="Time to the first streamed chunk")
+        record = {
+            "kind": "llm", "time": time.time(), "provider": provider, "model": model, "task": task,
+            "status": status, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "queue_wait_s": round(queue_wait_s, 4), "ttfb_s": round(ttfb_s, 4) if ttfb_s is not None else None,
+            "latency_s": round(latency_s, 4), "retries": retries, "cache_hit": cache_hit, "error": error,
+            "stream": stream,
+        }
+        with self._lock:
+            self.recent.append(record)
+        logger.debug(f"LLM call {provider}/{task or 'untyped'}: {status} in {latency_s:.3f}s (cache_hit={cache_hit})")
+
+    def record_llm_retry(self, provider: str) -> None:
+        """A failed (or not admitted) attempt on provider after which the request tried another provider"""
+        self.inc("llm_retries_total", {"provider": provider},
+                 help_text="Failed provider attempts that were retried on another provider")
+
+    def record_apify_run(
+        self,
+        kind: str,
+        run_s: float,
+        fetch_s: float = 0.0,
+        items: int = 0,
+        requested: int = 1,
+        status: str = "ok",
+        error: Optional[str] = None,
+    ) -> None:
+        """One Apify task run: kind is "single" or "batch"""
+        self.inc("apify_runs_total", {"kind": kind, "status": status}, help_text="Apify task runs by outcome")
+        if error:
+            self.inc("apify_run_failures_total", {"kind": kind, "reason": error}, help_text="Failed Apify runs by reason")
+        self.inc("apify_items_total", {"kind": kind}, items, help_text="Dataset items returned by Apify runs")
+        self.inc("apify_profiles_requested_total", {"kind": kind}, requested, help_text="Profile URLs sent to Apify")
+        self.observe("apify_run_seconds", {"kind": kind}, run_s, APIFY_BUCKETS, help_text="Apify task run time")
+        if fetch_s:
+            self.observe("apify_dataset_fetch_seconds", {"kind": kind}, fetch_s, help_text="Apify dataset fetch time")
+        with self._lock:
+            self.recent.append({
+                "kind": "apify", "time": time.time(), "run_kind": kind, "status": status, "run_s": round(run_s, 3),
+                "fetch_s": round(fetch_s, 3), "items": items, "requested": requested, "error": error,
+            })
+        logger.debug(f"Apify {kind} run: {status}, {items}/{requested} items, run {run_s:.1f}s, fetch {fetch_s:.2f}s")
+
+    # ------------- Export -------------
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            help_texts = dict(self._help)
+        lines: List[str] = []
+        for name in sorted({name for name, _ in counters}):
+            lines += _header(name, "counter", help_texts)
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name in sorted({name for name, _ in histograms}):
+            lines += _header(name, "histogram", help_texts)
+            for (metric, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-provider LLM summary, Apify summary and the most recent calls"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: h.snapshot() for key, h in self._histograms.items()}
+            recent = list(self.recent)[-20:]
+
+        llm: Dict[str, Dict[str, Any]] = {}
+        for (name, labels), value in counters.items():
+            label = dict(labels)
+            if not name.startswith("llm_"):
+                continue
+            stats = llm.setdefault(label["provider"], {
+                "requests": 0, "errors": 0, "cache_hits": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            })
+            if name == "llm_requests_total":
+                stats["requests"] += int(value)
+                stats["errors"] += int(value) if label["status"] != "ok" else 0
+                stats["cache_hits"] += int(value) if label["cache"] == "hit" else 0
+            elif name == "llm_retries_total":
+                stats["retries"] += int(value)
+            elif name == "llm_prompt_tokens_total":
+                stats["prompt_tokens"] += int(value)
+            elif name == "llm_completion_tokens_total":
+                stats["completion_tokens"] += int(value)
+        for (name, labels), snapshot in histograms.items():
+            label = dict(labels)
+            if name == "llm_request_latency_seconds" and label.get("cache") == "miss" and label["provider"] in llm:
+                llm[label["provider"]]["latency"] = snapshot
+            elif name == "llm_time_to_first_byte_seconds" and label["provider"] in llm:
+                llm[label["provider"]]["ttfb"] = snapshot
+            elif name == "llm_queue_wait_seconds" and label["provider"] in llm:
+                llm[label["provider"]]["queue_wait"] = snapshot
+
+        apify: Dict[str, Dict[str, Any]] = {}
+        for (name, labels), value in counters.items():
+            label = dict(labels)
+            if name == "apify_runs_total":
+                stats = apify.setdefault(label["kind"], {"runs": 0, "failed": 0, "items": 0})
+                stats["runs"] += int(value)
+                stats["failed"] += int(value) if label["status"] != "ok" else 0
+            elif name == "apify_items_total":
+                apify.setdefault(label["kind"], {"runs": 0, "failed": 0, "items": 0})["items"] += int(value)
+        for (name, labels), snapshot in histograms.items():
+            label = dict(labels)
+            if name == "apify_run_seconds" and label["kind"] in apify:
+                apify[label["kind"]]["run"] = snapshot
+            elif name == "apify_dataset_fetch_seconds" and label["kind"] in apify:
+                apify[label["kind"]]["fetch"] = snapshot
+        return {"llm": llm, "apify": apify, "recent": recent}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.recent.clear()
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _header(name: str, kind: str, help_texts: Dict[str, str]) -> List[str]:
+    lines = [f"# HELP {name} {help_texts[name]}"] if name in help_texts else []
+    return lines + [f"# TYPE {name} {kind}"]
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+_telemetry_built = False
+
+
+def get_telemetry() -> Optional[Telemetry]:
+    """Process-wide registry shared by every provider and scraper (None when disabled)"""
+    global _telemetry, _telemetry_built
+    if not _telemetry_built:
+        with _telemetry_lock:
+            if not _telemetry_built:
+                _telemetry = Telemetry.from_config()
+                _telemetry_built = True
+    return _telemetry
+
+
+def record_llm_call(**fields: Any) -> None:
+    telemetry = get_telemetry()
+    if telemetry is not None:
+        telemetry.record_llm_call(**fields)
+
+
+def record_llm_retry(provider: str) -> None:
+    telemetry = get_telemetry()
+    if telemetry is not None:
+        telemetry.record_llm_retry(provider)
+
+
+def record_apify_run(**fields: Any) -> None:
+    telemetry = get_telemetry()
+    if telemetry is not None:
+        telemetry.record_apify_run(**fields)
+
+
+def get_telemetry_stats() -> Dict[str, Any]:
+    telemetry = get_telemetry()
+    return {"enabled": False} if telemetry is None else {"enabled": True, **telemetry.get_stats()}
+
+
+def render_prometheus() -> str:
+    telemetry = get_telemetry()
+    return telemetry.render_prometheus() if telemetry is not None else ""
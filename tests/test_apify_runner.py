@@ -0,0 +1,152 @@
+"""
+Tests for apify_runner.ApifyRunEngine against a stand-in Apify API.
+
+The stand-in is an httpx.MockTransport serving the three REST calls the
+engine makes (start run, get run, abort run) plus dataset items. Webhooks
+are delivered by POSTing to a real WebhookReceiver on localhost.
+"""
+
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apify_runner import ApifyRunEngine, ApifyRunError, WebhookReceiver  # noqa: E402
+
+ITEMS = [{"linkedinUrl": "https://www.linkedin.com/in/jane-doe", "fullName": "Jane Doe"}]
+
+
+class StandInApify:
+    """Minimal Apify REST API: a run finishes after finish_after polls (never if None)"""
+
+    def __init__(self, finish_after=2, start_delay=0.0):
+        self.finish_after = finish_after
+        self.start_delay = start_delay
+        self.runs = {}
+        self.polls = 0
+        self.aborted = []
+        self.started = asyncio.Event()
+
+    def run(self, run_id):
+        return {"id": run_id, "status": self.runs[run_id], "defaultDatasetId": f"ds-{run_id}"}
+
+    async def handler(self, request):
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/runs"):
+            self.started.set()
+            await asyncio.sleep(self.start_delay)
+            run_id = f"run{len(self.runs) + 1}"
+            self.runs[run_id] = "RUNNING"
+            return httpx.Response(201, json={"data": self.run(run_id)})
+        if request.method == "POST" and path.endswith("/abort"):
+            run_id = path.split("/")[-2]
+            self.runs[run_id] = "ABORTED"
+            self.aborted.append(run_id)
+            return httpx.Response(200, json={"data": self.run(run_id)})
+        if request.method == "GET" and path.startswith("/v2/actor-runs/"):
+            run_id = path.rsplit("/", 1)[-1]
+            self.polls += 1
+            if self.finish_after is not None and self.polls >= self.finish_after:
+                self.runs[run_id] = "SUCCEEDED"
+            return httpx.Response(200, json={"data": self.run(run_id)})
+        if request.method == "GET" and path.startswith("/v2/datasets/"):
+            return httpx.Response(200, json=ITEMS, headers={"x-apify-pagination-total": str(len(ITEMS))})
+        return httpx.Response(404)
+
+
+def make_engine(api, **options):
+    options = {"poll_initial": 0.01, "poll_max": 0.05, "run_timeout": 5.0, **options}
+    return ApifyRunEngine(
+        api_key="test-token", task_id="user/linkedin-task", transport=httpx.MockTransport(api.handler), **options
+    )
+
+
+async def collect(engine, task_input):
+    return [item async for item in engine.run_task(task_input)]
+
+
+def test_poll_path_streams_items_after_the_run_succeeds():
+    async def scenario():
+        api = StandInApify(finish_after=3)
+        async with make_engine(api) as engine:
+            items = await collect(engine, {"profileUrls": ["https://www.linkedin.com/in/jane-doe"]})
+        return api, engine, items
+
+    api, engine, items = asyncio.run(scenario())
+    assert items == ITEMS
+    assert api.polls == 3
+    assert engine.stats["succeeded"] == 1 and engine.stats["aborted"] == 0
+
+
+def test_webhook_wakes_the_waiter_without_polling():
+    async def scenario():
+        api = StandInApify(finish_after=None)
+        receiver = await WebhookReceiver().start()
+        try:
+            async with make_engine(api, webhook=receiver, poll_max=10.0) as engine:
+                consumer = asyncio.create_task(collect(engine, {"profileUrls": []}))
+                while not api.runs:
+                    await asyncio.sleep(0.01)
+                run_id = next(iter(api.runs))
+                api.runs[run_id] = "SUCCEEDED"
+                async with httpx.AsyncClient() as client:
+                    wrong = await client.post(receiver.url + "x", json={"resource": api.run(run_id)})
+                    right = await client.post(receiver.url, json={"resource": api.run(run_id)})
+                items = await asyncio.wait_for(consumer, 2.0)
+        finally:
+            await receiver.close()
+        return api, receiver, items, wrong, right
+
+    api, receiver, items, wrong, right = asyncio.run(scenario())
+    assert (wrong.status_code, right.status_code) == (404, 200)
+    assert items == ITEMS
+    assert receiver.events == 1
+    assert api.polls == 0
+
+
+def test_run_past_its_timeout_is_aborted():
+    async def scenario():
+        api = StandInApify(finish_after=None)
+        async with make_engine(api, run_timeout=0.1) as engine:
+            with pytest.raises(ApifyRunError, match="did not finish in time"):
+                await collect(engine, {"profileUrls": []})
+        return api, engine
+
+    api, engine = asyncio.run(scenario())
+    assert api.aborted == ["run1"]
+    assert engine.stats["failed"] == 1 and engine.stats["active"] == 0
+
+
+def test_cancelling_while_waiting_aborts_the_run():
+    async def scenario():
+        api = StandInApify(finish_after=None)
+        async with make_engine(api) as engine:
+            consumer = asyncio.create_task(collect(engine, {"profileUrls": []}))
+            while api.polls == 0:
+                await asyncio.sleep(0.01)
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+        return api
+
+    assert asyncio.run(scenario()).aborted == ["run1"]
+
+
+def test_cancelling_during_the_start_request_still_aborts_the_run():
+    async def scenario():
+        api = StandInApify(finish_after=None, start_delay=0.1)
+        async with make_engine(api) as engine:
+            consumer = asyncio.create_task(collect(engine, {"profileUrls": []}))
+            await api.started.wait()
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+        return api
+
+    api = asyncio.run(scenario())
+    assert api.runs == {"run1": "ABORTED"}
+    assert api.aborted == ["run1"]
@@ -0,0 +1,38 @@
+"""
+Tests for semantic_cache.SemanticCache near-duplicate matching at the
+default threshold.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticCache  # noqa: E402
+
+ASKED = "How can I optimize my LinkedIn headline?"
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticCache(max_entries=16)
+    cache.store(ASKED, "Lead with your specialization and one measurable outcome.")
+    return cache
+
+
+@pytest.mark.parametrize("question", [
+    "how do i optimise my headline",
+    "How to improve my LinkedIn headline?",
+])
+def test_rephrased_question_hits(cache, question):
+    assert cache.lookup(question) is not None
+
+
+@pytest.mark.parametrize("question", [
+    "How can I NOT optimize my headline?",
+    "How can I optimize my LinkedIn summary?",
+])
+def test_negated_or_different_section_question_misses(cache, question):
+    assert cache.lookup(question) is None
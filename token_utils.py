@@ -0,0 +1,39 @@
+"""
+Token estimation helpers for LinkedIn Profile Optimizer
+Cheap character-based token estimates used for rate limiting and budgeting
+when the provider's tokenizer is not available.
+"""
+
+import re
+from typing import Optional
+
+# Average characters per token for English text with Llama-family tokenizers
+CHARS_PER_TOKEN = 4
+
+# Pre-tokenizer pieces as BPE tokenizers split them: words (with their
+# leading space), digit runs and single punctuation marks
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the token count of a piece of text"""
+    if not text:
+        return 0
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+
+def estimate_prompt_tokens(prompt: Optional[str], system_prompt: Optional[str] = None) -> int:
+    """Estimate the input tokens of a request (system prompt is sent with the user message)"""
+    return estimate_tokens(prompt) + estimate_tokens(system_prompt)
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Closer local approximation of a BPE token count: one token per short
+    word, digit group or punctuation mark, long words split every ~6 chars.
+    Used where budgets are tight (conversation memory); estimate_tokens is
+    enough for rate limiting.
+    """
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 6 for piece in _PIECE_RE.findall(text))